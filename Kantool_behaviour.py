@@ -16,6 +16,7 @@ import tkinter.messagebox as tkmessagebox
 import numpy as np
 import ctypes
 import json
+import multiprocessing
 
 from skeleton import Skeleton
 from ethogram import Ethogram
@@ -27,6 +28,8 @@ from object_canvas import ObjectCanvas
 from settings_dialog import SettingsDialog
 from annotations import Annotations
 from settings import Settings
+from image_index import ImageIndex
+from project_index import ProjectIndex
 from import_mask_template_dialog import ImportMaskTemplateDialog
 from save_mask_template_dialog import SaveMaskTemplateDialog
 from mask_template_manager import MaskTemplateManager
@@ -77,12 +80,18 @@ class Application(tk.Frame):
         #ethogram
         self.ethogram = Ethogram(master=self)
 
-        # annotations
-        self.annotations = Annotations(master=self)
-
         # settings
         self.settings = Settings()
 
+        # sorted index of the images in the project folder
+        self.image_index = ImageIndex()
+
+        # summaries of the annotation files in the project folder
+        self.project_index = ProjectIndex()
+
+        # annotations
+        self.annotations = Annotations(master=self)
+
         # canvas to show image
         self.annotation_canvas = AnnotationCanvas(master=self,
                                                   bd=10,
@@ -146,6 +155,8 @@ class Application(tk.Frame):
                                    command=lambda: self.annotation_canvas.switch_image(direction=-1))
         self.file_menu.add_command(label="Next image (F8)",
                                    command=lambda: self.annotation_canvas.switch_image(direction=1))
+        self.file_menu.add_command(label="Go to frame (Ctrl+G)",
+                                   command=self.annotation_canvas.go_to_frame)
         self.file_menu.add_command(label="Import image (Ctrl+I)",
                                    command=self.import_images)
         self.file_menu.add_command(label="Export dataset (F5)",
@@ -166,6 +177,8 @@ class Application(tk.Frame):
                          lambda event: self.annotation_canvas.switch_image(direction=-1))
         self.master.bind("<F8>",\
                          lambda event: self.annotation_canvas.switch_image(direction=1))
+        self.master.bind("<Control-g>",\
+                         lambda event: self.annotation_canvas.go_to_frame())
         self.master.bind("<Control-i>",\
                          lambda event: self.import_images())
         self.master.bind("<F5>",\
@@ -183,6 +196,10 @@ class Application(tk.Frame):
         # class is first provoked, which activates on it's turn the appropriate
         # method of SkeletonCanvas or AnnotationCanvas
 
+        # annotation files which are still being written in the background are
+        # finished before the application is closed
+        self.master.protocol("WM_DELETE_WINDOW", self.close)
+
         # disable all menu items which may only be used when a project is opened
         self.file_menu.entryconfig("Open image (Ctrl+O)", state="disabled")
         self.file_menu.entryconfig("Close image (Ctrl+W)", state="disabled")
@@ -191,6 +208,7 @@ class Application(tk.Frame):
         self.file_menu.entryconfig("Delete object (Ctrl+Del)", state="disabled")
         self.file_menu.entryconfig("Previous image (F7)", state="disabled")
         self.file_menu.entryconfig("Next image (F8)", state="disabled")
+        self.file_menu.entryconfig("Go to frame (Ctrl+G)", state="disabled")
         self.file_menu.entryconfig("Import image (Ctrl+I)", state="disabled")
         self.file_menu.entryconfig("Export dataset (F5)", state="disabled")
 
@@ -339,6 +357,8 @@ class Application(tk.Frame):
                             "Previous image (F7)", state="normal")
                         self.file_menu.entryconfig(
                             "Next image (F8)", state="normal")
+                        self.file_menu.entryconfig(
+                            "Go to frame (Ctrl+G)", state="normal")
                         self.file_menu.entryconfig(
                             "Import image (Ctrl+I)", state="normal")
                         self.file_menu.entryconfig(
@@ -383,6 +403,8 @@ class Application(tk.Frame):
                 self.file_menu.entryconfig(
                     "Previous image (F7)", state="disabled")
                 self.file_menu.entryconfig("Next image (F8)", state="disabled")
+                self.file_menu.entryconfig(
+                    "Go to frame (Ctrl+G)", state="disabled")
                 self.file_menu.entryconfig(
                     "Import image (Ctrl+I)", state="disabled")
                 self.file_menu.entryconfig(
@@ -440,20 +462,12 @@ class Application(tk.Frame):
                         self.ethogram.load(pth_ethogram)
 
                     # load the first image and annotations (if present)
-                    image_found = False
-                    i = -1
-
-                    while not image_found:
-                        i += 1
-                        file = files_folders[i]
-
-                        if (len(file.split('.')) == 2) and\
-                                (file.split('.')[1] in ['jpg', 'png']):
-                            image_found = True
-                            self.annotation_canvas.load_image(os.path.join(path, file),
-                                                              full_path=True)
-                        elif i == len(files_folders) - 1:
-                            image_found = True
+                    self.image_index.set_directory(path)
+                    self.project_index.set_directory(path)
+                    if len(self.image_index) > 0:
+                        self.annotation_canvas.load_image(
+                            os.path.join(path, self.image_index.names[0]),
+                            full_path=True)
 
                     # activate all entries within the File menu
                     self.file_menu.entryconfig(
@@ -470,6 +484,8 @@ class Application(tk.Frame):
                         "Previous image (F7)", state="normal")
                     self.file_menu.entryconfig(
                         "Next image (F8)", state="normal")
+                    self.file_menu.entryconfig(
+                        "Go to frame (Ctrl+G)", state="normal")
                     self.file_menu.entryconfig(
                         "Import image (Ctrl+I)", state="normal")
                     self.file_menu.entryconfig(
@@ -523,6 +539,13 @@ class Application(tk.Frame):
         else:  # self.mode == 1:
             self.skeleton_canvas.save()
 
+    def close(self):
+        """
+        Close the application, after all annotation files are written
+        """
+        self.annotations.finish_writes()
+        self.master.destroy()
+
     def new_project(self):
         """
         Create a new project
@@ -533,6 +556,8 @@ class Application(tk.Frame):
         """
         Export the project to a dataset of a chosen format
         """
+        # the exported annotation files have to be completely written
+        self.annotations.finish_writes()
         ExportDataset(self)
 
     def import_images(self):
@@ -617,22 +642,26 @@ class Application(tk.Frame):
 
 # %% Start mainloop
 
-
-# adjust DPI to screen resolution
-ctypes.windll.shcore.SetProcessDpiAwareness(1)
-
-# start mainloop
-root = tk.Tk()
-
-#set application icon
-if os.path.exists("icon/Kantool_behaviour_icon.ico"):
-    #this case will be executed when the application is run from the .py file
-    root.iconbitmap("icon/Kantool_behaviour_icon.ico")
-elif os.path.exists("_internal/icon/Kantool_behaviour_icon.ico"):
-    #this case will be executed when the application is run from a .exe file
-    #generated with pyinstaller
-    root.iconbitmap("_internal/icon/Kantool_behaviour_icon.ico")
-
-soft_dir = os.getcwd()
-app = Application(master=root, program_dir=soft_dir)
-app.mainloop()
+if __name__ == "__main__":
+    #worker processes (e.g. of the dataset export) import this module without
+    #starting the application, also in an executable built with pyinstaller
+    multiprocessing.freeze_support()
+
+    # adjust DPI to screen resolution
+    ctypes.windll.shcore.SetProcessDpiAwareness(1)
+
+    # start mainloop
+    root = tk.Tk()
+
+    #set application icon
+    if os.path.exists("icon/Kantool_behaviour_icon.ico"):
+        #this case will be executed when the application is run from the .py file
+        root.iconbitmap("icon/Kantool_behaviour_icon.ico")
+    elif os.path.exists("_internal/icon/Kantool_behaviour_icon.ico"):
+        #this case will be executed when the application is run from a .exe file
+        #generated with pyinstaller
+        root.iconbitmap("_internal/icon/Kantool_behaviour_icon.ico")
+
+    soft_dir = os.getcwd()
+    app = Application(master=root, program_dir=soft_dir)
+    app.mainloop()
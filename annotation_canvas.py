@@ -15,9 +15,45 @@ import tkinter.filedialog as tkfiledialog
 import numpy as np
 import pandas as pd
 import cv2
-from PIL import Image, ImageTk
 
 from general_image_canvas import GeneralImageCanvas
+from redraw_scheduler import RedrawScheduler
+from ask_string_dialog import AskStringDialog
+from video_source import is_video
+
+#%% dirty rectangles
+#rectangles are tuples (x0, y0, x1, y1), None is an empty rectangle
+
+def _union_rect(rect_a, rect_b):
+    """
+    Smallest rectangle containing both rectangles
+    """
+    if rect_a is None:
+        return rect_b
+    if rect_b is None:
+        return rect_a
+    return (min(rect_a[0], rect_b[0]), min(rect_a[1], rect_b[1]),
+            max(rect_a[2], rect_b[2]), max(rect_a[3], rect_b[3]))
+
+def _clip_rect(rect, bounds):
+    """
+    Intersection of a rectangle with bounds, None if they don't overlap
+    """
+    if rect is None:
+        return None
+    x0, y0 = max(rect[0], bounds[0]), max(rect[1], bounds[1])
+    x1, y1 = min(rect[2], bounds[2]), min(rect[3], bounds[3])
+    if (x0 >= x1) or (y0 >= y1):
+        return None
+    return (x0, y0, x1, y1)
+
+def _copy_rect(source, destination, rect):
+    """
+    Copy a rectangle of source to destination
+    """
+    if rect is not None:
+        x0, y0, x1, y1 = rect
+        destination[y0:y1, x0:x1] = source[y0:y1, x0:x1]
 
 #%%main code
 
@@ -32,13 +68,15 @@ class AnnotationCanvas(GeneralImageCanvas):
         self.annotations = master.annotations
         self.settings = master.settings
 
-        self.image_inter_scale = 1.0 #scale of self.image_inter
+        self.image_inter_viewport = None #(scale, dx, dy, width, height) of self.image_inter
         self.image_inter = None #intermediary image matrix
         #basic modifications to self.image are done once and then stored
         #in self.image_inter to speed up the code
         self.image = None #image matrix
         self.image_inter_1 = None
         self.image_shown = None #matrix with shown image
+        self.image_inter_1_rect = None #area of the active items on self.image_inter_1
+        self.image_shown_rect = None #area of the mouse circle on self.image_shown
 
         self.show_mask = True #True if masks should be drawn
 
@@ -49,6 +87,15 @@ class AnnotationCanvas(GeneralImageCanvas):
 
         self.object_canvas_active = False
 
+        self.navigation_direction = 1 #direction of the last image switch
+
+        #redraws triggered by mouse motion, dragging, panning and zooming are
+        #coalesced and rendered at most once per frame
+        self.redraw_scheduler = RedrawScheduler(widget=self,
+                                                render=self.update_image,
+                                                merge=self.merge_modes,
+                                                interval=1000/self.settings.max_frame_rate)
+
         self.bind("<Button-1>",
                   self.button_1)
         self.bind("<ButtonRelease-1>",
@@ -78,70 +125,104 @@ class AnnotationCanvas(GeneralImageCanvas):
 
         annotations = self.annotations
 
+        #a pending coalesced redraw is rendered together with this update
+        mode = self.redraw_scheduler.take(mode)
+
         if annotations.image_name is None:
             #no image is loaded
             #display nothing
-            self.itemconfigure(self.image_photoimage, image=None)
-            self._image_photoimage = None
+            self.photo_display.clear()
             return
 
         #There is an image loaded
 
         #get image height and width
-        image_height, image_width = annotations.image.shape[:2]
+        image_height, image_width = annotations.image_shape[:2]
 
         #get scale and intercepts
         s = self.zoom_level
         dx = self.zoom_delta_x
         dy = self.zoom_delta_y
 
-        #get annotations
-        df = annotations.annotations
+        #only the part of the rescaled image which is visible on the canvas
+        #(the viewport) is rendered, the viewport starts at (dx, dy)
+        uw = self.winfo_width() - 2 * self.bd
+        uh = self.winfo_height() - 2 * self.bd
+        viewport_width = max(1, min(uw, int(image_width * s) - dx))
+        viewport_height = max(1, min(uh, int(image_height * s) - dy))
+        viewport = (s, dx, dy, viewport_width, viewport_height)
+        offset = np.array([dx, dy])
+
+        #get keypoint coordinates (n_objects, n_keypoints, 2)
+        keypoints = annotations.objects.keypoints
+
+        #the image is composed of three cached layers
+        #self.image_inter: rescaled image with all non-active items
+        #self.image_inter_1: self.image_inter with the active object/mask
+        #self.image_shown: self.image_inter_1 with the mouse circle
+        #a layer is only rebuilt completely when a layer below it is rebuilt
+        #completely, otherwise only its dirty rectangle is restored from the
+        #layer below and redrawn
+        full_rect = (0, 0, viewport_width, viewport_height)
+        rebuild = (mode in [0, 3]) or (self.image_inter_viewport != viewport)
+        dirty_rect = None #part of self.image_shown which changed
 
         #rescale image
-        if (mode in [0, 3]) or (self.image_inter_scale != s):
-            #resize self.image_inter according to scale s
-            self.image_inter = cv2.resize(annotations.image,
-                                          dsize=(int(image_width * s),
-                                                 int(image_height * s)))
-            self.image_inter_scale = s
+        if rebuild:
+            #resample the viewport from the closest level of the image pyramid
+            self.image_inter = annotations.image_pyramid.resize_region(
+                s, dx, dy, viewport_width, viewport_height)
 
         #draw all non-active items
-        if (mode in [0, 3]) or (self.image_inter_scale != s):
+        if rebuild:
+            #only items which intersect the viewport are drawn
+            visible_objects, visible_masks = self.visible_items(viewport)
+
             #draw all non-active objects
-            for i in df.index:
+            for i in np.flatnonzero(visible_objects):
                 if i != annotations.object:
-                    data_object = df.loc[i, :].to_numpy()
+                    data_object = keypoints[i].reshape(-1)
 
-                    self.image_inter = self.draw_skeleton(self.image_inter, s, data_object)
+                    self.image_inter = self.draw_skeleton(self.image_inter, s, data_object,
+                                                          offset=offset)
 
             #draw all non-active masks
             if self.show_mask:
-                for i in annotations.names_masks["obj"]:
-                    if i != annotations.mask_id:
-                        mask = annotations.annotation_points_masks.loc[annotations.annotation_points_masks["obj"]==i,\
-                                                             ["x", "y"]].to_numpy()
+                for (i, _, mask), visible in zip(annotations.masks.items(), visible_masks):
+                    if (i != annotations.mask_id) and visible:
                         color = [0, 0, 0]
 
                         self.image_inter = self.draw_mask(self.image_inter, mask,\
-                                                          s, color=color)
+                                                          s, color=color, offset=offset)
 
+            self.image_inter_viewport = viewport
 
         #draw all active items
-        if mode in [0, 1, 3]:
-            self.image_inter_1 = self.image_inter.copy()
+        if rebuild or (mode == 1):
+            active_rect = self.active_rect(s, offset)
+
+            if rebuild:
+                self.image_inter_1 = self.image_inter.copy()
+                dirty_rect = full_rect
+            else:
+                #restore the area of the previous and the new active items
+                dirty_rect = _clip_rect(_union_rect(self.image_inter_1_rect, active_rect),
+                                        full_rect)
+                _copy_rect(self.image_inter, self.image_inter_1, dirty_rect)
+            self.image_inter_1_rect = active_rect
 
             #draw skeleton of active object
             i = annotations.object
-            data_object = df.loc[i, :].to_numpy()
+            data_object = keypoints[i].reshape(-1)
 
-            self.image_inter_1 = self.draw_skeleton(self.image_inter_1,s, data_object)
+            self.image_inter_1 = self.draw_skeleton(self.image_inter_1,s, data_object,
+                                                    offset=offset)
 
             #draw points of active mask
             if self.show_mask:
 
                 #draw lines of mask
-                mask = annotations.points_mask.copy()
+                mask = annotations.points_mask
                 color = [255, 255, 0] #yellow
 
                 if len(mask)>=3:
@@ -149,12 +230,12 @@ class AnnotationCanvas(GeneralImageCanvas):
                     #identical to drawing segments of active object
                     mask_color = color
                     self.image_inter_1 = self.draw_segment(self.image_inter_1, mask,\
-                                                         s, color=mask_color)
+                                                         s, color=mask_color, offset=offset)
 
                 #draw points of active mask
                 for point in annotations.points_mask:
-                    x = int(point[0] * s)
-                    y = int(point[1] * s)
+                    x = int(point[0] * s - dx)
+                    y = int(point[1] * s - dy)
 
                     self.image_inter_1= cv2.circle(self.image_inter_1,
                                                  (x,y),
@@ -165,69 +246,176 @@ class AnnotationCanvas(GeneralImageCanvas):
         #draw circle around mouse/activated keypoint
 
         if mode in [0,1,2]:
-            self.image_shown = self.image_inter_1.copy()
-
+            #position of the circle
+            circle = None
             if self.mode == 0:
-
                 if annotations.keypoint_reactivated:
                     #draw circle around activated keypoint
-                    x, y = (df.iloc[annotations.object,
-                                    annotations.keypoint_index * 2: annotations.keypoint_index * 2 + 2]
-                            * s).astype(int)
+                    x, y = (keypoints[annotations.object, annotations.keypoint_index]
+                            * s - offset).astype(int)
                 else: #not self.keypoint_reactivated:
                     #draw circle around mouse
-                    x = int(self.mouse_x  + self.zoom_delta_x)
-                    y = int(self.mouse_y  + self.zoom_delta_y)
+                    #(the mouse position is relative to the viewport)
+                    x = int(self.mouse_x)
+                    y = int(self.mouse_y)
+                circle = (x, y)
+            #else: self.mode in [1, 2]
+                #if in mask mode, nothing should be drawn around the mouse
+
+            margin = self.settings.circle_radius + self.settings.linewidth
+            circle_rect = None if circle is None else \
+                (circle[0] - margin, circle[1] - margin,
+                 circle[0] + margin + 1, circle[1] + margin + 1)
 
+            if dirty_rect == full_rect:
+                self.image_shown = self.image_inter_1.copy()
+            else:
+                #restore the area of the previous and the new circle, and the
+                #area where the active items changed
+                dirty_rect = _clip_rect(_union_rect(dirty_rect,
+                                                    _union_rect(self.image_shown_rect,
+                                                                circle_rect)),
+                                        full_rect)
+                _copy_rect(self.image_inter_1, self.image_shown, dirty_rect)
+            self.image_shown_rect = circle_rect
+
+            if circle is not None:
                 color = self.skeleton.color[annotations.keypoint_index]
-                cv2.circle(self.image_shown, (x, y),
+                cv2.circle(self.image_shown, circle,
                            radius=self.settings.circle_radius,
                            color=color,
                            thickness=self.settings.linewidth)
-            else: #self.mode in [0, 2]:
-                #if in mask mode, nothing should be drawn around the mouse
-                pass
 
         elif mode == 3:
             #redraw re-activated object with circles around keyoints
             self.image_shown = self.image_inter_1.copy()
+            #the circles can be anywhere, the next update restores the whole layer
+            self.image_shown_rect = full_rect
 
             if self.mode in [0, 2]:
                 i = annotations.object
-                data_object = df.loc[i, :].to_numpy()
+                data_object = keypoints[i].reshape(-1)
                 self.image_shown = \
-                    self.draw_skeleton(self.image_shown,s, data_object, highlight=True)
+                    self.draw_skeleton(self.image_shown,s, data_object, highlight=True,
+                                       offset=offset)
 
-        #slice self.image_shown so slice fits in self
-        uw = self.winfo_width() - 2 * self.bd
-        uh = self.winfo_height() - 2 * self.bd
-        if (self.image_shown.shape[1] > uw) or\
-            (self.image_shown.shape[0] > uh):
-            self.image_shown = self.image_shown[dy : dy + uh,
-                                                dx: dx + uw,
-                                                :]
+        #show image (only the part which changed)
+        if dirty_rect is not None:
+            self.show_image(self.image_shown, dirty_rect)
+
+    @property
+    def image_shape(self):
+        """
+        Shape of the full resolution image (self.image can be a preview)
+        """
+        return self.annotations.image_shape
 
-        #show image
-        image_shown = Image.fromarray(self.image_shown)
-        image_shown = ImageTk.PhotoImage(image_shown)
+    def request_redraw(self, mode=0):
+        """
+        Request an update of the image, the update is coalesced with other
+        requests and rendered at most once per frame
+        """
+        self.redraw_scheduler.request(mode)
 
-        self.itemconfigure(self.image_photoimage, image=image_shown)
-        self._image_photoimage = image_shown
+    @staticmethod
+    def merge_modes(first, second):
+        """
+        Mode of a single update of the image with the same result as an update
+        with mode first, followed by an update with mode second
+        """
+        if second in [0, 3]:
+            #second starts from scratch
+            return second
+        if first in [0, 3]:
+            #start from scratch and draw the active items and the mouse circle
+            return 0
+        #redraw the active items if one of both modes does
+        return min(first, second)
+
+    def active_rect(self, s, offset):
+        """
+        Bounding rectangle (x0, y0, x1, y1) of the active object and the active
+        mask, expressed in pixels of the viewport. None if nothing is drawn
+        """
+        annotations = self.annotations
+        points = [annotations.objects.keypoints[annotations.object]]
+        if self.show_mask:
+            points.append(annotations.points_mask)
+        points = np.concatenate(points).reshape(-1, 2)
+        points = points[~np.isnan(points[:, 0])]
+
+        if len(points) == 0:
+            return None
+
+        points = points * s - offset
+        margin = self.settings.point_size + self.settings.linewidth + 1
+        x0, y0 = np.floor(points.min(axis=0)).astype(int) - margin
+        x1, y1 = np.ceil(points.max(axis=0)).astype(int) + margin + 1
+        return (int(x0), int(y0), int(x1), int(y1))
+
+    def visible_items(self, viewport):
+        """
+        Determine which objects and masks intersect the viewport
+
+        Parameters
+        ----------
+        viewport : tuple
+            (scale, dx, dy, width, height) of the viewport
+
+        Returns
+        -------
+        visible_objects : numpy array (n_objects), dtype bool
+            True for objects with keypoints in or around the viewport
+        visible_masks : list (n_masks)
+            True for masks which intersect the viewport
+        """
+        s, dx, dy, width, height = viewport
+
+        #viewport on the original image, extended with the size of the drawn
+        #points and circles
+        margin = max(self.settings.point_size, self.settings.circle_radius) +\
+            self.settings.linewidth
+        x_min = (dx - margin) / s
+        y_min = (dy - margin) / s
+        x_max = (dx + width + margin) / s
+        y_max = (dy + height + margin) / s
+
+        #bounding boxes of the objects, objects without keypoints get NaN
+        #bounding boxes and are not visible
+        keypoints = self.annotations.objects.keypoints
+        objects_min = np.fmin.reduce(keypoints, axis=1)
+        objects_max = np.fmax.reduce(keypoints, axis=1)
+        visible_objects = (objects_min[:, 0] <= x_max) & (objects_max[:, 0] >= x_min) &\
+            (objects_min[:, 1] <= y_max) & (objects_max[:, 1] >= y_min)
+
+        #bounding boxes of the masks
+        visible_masks = []
+        for _, _, mask in self.annotations.masks.items():
+            if len(mask) == 0:
+                visible_masks.append(False)
+                continue
+            mask_min = mask.min(axis=0)
+            mask_max = mask.max(axis=0)
+            visible_masks.append((mask_min[0] <= x_max) and (mask_max[0] >= x_min) and
+                                 (mask_min[1] <= y_max) and (mask_max[1] >= y_min))
+
+        return visible_objects, visible_masks
 
     def check_mode(self):
         self.master.object_canvas.check_mode()
         self.mode = self.master.object_canvas.mode
 
-    def draw_segment(self, image, segment, z, color):
+    def draw_segment(self, image, segment, z, color, offset=(0, 0)):
         """
         Draw segment on image
 
         Segments contains all the points which define the segment
 
-        z is the scale of the image relative to the original image
+        z is the scale of the image relative to the original image, offset is
+        the position of the image within the rescaled image
         """
         #rescale coordinates within segment
-        segment *= z
+        segment = segment * z - offset
 
         #round coordinates and draw segment on image
         segment = np.int64(segment).reshape((-1, 1, 2))
@@ -239,18 +427,20 @@ class AnnotationCanvas(GeneralImageCanvas):
                             thickness=self.settings.linewidth)
         return image
 
-    def draw_mask(self, image, mask, z, color):
+    def draw_mask(self, image, mask, z, color, offset=(0, 0)):
         """
         Draw mask on image
 
-        a mask is a polygon defined by a list of points
+        a mask is a polygon defined by a list of points, offset is the position
+        of the image within the rescaled image
         """
         #check if mask has enough points
         if len(mask) < 3:
             return image
 
         #rescale coordinates within mask
-        mask *= z
+        #(mask may be a view on the stored polygon, so it is not modified in place)
+        mask = mask * z - offset
 
         #round coordinates and draw mask on image
         mask = np.int64(mask).reshape((-1, 1, 2))
@@ -262,18 +452,20 @@ class AnnotationCanvas(GeneralImageCanvas):
 
         return image
 
-    def draw_skeleton(self, image, z, annotations, highlight=False):
+    def draw_skeleton(self, image, z, annotations, highlight=False, offset=(0, 0)):
         """
         Draw a skeleton on an image
 
-        z is the scale of the image relative to the original image
+        z is the scale of the image relative to the original image, offset is
+        the position of the image within the rescaled image
         """
+        offset = np.asarray(offset)
 
         #below, two totally independent for loops are defined
         #to assure the points are on top of the lines
         for j, _ in enumerate(self.skeleton.keypoints):
             if not np.isnan(annotations[2 * j]):
-                x, y = (annotations[2 * j: 2 * j + 2] * z).astype(int)
+                x, y = (annotations[2 * j: 2 * j + 2] * z - offset).astype(int)
 
                 #draw lines
                 parent_id = self.skeleton.parent[j]
@@ -282,7 +474,7 @@ class AnnotationCanvas(GeneralImageCanvas):
                     end_point = (x, y)
                     start_point = annotations[2 * parent_id:
                                               2 * parent_id + 2]
-                    start_point = tuple((start_point * z).astype(int))
+                    start_point = tuple((start_point * z - offset).astype(int))
                     color = self.skeleton.color[j]
                     cv2.line(image,
                              start_point,
@@ -292,7 +484,7 @@ class AnnotationCanvas(GeneralImageCanvas):
 
         for j, _ in enumerate(self.skeleton.keypoints):
             if not np.isnan(annotations[2 * j]):
-                x, y = (annotations[2 * j: 2 * j + 2] * z).astype(int)
+                x, y = (annotations[2 * j: 2 * j + 2] * z - offset).astype(int)
                 #draw points
                 color = self.skeleton.color[j]
                 cv2.circle(image,
@@ -325,7 +517,7 @@ class AnnotationCanvas(GeneralImageCanvas):
             #load the image (and annotations)
             self.load_image(filepath, full_path=True)
 
-    def load_image(self, filename, full_path=True):
+    def load_image(self, filename, full_path=True, frame_index=None):
         """
         Decisive method to load an image, together with it's annotations (if
         availabe)
@@ -336,6 +528,9 @@ class AnnotationCanvas(GeneralImageCanvas):
             DESCRIPTION.
         full_path : bool, optional
             DESCRIPTION. The default is True.
+        frame_index : int, optional
+            Index of the frame to load, if filename is a video. The default is
+            None (first frame).
         """
 
         #set wdir and image_name
@@ -351,13 +546,13 @@ class AnnotationCanvas(GeneralImageCanvas):
             wdir = self.wdir
             image_name = filename
 
-        #check if file is a valid image
-        if (len(image_name.split(".")) > 1) and \
-            image_name.split(".")[1] in ['jpg', 'png']:
+        #check if file is a valid image or video
+        if ((len(image_name.split(".")) > 1) and \
+            image_name.split(".")[1] in ['jpg', 'png']) or is_video(image_name):
 
             if self.annotations.currently_saved:
                 #annotations are saved (or there is currenlty no image shown)
-                self.import_image(image_name)
+                self.import_image(image_name, frame_index=frame_index)
             else:
                 #there are currently unsaved changes in the annotations
                 message = "do you want to save the annotation changes you made " +\
@@ -367,30 +562,44 @@ class AnnotationCanvas(GeneralImageCanvas):
                 if answer is True:
                     #Save changes
                     self.save()
-                    self.import_image(image_name)
+                    self.import_image(image_name, frame_index=frame_index)
                 elif answer is False:
                     #Discard changes
-                    self.import_image(image_name)
+                    self.import_image(image_name, frame_index=frame_index)
                 #else: #answer==None
                     #nothing has to be done
         else:
             #there was selected an object, but it was not a supported image
             tkmessagebox.showerror("Invalid file",
-                                   "Only files with the extension .jpg or .png are supported")
+                                   "Only files with the extension .jpg, .png, " +
+                                   ".mp4, .avi or .mov are supported")
 
-    def import_image(self, image_name):
+    def import_image(self, image_name, frame_index=None):
         """
         Executive method to import image and load annotations (if available)
         """
 
         #Update image
-        self.annotations.import_image(image_name)
+        #a reduced resolution preview that fills the canvas can be shown
+        #first, the full resolution image is swapped in when it is decoded
+        if self.settings.fast_preview:
+            preview_size = (self.winfo_width() - 2 * self.bd,
+                            self.winfo_height() - 2 * self.bd)
+        else:
+            preview_size = None
+        self.annotations.import_image(image_name, preview_size=preview_size,
+                                      frame_index=frame_index)
 
         #save image matrix also as an attribute in this object
         self.image = self.annotations.image
 
         #Update title of application
-        self.master.master.title("Kantool behaviour " + image_name)
+        if self.annotations.video is None:
+            self.master.master.title("Kantool behaviour " + image_name)
+        else:
+            self.master.master.title("Kantool behaviour " + image_name +
+                                     " (frame " + str(self.annotations.frame_index) +
+                                     "/" + str(len(self.annotations.video) - 1) + ")")
 
         #load data of objects and masks in object_canvas
         self.master.object_canvas.load_data()
@@ -409,9 +618,60 @@ class AnnotationCanvas(GeneralImageCanvas):
         if self.mode == 2:
             self.update_image(mode=3)
 
+        if self.annotations.full_image_future is not None:
+            self.after(10, lambda: self.swap_full_image(image_name))
+
+        #decode the neighbouring images once the current image is shown
+        self.after_idle(self.prefetch_images)
+
+    def swap_full_image(self, image_name):
+        """
+        Show the full resolution image instead of the preview once it is
+        decoded, otherwise check again later
+        """
+        if self.annotations.image_name != image_name:
+            #another image was loaded in the meantime
+            return
+
+        if self.annotations.swap_full_image():
+            self.image = self.annotations.image
+            self.update_image(mode=0)
+            if self.mode == 2:
+                self.update_image(mode=3)
+        elif self.annotations.full_image_future is not None:
+            self.after(10, lambda: self.swap_full_image(image_name))
+
+    def prefetch_images(self):
+        """
+        Decode the images around the current image in the background, in the
+        order in which they will probably be requested
+        """
+        if self.wdir is None or self.annotations.image_name is None:
+            return
+
+        if self.annotations.video is not None:
+            #neighbouring frames are decoded together with the current frame
+            return
+
+        #alternate between the images after and before the current image,
+        #starting in the direction of the last image switch
+        image_index = self.master.image_index
+        image_names = []
+        for i in range(1, self.settings.n_prefetch + 1):
+            for direction in [self.navigation_direction, -self.navigation_direction]:
+                image_name = image_index.neighbour(self.annotations.image_name,
+                                                   direction*i)
+                if image_name not in image_names and \
+                    image_name != self.annotations.image_name:
+                    image_names.append(image_name)
+
+        self.annotations.image_cache.prefetch(
+            [os.path.join(self.wdir, image_name) for image_name in image_names])
+
     def reload_image(self):
         if self.annotations.image_name is not None:
-            self.import_image(self.annotations.image_name)
+            self.import_image(self.annotations.image_name,
+                              frame_index=self.annotations.frame_index)
 
     def reset_parameters(self):
         """
@@ -422,7 +682,7 @@ class AnnotationCanvas(GeneralImageCanvas):
         self.zoom_delta_y = 0
         self.mouse_x = 0
         self.mouse_y = 0
-        self.image_inter_scale = 1.0
+        self.image_inter_viewport = None
 
         self.image = None
         self.image_inter = None
@@ -440,41 +700,56 @@ class AnnotationCanvas(GeneralImageCanvas):
 
         if self.wdir != None and self.annotations.image_name != None:
             #Check if there is an image loaded
+            self.navigation_direction = direction
+
+            if self.annotations.video is not None:
+                #step through the frames of the video
+                frame_index = self.annotations.frame_index +\
+                    direction * self.settings.video_frame_step
+                frame_index = max(min(frame_index, len(self.annotations.video) - 1), 0)
+                if frame_index != self.annotations.frame_index:
+                    self.load_image(self.annotations.image_name, full_path=False,
+                                    frame_index=frame_index)
+                return
 
-            #list all files within working directory
-            files = np.array(os.listdir(self.wdir))
-
-            #get index of current image
-            file_number = np.argmax(files == self.annotations.image_name)
-
-            #look for next/previous image
-            keep_looking = True
-            while keep_looking is True:
-                if file_number == len(files) - 1:
-                    if direction == 1:
-                        file_number = 0
-                    else:
-                        file_number += direction
-                elif file_number == 0:
-                    if direction == -1:
-                        file_number = len(files) - 1
-                    else:
-                        file_number += direction
-                else:
-                    file_number += direction
-
-                image_name = files[file_number]
-
-                #check if file extension is correct
-                if (len(image_name.split(".")) > 1) and\
-                    (image_name.split(".")[1] in ['jpg', 'png']):
-                    keep_looking = False
-                    #remark: if current image is the only image in the
-                    #folder, the while loop will be ended once we
-                    #re-encounter the name of the current image
+            #look for next/previous image in the image index
+            image_name = self.master.image_index.neighbour(self.annotations.image_name,
+                                                           direction)
 
             #load image
-            self.load_image(image_name, full_path=False)
+            if image_name is not None:
+                self.load_image(image_name, full_path=False)
+
+    def go_to_frame(self):
+        """
+        Ask for a frame index and load that frame of the current video
+        """
+        if self.annotations.video is None:
+            return
+
+        n_frames = len(self.annotations.video)
+        dialog = AskStringDialog(master=self,
+                                 title="Go to frame",
+                                 prompt="Frame (0 - " + str(n_frames - 1) + "):",
+                                 initial_value=str(self.annotations.frame_index))
+        if dialog.string_input is None:
+            #dialog was cancelled
+            return
+
+        try:
+            frame_index = int(dialog.string_input)
+        except ValueError:
+            tkmessagebox.showerror("Invalid frame",
+                                   dialog.string_input + " is not a frame number")
+            return
+
+        if not 0 <= frame_index < n_frames:
+            tkmessagebox.showerror("Invalid frame",
+                                   "The video has frames 0 to " + str(n_frames - 1))
+            return
+
+        self.load_image(self.annotations.image_name, full_path=False,
+                        frame_index=frame_index)
 
     def save(self):
         """
@@ -500,7 +775,7 @@ class AnnotationCanvas(GeneralImageCanvas):
             self.mouse_y = max(min(self.mouse_y, self.image_shown.shape[0]), 0)
 
         if self.annotations.image is not None:
-            self.update_image(mode=2)
+            self.request_redraw(mode=2)
 
     def motion_b1(self, event):
         """
@@ -545,7 +820,7 @@ class AnnotationCanvas(GeneralImageCanvas):
             self.mouse_y = max(min(self.mouse_y, self.image_shown.shape[0]), 0)
 
         #update the shown image
-        self.update_image(mode=1)
+        self.request_redraw(mode=1)
 
     def update_point_mask(self, event):
 
@@ -566,7 +841,7 @@ class AnnotationCanvas(GeneralImageCanvas):
         self.annotations.update_point_mask(x, y)
 
         #update the shown image
-        self.update_image(mode=1)
+        self.request_redraw(mode=1)
 
     def activate_next_keypoint_searching(self):
         """
@@ -615,8 +890,8 @@ class AnnotationCanvas(GeneralImageCanvas):
                 return
 
             #get image dimensions
-            h_img = self.annotations.image.shape[0]
-            w_img = self.annotations.image.shape[1]
+            h_img = self.annotations.image_shape[0]
+            w_img = self.annotations.image_shape[1]
 
             #check if a valid point was added
             if (x > w_img) or (y > h_img):
@@ -631,13 +906,14 @@ class AnnotationCanvas(GeneralImageCanvas):
         elif self.mode == 0:
             #annotation canvas is in keypoint annotation mode
 
+            sensitivity = self.settings.reactivation_sensitivity / s
             object_id, keypoint_id, min_distance =\
-                self.annotations.closest_keypoint(location)
+                self.annotations.closest_keypoint(location, radius=sensitivity)
 
             if object_id is not None:
-                #object_id will be None if no object or keypoint was yet declared
+                #object_id will be None if no keypoint lies within the
+                #re-activation sensitivity
 
-                sensitivity = self.settings.reactivation_sensitivity / s
                 if (not np.isnan(min_distance)) and\
                     (min_distance < sensitivity):
 
@@ -672,13 +948,14 @@ class AnnotationCanvas(GeneralImageCanvas):
             #behaviour mode
 
             #activate whole object if applicable
+            sensitivity = self.settings.reactivation_sensitivity / s
             object_id, keypoint_id, min_distance =\
-                self.annotations.closest_keypoint(location)
+                self.annotations.closest_keypoint(location, radius=sensitivity)
 
             if object_id is not None:
-                #object_id will be None if no object or keypoint was yet declared
+                #object_id will be None if no keypoint lies within the
+                #re-activation sensitivity
 
-                sensitivity = self.settings.reactivation_sensitivity / s
                 if (not np.isnan(min_distance)) and\
                     (min_distance < sensitivity):
 
@@ -872,6 +1149,7 @@ class AnnotationCanvas(GeneralImageCanvas):
 
         #reset annotation_canvas
         self.reset_parameters()
+        self.annotations.close_video()
         self.image = None
         self.image_inter = None
         self.image_shown = None
@@ -896,7 +1174,8 @@ class AnnotationCanvas(GeneralImageCanvas):
                 self.save()
 
             #re-import image
-            self.import_image(self.annotations.image_name)
+            self.import_image(self.annotations.image_name,
+                              frame_index=self.annotations.frame_index)
 
     def motion(self, event):
         """
@@ -946,7 +1225,7 @@ class AnnotationCanvas(GeneralImageCanvas):
         y = (event.y + self.zoom_delta_y - self.bd) / s
 
         #limit coordinates to size image
-        x = max(min(x, self.annotations.image.shape[1] - 1), 0)
-        y = max(min(y, self.annotations.image.shape[0] - 1), 0)
+        x = max(min(x, self.annotations.image_shape[1] - 1), 0)
+        y = max(min(y, self.annotations.image_shape[0] - 1), 0)
 
         return (x, y)
\ No newline at end of file
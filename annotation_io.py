@@ -0,0 +1,378 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 15:20:52 2026
+
+@author: Maarten
+
+Functions to convert the per-image .json annotation files to the array based
+annotation model (KeypointStore, MaskStore) and back
+"""
+#%% packages
+import os
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+import numpy as np
+
+#%%
+def _index_keys(attribute_dict):
+    """
+    Convert the keys of an attribute dictionary ({"0": ..., "1": ...}) to an
+    integer array, together with the corresponding values
+    """
+    keys = np.fromiter((int(key) for key in attribute_dict.keys()),
+                       dtype=np.int64,
+                       count=len(attribute_dict))
+    values = list(attribute_dict.values())
+    return keys, values
+
+def parse_annotations(data_dict, keypoint_names):
+    """
+    Parse the content of a .json annotation file
+
+    The keypoint coordinates, names, behaviours and locations of the objects
+    are aligned on their object index with vectorised set operations. Objects
+    missing in one of the attributes get NaN coordinates or None attributes
+
+    Parameters
+    ----------
+    data_dict : dict
+        Content of a .json annotation file
+    keypoint_names : list
+        Names of the keypoints of the skeleton
+
+    Returns
+    -------
+    keypoints : numpy array (n_objects, n_keypoints, 2)
+        Keypoint coordinates, ordered according to keypoint_names
+    names : numpy array (n_objects), dtype object
+        Names of the objects
+    behaviours : numpy array (n_objects), dtype object
+        Behaviours of the objects
+    locations : numpy array (n_objects), dtype object
+        Locations of the objects
+    """
+    n_keypoints = len(keypoint_names)
+
+    #number of objects with keypoint annotations
+    dict_keypoints = data_dict.get("keypoints", {})
+    n_annotated = max([len(item) for item in dict_keypoints.values()], default=0)
+    if "keypoints" not in data_dict:
+        #an image without keypoint annotations has one preallocated object
+        n_annotated = 1
+    annotated_indices = np.arange(n_annotated)
+
+    #object indices of all attributes
+    if "behaviour" in data_dict:
+        behaviour_indices, behaviour_values = _index_keys(data_dict["behaviour"]["behaviour"])
+    else: #no behaviour annotations available
+        behaviour_indices, behaviour_values = annotated_indices, [None] * n_annotated
+
+    if "names" in data_dict:
+        name_indices, name_values = _index_keys(data_dict["names"]["name"])
+    else:
+        #create generic names for objects
+        name_indices, name_values = annotated_indices, [str(i) for i in annotated_indices]
+
+    if "locations" in data_dict:
+        location_indices, location_values = _index_keys(data_dict["locations"]["location"])
+    else:
+        #create generic locations for objects
+        location_indices, location_values = annotated_indices, [str(i) for i in annotated_indices]
+
+    #harmonise all attributes: the objects are the union of all object indices
+    indices = np.union1d(annotated_indices,
+                         np.union1d(behaviour_indices,
+                                    np.union1d(name_indices, location_indices)))
+    n_objects = len(indices)
+
+    #keypoint coordinates
+    keypoints = np.full(shape=(n_objects, n_keypoints, 2),
+                        fill_value=np.nan)
+    rows = np.searchsorted(indices, annotated_indices)
+    for j, keypoint in enumerate(keypoint_names):
+        item = dict_keypoints.get(keypoint)
+        if item is not None and len(item) > 0:
+            coordinates = np.array(item, dtype=float).reshape(-1, 2)
+            keypoints[rows[:len(coordinates)], j] = coordinates
+
+    #object attributes
+    attributes = []
+    for attribute_indices, attribute_values in [(name_indices, name_values),
+                                                (behaviour_indices, behaviour_values),
+                                                (location_indices, location_values)]:
+        attribute = np.full(shape=(n_objects,), fill_value=None, dtype=object)
+        values = np.empty(shape=(len(attribute_values),), dtype=object)
+        values[:] = attribute_values
+        attribute[np.searchsorted(indices, attribute_indices)] = values
+        attributes.append(attribute)
+    names, behaviours, locations = attributes
+
+    return keypoints, names, behaviours, locations
+
+def parse_masks(masks):
+    """
+    Parse the masks of a .json annotation file in a single pass
+
+    Parameters
+    ----------
+    masks : dict
+        "masks" entry of a .json annotation file
+
+    Returns
+    -------
+    names : list
+        Names of the masks
+    lengths : numpy array (n_masks)
+        Number of vertices of every mask
+    vertices : numpy array (n_vertices, 2)
+        Vertices of all masks, concatenated
+    """
+    names = []
+    lengths = np.empty(shape=(len(masks),), dtype=np.int64)
+    coordinates = []
+
+    for i, (key, mask) in enumerate(masks.items()):
+        if 'name' in mask:
+            names.append(mask["name"])
+        else:
+            #this case is present to keep compatability with annotations
+            #made with a previous version of CoBRA annotation tool
+            names.append(key)
+
+        points = mask["points"].values()
+        lengths[i] = len(points)
+        for point in points:
+            coordinates.append(point["x"])
+            coordinates.append(point["y"])
+
+    vertices = np.array(coordinates, dtype=float).reshape(-1, 2)
+
+    return names, lengths, vertices
+
+def load_annotation_file(path):
+    """
+    Read a .json annotation file
+
+    Parameters
+    ----------
+    path : str
+        Path of the .json file
+
+    Returns
+    -------
+    dict
+        Content of the .json file
+    """
+    with open(path) as f:
+        return json.load(f)
+
+def annotations_to_dict(keypoints, keypoint_names, names, behaviours):
+    """
+    Convert the keypoint annotations of an image to the .json schema
+
+    Parameters
+    ----------
+    keypoints : numpy array (n_objects, n_keypoints, 2)
+        Keypoint coordinates, ordered according to keypoint_names
+    keypoint_names : list
+        Names of the keypoints of the skeleton
+    names : sequence (n_objects)
+        Names of the objects
+    behaviours : sequence (n_objects)
+        Behaviours of the objects
+
+    Returns
+    -------
+    dict
+        "keypoints", "behaviour" and "names" entries of a .json annotation file
+    """
+    #round all coordinates at once, then convert them per keypoint
+    coordinates = np.asarray(keypoints, dtype=float).round(2)
+    coordinates = np.swapaxes(coordinates, 0, 1).tolist()
+
+    data_dict = {}
+    data_dict["keypoints"] = dict(zip(keypoint_names, coordinates))
+    data_dict["behaviour"] = {"behaviour": dict(enumerate(behaviours))}
+    data_dict["names"] = {"name": dict(enumerate(names))}
+
+    return data_dict
+
+def masks_to_dict(ids, names, lengths, vertices):
+    """
+    Convert masks to the .json schema
+
+    Parameters
+    ----------
+    ids : list
+        Identifiers of the masks
+    names : list
+        Names of the masks
+    lengths : array-like (n_masks)
+        Number of vertices of every mask
+    vertices : numpy array (n_vertices, 2)
+        Vertices of all masks, concatenated in the order of ids
+
+    Returns
+    -------
+    dict
+        "masks" entry of a .json annotation file
+    """
+    #round and convert all vertices at once
+    x, y = np.asarray(vertices, dtype=float).round(2).T.tolist()
+
+    masks_dict = {}
+    start = 0
+    for mask_id, name, length in zip(ids, names, lengths):
+        stop = start + int(length)
+        points_dict = {i: {"x": xi, "y": yi} for i, (xi, yi) in
+                       enumerate(zip(x[start:stop], y[start:stop]))}
+        masks_dict[mask_id] = {"name": name,
+                               "points": points_dict}
+        start = stop
+
+    return masks_dict
+
+def dump_annotation_file(path, data_dict, compact=False, indent=3):
+    """
+    Write a .json annotation file
+
+    Parameters
+    ----------
+    path : str
+        Path of the .json file
+    data_dict : dict
+        Content of the .json file
+    compact : bool, optional
+        If True, the file is written without indentation and whitespace.
+        The default is False.
+    indent : int, optional
+        Indentation of the non-compact output. The default is 3.
+    """
+    #encode the complete document first: json.dumps uses the C encoder for
+    #compact output, json.dump would encode it chunk by chunk in Python
+    if compact:
+        text = json.dumps(data_dict, separators=(",", ":"))
+    else:
+        text = json.dumps(data_dict, indent=indent)
+
+    #write to a temporary file first, so a reader (e.g. a prefetch thread of
+    #the image cache) never sees a partially written file
+    temporary_path = path + ".tmp"
+    with open(temporary_path, 'w') as f:
+        f.write(text)
+    os.replace(temporary_path, path)
+
+class AnnotationWriter():
+    """
+    Writes .json annotation files on a background thread, so saving doesn't
+    block the user interface
+
+    Files are written one at a time, in the order they were submitted. Before
+    an annotation file is read again, self.wait should be called with its path,
+    so the latest version is read. Writes which failed are kept until they are
+    collected with self.pop_errors (or raised by self.wait)
+
+    Methods
+    -----
+    self.submit
+        Schedule writing a .json annotation file
+
+    self.wait
+        Wait until pending writes are finished
+
+    self.pop_errors
+        Collect the writes which failed
+    """
+
+    def __init__(self):
+
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._lock = threading.Lock()
+        self._pending = {} #path -> future of the latest write to path
+
+    def submit(self, path, data_dict, compact=False):
+        """
+        Schedule writing data_dict to path
+
+        data_dict is owned by the writer from now on and shouldn't be modified
+
+        Parameters
+        ----------
+        path : str
+            Path of the .json file
+        data_dict : dict
+            Content of the .json file
+        compact : bool, optional
+            If True, the file is written without indentation. The default is
+            False.
+        """
+        future = self._executor.submit(dump_annotation_file, path, data_dict, compact)
+        with self._lock:
+            self._pending[path] = future
+        future.add_done_callback(lambda future: self._done(path, future))
+
+    def _done(self, path, future):
+        """
+        Forget a finished write, unless a newer write to path was submitted
+        """
+        #failed writes are kept, so their exception is raised by self.wait
+        with self._lock:
+            if self._pending.get(path) is future and future.exception() is None:
+                del self._pending[path]
+
+    def wait(self, path=None, raise_errors=True):
+        """
+        Wait until the pending write to path (or all pending writes if path is
+        None) is finished. Exceptions raised while writing are re-raised here
+
+        Parameters
+        ----------
+        path : str, optional
+            Path of the .json file. The default is None.
+        raise_errors : bool, optional
+            If False, failed writes aren't raised but kept for
+            self.pop_errors. The default is True.
+        """
+        with self._lock:
+            if path is None:
+                futures = list(self._pending.values())
+            else:
+                futures = [self._pending[path]] if path in self._pending else []
+
+        if not raise_errors:
+            wait_futures(futures)
+            return
+
+        for future in futures:
+            try:
+                future.result()
+            finally:
+                self._done_waiting(future)
+
+    def _done_waiting(self, future):
+        """
+        Forget a write once its result was collected by self.wait
+        """
+        with self._lock:
+            for path, pending in list(self._pending.items()):
+                if pending is future:
+                    del self._pending[path]
+
+    def pop_errors(self):
+        """
+        Collect the finished writes which failed, they are forgotten
+
+        Returns
+        -------
+        list
+            (path, exception) of every failed write
+        """
+        with self._lock:
+            errors = [(path, future.exception())
+                      for path, future in self._pending.items()
+                      if future.done() and future.exception() is not None]
+            for path, _ in errors:
+                del self._pending[path]
+
+        return errors
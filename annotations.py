@@ -8,13 +8,17 @@ Definition of the Annotations class. The Annotation class contains all annotatio
 data and methods to modify these data.
 """
 #%% packages
-import os
-import json
 import numpy as np
-import cv2
-import pandas as pd
 import tkinter.messagebox as tkmessagebox
 
+from keypoint_store import KeypointStore
+from mask_store import MaskStore
+from annotation_io import parse_annotations, parse_masks, annotations_to_dict,\
+    masks_to_dict, load_annotation_file, AnnotationWriter
+from image_cache import ImageCache
+from image_pyramid import ImagePyramid
+from video_source import VideoFrameSource, is_video, sidecar_name
+
 #%%
 class Annotations():
     """
@@ -29,7 +33,6 @@ class Annotations():
         self.currently_saved = True #saved status
         self.point_active = False #is there an active point?
         self.skeleton = master.skeleton
-        self.annotations = None
         self.marginal_keypoint_index = -1
         self.keypoint_index = 0
         self.object = 0
@@ -40,6 +43,17 @@ class Annotations():
 
         self.image_name = None #image name
         self.image = None #image matrix
+        self.image_shape = None #shape of the full resolution image
+        #self.image can temporarily be a reduced resolution preview, all
+        #coordinates are expressed in pixels of the full resolution image
+        self.image_pyramid = None #pyramid of self.image, used for zooming
+        self.full_image_future = None #future of the full resolution image
+
+        #frames of videos are annotated like images, image_name is then the
+        #name of the video
+        self.video = None #VideoFrameSource of the open video
+        self.frame_index = None #index of the annotated frame
+        self.video_annotations = {} #content of the sidecar of the video
 
         self.keypoint_index_memory = 0
         self.keypoint_reactivated = False
@@ -48,130 +62,89 @@ class Annotations():
 
         self.mask_id = 0 #id of the currently active mask
 
-        #names of objects
-        self.names = pd.DataFrame(data=[["0"]],
-                                  columns=["name"])
+        #keypoints, names, behaviours and locations of objects
+        self.objects = None
+        self.__reset_objects()
 
         #points of current masks
         self.points_mask = np.empty(shape=(0,2))
         #masks are defined as polygons
 
-        #all points of masks
-        self.annotation_points_masks = pd.DataFrame(data=None,
-                                               columns=["obj", "x", "y"])
-
-        #names of masks
-        self.names_masks = pd.DataFrame(data=None,
-                                        columns=["obj", "name"])
+        #identifiers, names and points of all confirmed masks
+        self.masks = MaskStore()
 
-        #locations
-        self.locations = pd.DataFrame(data=[[None]],
-                                      columns=["location"])
+        #annotation files are written in the background
+        self.writer = AnnotationWriter()
 
-        #behaviours
-        self.behaviours = pd.DataFrame(data=[[None]],
-                                       columns=["behaviour"])
+        #decoded images and their annotations
+        settings = master.settings
+        self.image_cache = ImageCache(max_bytes=settings.image_cache_size*2**20)
 
-    def import_image(self, image_name):
+    def import_image(self, image_name, preview_size=None, frame_index=None):
         """
         Executive method to import image and load annotations (if available)
+
+        Parameters
+        ----------
+        image_name : str
+            Name of the image or video
+        preview_size : tuple, optional
+            (width, height) of the canvas. If given, a reduced resolution
+            preview which fills the canvas can be imported first, the full
+            resolution image is decoded in the background and swapped in with
+            self.swap_full_image. Not used for videos. The default is None.
+        frame_index : int, optional
+            Index of the frame, if image_name is a video. The default is None
+            (first frame).
         """
 
         #reset parameters
         self.reset_parameters()
         self.reset_masks()
 
-        #import image
-        image = cv2.imread(image_name)
-        self.image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        if is_video(image_name):
+            #import frame and annotations of the frame
+            if (self.video is None) or (self.video.path != image_name):
+                self.open_video(image_name)
+            self.frame_index = 0 if frame_index is None else frame_index
+            self.image = self.video.read(self.frame_index)
+            self.image_shape = self.image.shape
+            data_dict = self.video_annotations.get(str(self.frame_index))
+        else:
+            self.close_video()
+
+            #make sure a pending save of this image is finished, a failed save
+            #is reported below
+            json_name = image_name.split(".")[0] + ".json"
+            self.writer.wait(json_name, raise_errors=False)
+
+            #import image and annotations (from the cache if possible)
+            if preview_size is None:
+                self.image, data_dict = self.image_cache.get(image_name)
+                self.image_shape = self.image.shape
+            else:
+                self.image, data_dict, self.image_shape, self.full_image_future = \
+                    self.image_cache.get_preview(image_name, *preview_size)
         self.image_name = image_name
 
+        #build the lower resolution levels used for zooming in the background
+        self.image_pyramid = ImagePyramid(self.image, shape=self.image_shape)
+        if self.full_image_future is None:
+            self.image_pyramid.build_async()
+
         #import annotations (if they exist)
-        if image_name.split(".")[0] + ".json" in os.listdir():
-            #read json
-            with open(image_name.split(".")[0] + ".json") as f:
-                data_dict = json.load(f)
-
-            #import keypoint annotations
-            if "keypoints" in data_dict:
-                dict_keypoints = {}
-                for key, item in data_dict["keypoints"].items():
-                    coordinates = np.array(item)
-                    dict_keypoints[key + "_x"] = coordinates[:,0].tolist()
-                    dict_keypoints[key + "_y"] = coordinates[:,1].tolist()
-
-                self.annotations = pd.DataFrame(dict_keypoints)
-                del dict_keypoints
-
-            #import behaviour annotations
-            if "behaviour" in data_dict:
-                self.behaviours = pd.DataFrame(data_dict["behaviour"])
-                self.behaviours.index = self.behaviours.index.astype(int)
-            else: #no behaviour annotations available
-                dict_behaviours = {"behaviour": [None for _ in self.annotations.index]}
-                self.behaviours = pd.DataFrame(dict_behaviours)
-                del dict_behaviours
-
-            #import names
-            if "names" in data_dict:
-                self.names = pd.DataFrame(data_dict["names"])
-                self.names.index = self.names.index.astype(int)
-            else:
-                #create generic names for objects
-                names_array = np.arange(len(self.annotations.index))
-                names_dict = {"name": [str(i) for i in names_array]}
-                self.names = pd.DataFrame(names_dict)
-
-            #import locations
-            if "locations" in data_dict:
-                self.locations =data_dict["locations"]
-                self.locations.index = self.locations.index.astype(int)
-            else:
-                #create generic locations for objects
-                locations_array = np.arange(len(self.annotations.index))
-                locations_dict = {"location": [str(i) for i in locations_array]}
-                self.locations = pd.DataFrame(locations_dict)
-
-            #harmonise all data containing attributes
-            #if an object is not simultaneously present in self.annotations,
-            #self.behaviours, self.names and self.locations, missing records
-            #are added to the relevant dataframe
-            indices = np.unique(np.array(list(self.annotations.index) +\
-                                        list(self.behaviours.index) +\
-                                        list(self.names.index) +\
-                                        list(self.locations.index)))
-
-            for i in indices:
-                if i not in self.annotations.index:
-                    df_newline = pd.DataFrame(data=[[None] * len(self.annotations.columns)],
-                                             index=[i],
-                                             columns=self.annotations.columns)
-                    self.annotations = pd.concat([self.annotations,
-                                                  df_newline])
-                if i not in self.behaviours.index:
-                    df_newline = pd.DataFrame(data=[[None] * len(self.behaviours.columns)],
-                                             index=[i],
-                                             columns=self.behaviours.columns)
-                    self.behaviours = pd.concat([self.behaviours,
-                                                  df_newline])
-                if i not in self.names.index:
-                    df_newline = pd.DataFrame(data=[[None] * len(self.names.columns)],
-                                             index=[i],
-                                             columns=self.names.columns)
-                    self.names = pd.concat([self.names,
-                                                  df_newline])
-                if i not in self.locations.index:
-                    df_newline = pd.DataFrame(data=[[None] * len(self.locations.columns)],
-                                             index=[i],
-                                             columns=self.locations.columns)
-                    self.locations = pd.concat([self.locations,
-                                                  df_newline])
-
-            #sort all dataframes
-            self.annotations.sort_index(inplace=True)
-            self.behaviours.sort_index(inplace=True)
-            self.names.sort_index(inplace=True)
-            self.locations.sort_index(inplace=True)
+        if data_dict is not None:
+            #parse keypoint annotations, behaviours, names and locations in
+            #a single pass
+            keypoints, names, behaviours, locations = \
+                parse_annotations(data_dict, self.skeleton.keypoints)
+
+            #fill the keypoint store
+            self.objects.clear()
+            self.objects.extend(keypoints=keypoints,
+                                names=names,
+                                behaviours=behaviours,
+                                locations=locations)
 
             #remove nan objects
             self.remove_nan_objects()
@@ -184,6 +157,66 @@ class Annotations():
                 #reset all mask related attributes to their default value
                 self.reset_masks()
 
+        #report saves which failed (after the reset of the saved status, so a
+        #failed save of this image marks it as not saved)
+        self.report_write_errors()
+
+    def open_video(self, video_name):
+        """
+        Open a video and load the annotations of its frames (if available)
+
+        Parameters
+        ----------
+        video_name : str
+            Name of the video
+        """
+        self.close_video()
+
+        self.video = VideoFrameSource(
+            video_name,
+            max_bytes=self.master.settings.video_cache_size*2**20)
+
+        #make sure a pending save of the sidecar is finished, a failed save is
+        #reported by import_image
+        json_name = sidecar_name(video_name)
+        self.writer.wait(json_name, raise_errors=False)
+        try:
+            self.video_annotations = load_annotation_file(json_name)
+        except FileNotFoundError:
+            self.video_annotations = {}
+
+    def close_video(self):
+        """
+        Close the open video (if any)
+        """
+        if self.video is not None:
+            self.video.release()
+        self.video = None
+        self.frame_index = None
+        self.video_annotations = {}
+
+    def swap_full_image(self):
+        """
+        Replace the reduced resolution preview by the full resolution image,
+        once the full resolution image is decoded
+
+        Returns
+        -------
+        bool
+            True if the preview was replaced
+        """
+        if (self.full_image_future is None) or (not self.full_image_future.done()):
+            return False
+
+        #the decoded image was stored in the cache
+        self.full_image_future = None
+        self.image, _ = self.image_cache.get(self.image_name)
+
+        self.image_pyramid = ImagePyramid(self.image)
+        self.image_pyramid.build_async()
+
+        return True
+
     def reset_parameters(self):
         """
         Reset attributes to their default value
@@ -192,40 +225,34 @@ class Annotations():
         self.currently_saved = True
 
         self.image = None
+        self.image_shape = None
+        self.image_pyramid = None
+        self.full_image_future = None
         self.image_name = None
 
         self.object = 0
         self.keypoint_index = 0
         self.marginal_keypoint_index = -1
 
-        self.__reset_dataframes()
-
-    def __reset_dataframes(self):
+        self.__reset_objects()
 
-        #reset annotations
-        if self.skeleton.n_keypoints > 0:
-            columns = []
-            for name in self.skeleton.keypoints:
-                columns.append(name + "_x")
-                columns.append(name + "_y")
+    def __reset_objects(self):
+        """
+        Reset the keypoint store to a single preallocated object
+        """
+        n_keypoints = self.skeleton.n_keypoints
+        if n_keypoints is None:
+            #there is currently no project loaded
+            n_keypoints = 0
 
-            self.annotations = pd.DataFrame(columns=columns,
-                                            index=[0],
-                                            dtype=float)
+        if (self.objects is None) or (self.objects.n_keypoints != n_keypoints):
+            #the number of keypoints of the skeleton changed
+            self.objects = KeypointStore(n_keypoints=n_keypoints)
         else:
-            self.annotations = None
-
-        #reset names
-        self.names = pd.DataFrame(data=[["0"]],
-                                  columns=["name"])
-
-        #reset behaviours
-        self.behaviours = pd.DataFrame(data=[[None]],
-                                       columns=["behaviour"])
+            #re-use the allocated arrays
+            self.objects.clear()
 
-        #reset locations
-        self.locations = pd.DataFrame(data=[[None]],
-                                      columns=["location"])
+        self.objects.append(name="0")
 
     def reset_masks(self):
         """
@@ -233,75 +260,29 @@ class Annotations():
         """
         self.mask_id = 0 #id current mask
         self.points_mask = np.empty(shape=(0,2)) #current mask
-        self.annotation_points_masks = pd.DataFrame(data=None,
-                                               columns=["obj", "x", "y"])
-        self.names_masks = pd.DataFrame(data=None,
-                                        columns=["obj", "name"])
+        self.masks.clear()
 
     def load_masks(self, masks):
         """
         load masks
         """
 
-        #write data in masks to right attribute dataframes of self
-        self.mask_id = 0
-        for i in masks.keys():
-            mask = masks[i]
-
-            #add name to self.names
-            df = self.names_masks
-            if 'name' in mask:
-                new_mask = pd.DataFrame(data=[[self.mask_id, mask["name"]]],
-                                      columns=df.columns)
-            else:
-                #this case is present to keep compatability with annotations
-                #made with a previous version of CoBRA annotation tool
-                new_mask = pd.DataFrame(data=[[self.mask_id, i]],
-                                      columns=df.columns)
-            df = pd.concat([df, new_mask],
-                           ignore_index=True)
-            self.names_masks = df
-
-            #add points to self.annotation_points_masks
-            points_dict = mask["points"]
-            points = []
-            for j in points_dict.keys():
-                x = points_dict[j]["x"]
-                y = points_dict[j]["y"]
-                points.append([x, y])
-            points = pd.DataFrame(data=points,
-                              columns=["x", "y"])
-            points["obj"] = self.mask_id
-            if len(self.annotation_points_masks) == 0:
-                self.annotation_points_masks = points
-            else:
-                self.annotation_points_masks = \
-                    pd.concat([self.annotation_points_masks, points],
-                              ignore_index=True)
+        #write data in masks to self.masks
+        #masks get consecutive identifiers, starting from zero
+        names, lengths, vertices = parse_masks(masks)
+        self.masks.load(ids=range(len(names)),
+                        names=names,
+                        lengths=lengths,
+                        vertices=vertices)
 
-            #increase self.mask_id with 1
-            self.mask_id += 1
+        #set self.mask_id to the id of the next mask
+        self.mask_id = len(names)
 
     def remove_nan_objects(self):
         """
         Remove all objects without keypoints
         """
-        #get indices of empty objects
-        nan_objects = self.annotations.isnull().all(axis=1).to_numpy()
-
-        #remove empty objects
-        self.annotations = self.annotations.loc[~nan_objects,]
-        self.names = self.names.loc[~nan_objects,:]
-        self.behaviours = self.behaviours.loc[~nan_objects,:]
-        self.locations = self.locations.loc[~nan_objects,:]
-
-        #the tilde inverts the boolean array
-
-        #reset dataframe indices
-        self.annotations.reset_index(drop=True, inplace=True)
-        self.behaviours.reset_index(drop=True, inplace=True)
-        self.names.reset_index(drop=True, inplace=True)
-        self.locations.reset_index(drop=True, inplace=True)
+        self.objects.remove_empty_objects()
 
     def new_object(self):
         """
@@ -320,40 +301,14 @@ class Annotations():
         #remove all objects with only NaN coordinates
         self.remove_nan_objects()
 
-        #Add new row for new object
-        df = self.annotations
-        new_row = pd.DataFrame(columns=df.columns,
-                               index=[0],
-                               dtype=float)
-        df = pd.concat([df, new_row], ignore_index=True)
-        self.annotations = df
-
-        self.object = self.annotations.shape[0] - 1
-        #Python is zero based, so to get the index of the last object,
-        #we call the number of objects and substract one
-
-        #add new generic name to self.names
-        if len(self.names) > 0:
-            new_name = str(int(self.names["name"].iloc[-1]) + 1)
-            new_row = pd.DataFrame(data=[[new_name]],
-                                   columns=["name"])
-            self.names = pd.concat([self.names, new_row],
-                                   ignore_index=True)
-        else: #len(self.names) == 0:
-            self.names = pd.DataFrame(data=[['0']],
-                                      columns=['name'])
-
-        #add new line to self.behaviours
-        dict_object = {"behaviour": [None]}
-        df_object = pd.DataFrame(dict_object)
-        self.behaviours = pd.concat([self.behaviours, df_object],
-                                    ignore_index=True)
-
-        #add new line to self.locations
-        dict_object = {"location": [None]}
-        df_object = pd.DataFrame(dict_object)
-        self.locations = pd.concat([self.locations, df_object],
-                                    ignore_index=True)
+        #generic name for the new object
+        if len(self.objects) > 0:
+            new_name = str(int(self.objects.names[-1]) + 1)
+        else: #len(self.objects) == 0:
+            new_name = "0"
+
+        #add new object (all keypoints NaN)
+        self.object = self.objects.append(name=new_name)
 
         #update state booleans
         self.keypoint_reactivated = False
@@ -367,51 +322,25 @@ class Annotations():
             #a mask can be only confirmed if it has at least 3 points
 
             #save mask
-            if self.mask_id in self.names_masks["obj"]:
+            if self.mask_id in self.masks:
                 #adapted mask
 
-                #update self.annotation_points_masks
-                indices_to_drop = self.annotation_points_masks.\
-                    loc[self.annotation_points_masks["obj"] == self.mask_id,].index
-                self.annotation_points_masks = self.annotation_points_masks.drop(indices_to_drop)
-
-                points = pd.DataFrame(data=self.points_mask,
-                                      columns=["x", "y"])
-
-                points["obj"] = self.mask_id
-
-                self.annotation_points_masks = \
-                    pd.concat([self.annotation_points_masks, points],
-                              ignore_index=True)
+                #only the vertices of this mask are replaced
+                self.masks.set_polygon(self.mask_id, self.points_mask)
                 self.points_mask = np.empty(shape=(0,2))
 
             else:
                 #new mask
 
-                #save name of mask (default)
-                dict_name = {'obj': [self.mask_id],
-                             'name': [self.mask_id]}
-
-                df_name = pd.DataFrame.from_dict(dict_name)
-
-                self.names_masks = pd.concat([self.names_masks, df_name],
-                                             ignore_index=True)
-
-                #add self.points to self.annotation_points
-                points = pd.DataFrame(data=self.points_mask,
-                                      columns=["x", "y"])
-                points["obj"] = self.mask_id
-
-                self.annotation_points_masks = \
-                    pd.concat([self.annotation_points_masks, points],
-                              ignore_index=True)
+                #add mask with default name (its identifier)
+                self.masks.add(self.mask_id, self.mask_id, self.points_mask)
                 self.points_mask = np.empty(shape=(0,2))
 
                 #add object to listbox of object_canvas
-                self.master.object_canvas.add_mask(dict_name["name"])
+                self.master.object_canvas.add_mask([self.mask_id])
 
             #set self.obj_id to object id of next object
-            self.mask_id = self.names_masks["obj"].max() + 1
+            self.mask_id = self.masks.next_id
 
             #set current_mask_confirmed state to True
             self.current_mask_confirmed = True
@@ -420,7 +349,7 @@ class Annotations():
             #the current active mask is not valid (0, 1 or 2 points)
             #remove_uncomplete is true -> remove this mask
 
-            if self.mask_id in self.names_masks["obj"]:
+            if self.mask_id in self.masks:
                 #adapted mask
 
                 #remove mask completely
@@ -432,13 +361,8 @@ class Annotations():
                 self.points_mask = np.empty(shape=(0,2))
 
             #set self.obj_id to object id of next object
-            if len(self.names_masks) == 0:
-                #there is not (yet) a mask defined
-                #set mask_id to 0
-                self.mask_id = 0
-            else:
-                #there are one ore more masks defined
-                self.mask_id = self.names_masks["obj"].max() + 1
+            #(0 if there is not (yet) a mask defined)
+            self.mask_id = self.masks.next_id
 
             #set current_mask_confirmed state to True
             self.current_mask_confirmed = True
@@ -460,12 +384,8 @@ class Annotations():
 
         """
 
-        df = self.annotations
-
-        df.iloc[self.object, self.keypoint_index * 2] = x
-        df.iloc[self.object, self.keypoint_index * 2 + 1] = y
+        self.objects.set_keypoint(self.object, self.keypoint_index, x, y)
 
-        self.annotations = df
         self.new_keypoint_created = True
 
         #set state of self.currently_saved to False
@@ -509,31 +429,27 @@ class Annotations():
 
         """
 
-        #get number of keypoints
-        n_keypoints = self.skeleton.n_keypoints
-
-        #get keypoint coordinates
-        coordinates = self.annotations.to_numpy()
-
-        #pre-allocate distance matrix
-        distance = np.zeros(shape=(len(self.annotations), n_keypoints))
+        #get keypoint coordinates (n_objects, n_keypoints, 2)
+        coordinates = self.objects.keypoints
 
-        #calculate all distances
-        for i in range(n_keypoints):
-            coordinates_i = coordinates[:, 2*i:2*i+2]
-            distance_i = np.sqrt(np.sum((coordinates_i - loc)**2, axis=1))
-            distance[:,i] = distance_i
+        #calculate all distances (n_objects, n_keypoints)
+        distance = np.sqrt(np.sum((coordinates - loc)**2, axis=2))
 
         return distance
 
-    def closest_keypoint(self, loc):
+    def closest_keypoint(self, loc, radius=None):
         """
-
+        Look up the annotated keypoint closest to loc
 
         Parameters
         ----------
         loc : TYPE
             Location (x,y) coordinates
+        radius : float, optional
+            Search radius, expressed as number of pixels on the image. If
+            given, the spatial index of the keypoint store is queried and only
+            keypoints within radius are considered. If None, the distances to
+            all keypoints are calculated. The default is None.
 
         Returns
         -------
@@ -546,6 +462,9 @@ class Annotations():
 
         """
 
+        if radius is not None:
+            return self.objects.nearest_keypoint(loc, radius)
+
         distances = self.keypoint_distance(loc)
 
         if np.sum(np.isnan(distances)) < np.prod(distances.shape):
@@ -595,7 +514,7 @@ class Annotations():
             self.marginal_keypoint_index = (self.marginal_keypoint_index + 1) %\
                 n_keypoints
             self.keypoint_index = self.skeleton.keypoint_index(self.marginal_keypoint_index)
-            if np.isnan(self.annotations.iloc[self.object, 2*self.keypoint_index]):
+            if np.isnan(self.objects.keypoints[self.object, self.keypoint_index, 0]):
                 missing_keypoint_found = True
             elif loop == n_keypoints:
                 #confirm current object and create new object
@@ -615,21 +534,15 @@ class Annotations():
         if mask_name is not None:
             #only mask_name is given
             #get mask_id
-            mask_id = self.names_masks.loc[self.names_masks["name"]==mask_name, "obj"].iloc[0]
+            mask_id = self.masks.get_id(mask_name)
 
         #delete mask
         #remark that it's impossible to remove a mask under construction
         #since a mask under construction is automatically confirmed when
         #clicking in the object_canvas
 
-        #delete name of mask
-        self.names_masks = self.names_masks.loc[self.names_masks["obj"] != mask_id,]
-        self.names_masks = self.names_masks.reset_index(drop=True)
-
-        #delete points of object
-        df = self.annotation_points_masks
-        df = df.loc[df['obj'] != mask_id,]
-        self.annotation_points_masks = df.reset_index(drop=True)
+        #delete name and points of mask
+        self.masks.delete(mask_id)
 
         #reset active object (because it is deleted):
         self.reset_active_mask()
@@ -645,6 +558,9 @@ class Annotations():
         if self.image is None:
             return
 
+        #report previous saves which failed
+        self.report_write_errors()
+
         #remove NaN-objects
         self.remove_nan_objects()
 
@@ -654,45 +570,59 @@ class Annotations():
             self.new_mask()
 
         ##save keypoint annotations, behaviours, names and masks in  a .jsonfile
-        data_dict = {}
-
-        keypoints_dict = {}
-        for i, keypoint in enumerate(self.skeleton.keypoints):
-            keypoints_dict[keypoint] = self.annotations.iloc[:, i*2:i*2 + 2].to_numpy().round(2).tolist()
-        data_dict["keypoints"] = keypoints_dict
-
-        data_dict["behaviour"] = self.behaviours.to_dict()
-        data_dict["names"] = self.names.to_dict()
-
-        masks_dict={}
-        for mask_id in self.names_masks["obj"]:
-            #get mask_name
-            mask_name = self.names_masks.loc[self.names_masks["obj"]==mask_id, 'name'].iloc[0]
-
-            #get mask points
-            points = self.annotation_points_masks.loc[self.annotation_points_masks["obj"]==mask_id,\
-                                                ["x","y"]].round(2)
+        data_dict = annotations_to_dict(keypoints=self.objects.keypoints,
+                                        keypoint_names=self.skeleton.keypoints,
+                                        names=self.objects.names,
+                                        behaviours=self.objects.behaviours)
+        data_dict["masks"] = masks_to_dict(*self.masks.to_arrays())
+
+        if self.video is not None:
+            #save the annotations of all frames to the sidecar of the video
+            self.video_annotations[str(self.frame_index)] = data_dict
+            self.writer.submit(sidecar_name(self.image_name),
+                               dict(self.video_annotations),
+                               compact=self.master.settings.compact_json)
+            self.currently_saved = True
+            return
 
-            #convert points from pd.DataFrame to dict
-            points_dict = {}
-            for i in range(len(points)):
-                points_dict[i] = points.iloc[i,].to_dict(({}))
+        #save data to .json file
+        #data_dict is a snapshot of the annotations, so it can be written
+        #while the user continues annotating
+        self.writer.submit(self.image_name[:-4] + ".json",
+                           data_dict,
+                           compact=self.master.settings.compact_json)
+        self.image_cache.invalidate(self.image_name)
 
-            #assembly dict for object
-            mask = {"name": mask_name,
-                   "points": points_dict}
+        #set state of self.currently_saved to True
+        self.currently_saved = True
 
-            #add object dict to data
-            masks_dict[mask_id] = mask
+    def report_write_errors(self):
+        """
+        Show the annotation files which couldn't be written in the background
+        """
+        errors = self.writer.pop_errors()
+        if len(errors) == 0:
+            return
 
-        data_dict["masks"] = masks_dict
+        json_name = None
+        if self.image_name is not None:
+            json_name = sidecar_name(self.image_name) if self.video is not None\
+                else self.image_name[:-4] + ".json"
+        if any(path == json_name for path, _ in errors):
+            #the annotations of the current image aren't saved
+            self.currently_saved = False
 
-        #save data to .json file
-        with open(self.image_name[:-4] + ".json", 'w') as f:
-            json.dump(data_dict, f, indent = 3)
+        message = "The following annotation files couldn't be saved:\n\n" +\
+            "\n".join(path + ": " + str(error) for path, error in errors)
+        tkmessagebox.showerror(title="Save failed", message=message)
 
-        #set state of self.currently_saved to True
-        self.currently_saved = True
+    def finish_writes(self):
+        """
+        Wait until all annotation files are written, e.g. before exporting the
+        project or closing the application. Failed writes are reported
+        """
+        self.writer.wait(raise_errors=False)
+        self.report_write_errors()
 
     def new_mask_point(self, x, y, sensitivity=10, magnetic_border=None):
         """
@@ -830,8 +760,8 @@ class Annotations():
         if add_extra_point:
             #if a point is close to the borders, adapt x and y, so point is
             #drawn on the borders
-            w = self.image.shape[1]
-            h = self.image.shape[0]
+            w = self.image_shape[1]
+            h = self.image_shape[0]
             if x <= m:
                 x = 0
             elif w - x <= m:
@@ -861,7 +791,7 @@ class Annotations():
             identifier index of the mask
         """
 
-        idx = self.names_masks.loc[self.names_masks["name"]==name, "obj"].iloc[0]
+        idx = self.masks.get_id(name)
         return idx
 
     def get_object_id(self, name):
@@ -874,20 +804,21 @@ class Annotations():
             name of the object
         """
 
-        idx = self.names.loc[self.names["name"]==name].index[0]
+        idx = np.flatnonzero(self.objects.names == name)[0]
         return idx
 
     def rename_object(self, current_name, new_name):
         """
         Rename object
         """
-        self.names.loc[self.names["name"] == current_name, "name"] = new_name
+        names = self.objects.names
+        names[names == current_name] = new_name
 
     def rename_mask(self, current_name, new_name):
         """
         Rename mask
         """
-        self.names_masks.loc[self.names_masks["name"] == current_name, "name"] = new_name
+        self.masks.rename(current_name, new_name)
 
     def update_keypoint(self, x, y):
         """
@@ -904,8 +835,7 @@ class Annotations():
         i = self.keypoint_index
 
         #update keypoint coordinates
-        self.annotations.iloc[self.object, i * 2] = x
-        self.annotations.iloc[self.object, i * 2 + 1] = y
+        self.objects.set_keypoint(self.object, i, x, y)
 
         #set state of currently_saved to False
         self.currently_saved = False
@@ -917,7 +847,7 @@ class Annotations():
 
         if self.keypoint_reactivated:
             i = self.keypoint_index
-            self.annotations.iloc[self.object, i * 2: i * 2 + 2] = np.nan
+            self.objects.clear_keypoint(self.object, i)
             self.keypoint_reactivated = False
             #decrease self.marginal_keypoint_index with 1 so
             #self.activate_next_keypoint_searching will 'activate' the search
@@ -956,9 +886,12 @@ class Annotations():
         self.mask_id = mask_id #id of newly active mask
 
         #set points of active mask
-        self.points_mask = self.annotation_points_masks.\
-            loc[self.annotation_points_masks["obj"]==self.mask_id, ["x", "y"]].\
-            to_numpy()
+        #the active mask is modified in place, so a copy of the stored
+        #polygon is made
+        if self.mask_id in self.masks:
+            self.points_mask = self.masks.polygon(self.mask_id).copy()
+        else:
+            self.points_mask = np.empty(shape=(0,2))
 
         #set id of last active point of mask (set to last point of mask)
         self.point_id = len(self.points_mask) - 1
@@ -985,11 +918,8 @@ class Annotations():
         self.points_mask = np.empty(shape=(0,2))
 
         #reset mask id
-        if len(self.names_masks["obj"])>0:
-            self.mask_id = self.names_masks["obj"].to_numpy().max() + 1
-        else:
-            #there is no mask yet confirmed
-            self.mask_id = 0
+        #(0 if there is no mask yet confirmed)
+        self.mask_id = self.masks.next_id
 
     def delete_object(self, obj_name=None, obj_id=None):
         """
@@ -1021,16 +951,13 @@ class Annotations():
             self.update_active_object(obj_id=obj_id, obj_name=obj_name)
 
         #delete active object
-        if self.annotations.shape[0] > 1:
-            #drop row of current object in dataframes
-            self.annotations = self.annotations.drop(self.object, axis=0)
-            self.behaviours = self.behaviours.drop(self.object, axis=0)
-            self.locations = self.locations.drop(self.object, axis=0)
-            self.names = self.names.drop(self.object, axis=0)
+        if len(self.objects) > 1:
+            #drop current object from the keypoint store
+            self.objects.delete(self.object)
 
-        else: #self.annotations.shape[0] == 1:
-            #reset dataframes
-            self.__reset_dataframes()
+        else: #len(self.objects) == 1:
+            #reset keypoint store
+            self.__reset_objects()
 
         #the activated keypoint (if present) is deleted, so there is no keypoint
         #any more activated
@@ -1039,9 +966,6 @@ class Annotations():
         #remove NaN objects
         self.remove_nan_objects()
 
-        #reset index of self.annotations
-        self.annotations.reset_index(drop=True)
-
         #set state of self.currently_saved to False
         self.currently_saved = False
 
@@ -1059,7 +983,7 @@ class Annotations():
         if (obj_id is not None) and (obj_name is not None):
             raise ValueError("obj_id and obj_name may not be given both")
         if obj_id == "last":
-            obj_id = self.annotations.index[-1]
+            obj_id = len(self.objects) - 1
         if obj_name is not None:
             #only obj_name is given
             #get obj_id
@@ -1077,11 +1001,10 @@ class Annotations():
         last object contains at least one specified keypoint, False is returned
         """
 
-        if self.annotations is None:
+        if len(self.objects) == 0:
             return True
 
-        if np.prod(np.isnan(self.annotations.iloc[-1,:].to_numpy())).astype(bool):
-            #boolean product is equal to and operator
+        if np.isnan(self.objects.keypoints[-1]).all():
             #last object is a preallocated object
             return True
         #last object is no preallocated object, but contains at least one
@@ -1097,13 +1020,10 @@ class Annotations():
         last object contains at least one specified keypoint, False is returned
         """
 
-        if self.annotations is None:
+        if len(self.objects) == 0:
             return True
 
-        np.prod(np.isnan(self.annotations.iloc[self.object,:].to_numpy())).astype(bool)
-
-        if np.prod(np.isnan(self.annotations.iloc[self.object,:].to_numpy())).astype(bool):
-            #boolean product is equal to and operator
+        if np.isnan(self.objects.keypoints[self.object]).all():
             #last object is a preallocated object
             return True
         #last object is no preallocated object, but contains at least one
@@ -1115,22 +1035,11 @@ class Annotations():
         """
         Number of defined objects
         """
-        if self.annotations is None:
-            return 0
-        return len(self.annotations)
+        return len(self.objects)
 
     @property
     def valid_objects(self):
         """
         count the number of objects with keypoint annotations
         """
-        object_validity = ~np.all(np.isnan(self.annotations.to_numpy()), axis=1)
-        return np.sum(object_validity)
-
-
-
-
-
-
-
-
+        return np.sum(~self.objects.empty_objects)
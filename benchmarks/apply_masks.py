@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Oct 22 11:05:51 2026
+
+@author: Maarten
+
+Benchmark of drawing the masks of an exported image: building the polygons
+point by point with np.append (previous export), _apply_masks of the export
+engine and applying a cached rasterised mask (bitmap) with cv2.bitwise_and,
+for mask templates with a few to many points
+
+usage: python benchmarks/apply_masks.py [n_repeats]
+"""
+#%% packages
+import os
+import sys
+import math
+import time
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from export_engine import _apply_masks, _mask_polygons
+
+#%%
+def apply_masks_append(image, dict_annotations):
+    """
+    Previous implementation of _apply_masks
+    """
+    for mask_dict in dict_annotations["masks"].values():
+        points_dict = mask_dict["points"]
+        mask = np.empty(shape=(0,2))
+        for point_key in points_dict:
+            mask = np.append(mask, [[points_dict[point_key]['x'],
+                                     points_dict[point_key]['y']]], axis=0)
+        mask = np.int64(mask).reshape((-1, 1, 2))
+        image = cv2.fillPoly(image, [mask], color=[0,0,0])
+    return image
+
+def template(width, height, n_points):
+    """
+    Mask template with an elliptic mask of n_points points and a rectangle
+    """
+    ellipse = {str(i): {"x": width / 2 * (1 + 0.9 * math.cos(2 * math.pi * i / n_points)),
+                        "y": height / 2 * (1 + 0.9 * math.sin(2 * math.pi * i / n_points))}
+               for i in range(n_points)}
+    rectangle = {"0": {"x": 0, "y": 0}, "1": {"x": width, "y": 0},
+                 "2": {"x": width, "y": 50}, "3": {"x": 0, "y": 50}}
+    return {"masks": {"0": {"points": ellipse}, "1": {"points": rectangle}}}
+
+def milliseconds(function, image, n_repeats):
+    start = time.perf_counter()
+    for _ in range(n_repeats):
+        function(image)
+    return (time.perf_counter() - start) / n_repeats * 1000
+
+def main(n_repeats=20):
+    print("{:<12}{:>8}{:>16}{:>16}{:>16}".format("size", "points", "np.append",
+                                                 "_apply_masks", "cached bitmap"))
+    for name, width, height in [("1080p", 1920, 1080), ("4K", 3840, 2160)]:
+        image = np.random.default_rng(0).integers(0, 256, size=(height, width, 3),
+                                                  dtype=np.uint8)
+        for n_points in [20, 200, 1000]:
+            dict_annotations = template(width, height, n_points)
+
+            #rasterised once, 255 outside the masks
+            keep = np.full((height, width), 255, dtype=np.uint8)
+            cv2.fillPoly(keep, [mask.reshape((-1, 1, 2))
+                                for mask in _mask_polygons(dict_annotations)], 0)
+
+            ms_append = milliseconds(
+                lambda image: apply_masks_append(image, dict_annotations),
+                image.copy(), n_repeats)
+            ms_engine = milliseconds(
+                lambda image: _apply_masks(image, _mask_polygons(dict_annotations)),
+                image.copy(), n_repeats)
+            ms_bitmap = milliseconds(
+                lambda image: cv2.bitwise_and(image, image, dst=image, mask=keep),
+                image.copy(), n_repeats)
+
+            print("{:<12}{:>8}{:>16.2f}{:>16.2f}{:>16.2f}".format(
+                name, n_points, ms_append, ms_engine, ms_bitmap))
+
+#%%
+if __name__ == "__main__":
+    n_repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    main(n_repeats)
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Oct 21 16:42:10 2026
+
+@author: Maarten
+
+Benchmark of splitting the images of a dataset with split_files: duration and
+balance of a random, stratified and grouped split of synthetic project index
+summaries (images of 50 cameras, every camera with its own distribution of
+behaviours)
+
+usage: python benchmarks/dataset_split.py [n_images]
+"""
+#%% packages
+import os
+import sys
+import time
+import random
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dataset_split import split_files, stratum, group_key
+
+#%%
+def synthetic_summaries(n_images):
+    """
+    Summaries of n_images images of 50 cameras, named cam<i>_<j>.jpg. Every
+    camera has its own distribution of behaviours
+    """
+    rng = random.Random(0)
+    behaviours = ["lying", "standing", "eating", "drinking", "fighting"]
+    weights = [[rng.uniform(0, weight) for weight in [50, 30, 15, 4, 1]]
+               for camera in range(50)]
+
+    summaries = {}
+    for i in range(n_images):
+        camera = int(50 * rng.random() ** 2) #cameras with more and less images
+        n_objects = min(int(rng.expovariate(0.3)), 20)
+        filename = "cam" + str(camera) + "_" + str(i).zfill(6) + ".jpg"
+        summaries[filename] = {"n_objects": n_objects,
+                               "behaviours": rng.choices(behaviours,
+                                                         weights[camera],
+                                                         k=n_objects)}
+    return summaries
+
+def main(n_images=100000):
+    summaries = synthetic_summaries(n_images)
+    files = sorted(summaries)
+    group_pattern = "^cam[0-9]+"
+
+    print("{:<28}{:>10}{:>26}{:>16}".format("split", "seconds", "sizes",
+                                            "max deviation"))
+    for name, stratify, pattern in [("random", "None", None),
+                                    ("stratified (behaviour)", "Behaviour", None),
+                                    ("stratified (objects)", "Objects", None),
+                                    ("grouped (camera)", "None", group_pattern),
+                                    ("grouped + stratified", "Behaviour",
+                                     group_pattern)]:
+        start = time.perf_counter()
+        splits = split_files(files, 10, 10, seed=0, stratify=stratify,
+                             summaries=summaries, group_pattern=pattern)
+        seconds = time.perf_counter() - start
+
+        #largest deviation (percentage points) of the share of a behaviour in
+        #a split from its share in all images
+        strata = [Counter(stratum(summaries[filename], "Behaviour")
+                          for filename in split) for split in splits]
+        totals = sum(strata, Counter())
+        deviation = max(abs(100 * split[key] / max(1, sum(split.values())) -
+                            100 * totals[key] / n_images)
+                        for split in strata for key in totals)
+
+        #no group may be part of more than one split
+        groups = [{group_key(filename, group_pattern) for filename in split}
+                  for split in splits]
+        assert (pattern is None) or\
+            not (groups[0] & groups[1] or groups[0] & groups[2] or
+                 groups[1] & groups[2])
+
+        print("{:<28}{:>10.3f}{:>26}{:>16.2f}".format(
+            name, seconds, str([len(split) for split in splits]), deviation))
+
+#%%
+if __name__ == "__main__":
+    n_images = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    main(n_images)
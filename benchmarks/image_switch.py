@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 16:02:11 2026
+
+@author: Maarten
+
+Micro-benchmark of switching images: time spent decoding the image compared to
+time spent loading and parsing its .json annotation file
+
+usage: python benchmarks/image_switch.py [project_directory] [repeats]
+"""
+#%% packages
+import os
+import sys
+import time
+import json
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from annotation_io import load_annotation_file, parse_annotations, parse_masks
+
+#%%
+def time_call(function, repeats):
+    """
+    Return the best time (in ms) of repeats calls of function
+    """
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def main(project_directory, repeats=10):
+    #read the keypoint names of the project's skeleton
+    with open(os.path.join(project_directory, "project", "skeleton.json")) as f:
+        skeleton = json.load(f)
+    keypoint_names = [skeleton[i]["name"] for i in skeleton]
+
+    images = sorted(file for file in os.listdir(project_directory)
+                    if file.endswith((".jpg", ".png")))
+
+    print("{:<16}{:>12}{:>12}{:>12}".format("image", "decode [ms]",
+                                            "json [ms]", "parse [ms]"))
+    for image_name in images:
+        image_path = os.path.join(project_directory, image_name)
+        json_path = os.path.join(project_directory, image_name.split(".")[0] + ".json")
+
+        t_decode = time_call(lambda: cv2.cvtColor(cv2.imread(image_path),
+                                                  cv2.COLOR_BGR2RGB), repeats)
+        if not os.path.exists(json_path):
+            print("{:<16}{:>12.2f}{:>12}{:>12}".format(image_name, t_decode, "-", "-"))
+            continue
+
+        t_json = time_call(lambda: load_annotation_file(json_path), repeats)
+        data_dict = load_annotation_file(json_path)
+
+        def parse():
+            parse_annotations(data_dict, keypoint_names)
+            parse_masks(data_dict.get("masks", {}))
+        t_parse = time_call(parse, repeats)
+
+        print("{:<16}{:>12.2f}{:>12.2f}{:>12.2f}".format(image_name, t_decode,
+                                                         t_json, t_parse))
+
+#%%
+if __name__ == "__main__":
+    project_directory = sys.argv[1] if len(sys.argv) > 1 else \
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                     "test_project")
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    main(project_directory, repeats)
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 11:02:45 2026
+
+@author: Maarten
+
+Benchmark of showing numpy images on a tkinter canvas: creating a new
+ImageTk.PhotoImage per frame compared to updating one PhotoImage in place with
+PhotoDisplay, for the whole frame and for a small dirty rectangle (mouse
+circle)
+
+usage: python benchmarks/photo_display.py [n_frames]
+"""
+#%% packages
+import os
+import sys
+import time
+import tkinter as tk
+import numpy as np
+from PIL import Image, ImageTk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from photo_display import PhotoDisplay
+
+#%%
+class BenchmarkCanvas(tk.Canvas):
+    """
+    Canvas with an image item, as used by PhotoDisplay
+    """
+    def __init__(self, master, **kwargs):
+        super().__init__(master, **kwargs)
+        self.image_photoimage = self.create_image(0, 0, anchor='nw')
+
+def frames_per_second(root, show, frames):
+    """
+    Show all frames and return the number of frames per second, including the
+    time tkinter needs to redraw the canvas
+    """
+    start = time.perf_counter()
+    for i, frame in enumerate(frames):
+        show(i, frame)
+        root.update_idletasks()
+    return len(frames) / (time.perf_counter() - start)
+
+def main(n_frames=30):
+    root = tk.Tk()
+    rng = np.random.default_rng(0)
+
+    print("{:<12}{:>16}{:>16}{:>16}".format("size", "new PhotoImage",
+                                            "in place", "dirty rect"))
+    for name, width, height in [("1080p", 1920, 1080), ("4K", 3840, 2160)]:
+        canvas = BenchmarkCanvas(root, width=width, height=height)
+        canvas.pack()
+
+        image = rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+        frames = [np.roll(image, 8 * i, axis=1) for i in range(n_frames)]
+
+        #current path: new PhotoImage per frame
+        photos = {}
+        def show_new_photoimage(i, frame):
+            photo = ImageTk.PhotoImage(Image.fromarray(frame))
+            canvas.itemconfigure(canvas.image_photoimage, image=photo)
+            photos["photo"] = photo
+        fps_new = frames_per_second(root, show_new_photoimage, frames)
+
+        #PhotoDisplay, whole frame
+        display = PhotoDisplay(canvas)
+        fps_in_place = frames_per_second(root,
+                                         lambda i, frame: display.show(frame),
+                                         frames)
+
+        #PhotoDisplay, only a 60x60 rectangle around a moving mouse circle
+        def show_dirty_rect(i, frame):
+            x = 100 + 8 * i
+            display.show(frame, dirty_rect=(x - 30, 100, x + 30, 160))
+        fps_dirty = frames_per_second(root, show_dirty_rect, frames)
+
+        print("{:<12}{:>16.1f}{:>16.1f}{:>16.1f}".format(name, fps_new,
+                                                         fps_in_place, fps_dirty))
+
+        display.clear()
+        canvas.destroy()
+
+    root.destroy()
+
+#%%
+if __name__ == "__main__":
+    n_frames = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    main(n_frames)
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 14:47:19 2026
+
+@author: Maarten
+
+Definition of the ColumnarWriter class. The ColumnarWriter class writes the
+annotations of an exported dataset split as columns (.npy files, one row per
+object), which a training loader can memory-map without parsing json
+"""
+#%% packages
+import os
+import json
+import shutil
+import numpy as np
+
+from dataset_writer import DatasetWriter
+
+#%%
+COLUMNS_VERSION = 1
+
+#dtype of every column
+#image, keypoints, visible, behaviour and name: one row per object
+#mask_image and mask_offsets: one row per mask (mask_offsets has an extra last
+#row), mask_points: one row per point of a mask
+COLUMN_DTYPES = {"image": np.int32,
+                 "keypoints": np.float32,
+                 "visible": np.bool_,
+                 "behaviour": np.int32,
+                 "name": np.int32,
+                 "mask_image": np.int32,
+                 "mask_offsets": np.int64,
+                 "mask_points": np.float32}
+
+def load_columns(path, mmap_mode="r"):
+    """
+    Load the columns of an exported split
+
+    Parameters
+    ----------
+    path : str
+        Folder "columns" of the exported split
+    mmap_mode : str, optional
+        Memory-map mode of the columns, see numpy.load. The default is "r".
+
+    Returns
+    -------
+    dict
+        Name of the column -> numpy array (memory-mapped), together with the
+        dictionaries "images", "keypoint_names", "behaviours" and "names".
+        E.g. columns["keypoints"][:, j] are the coordinates of keypoint j of
+        all objects, columns["images"][columns["image"][i]] the image of
+        object i. The points of mask m are
+        columns["mask_points"][columns["mask_offsets"][m]:columns["mask_offsets"][m+1]]
+    """
+    with open(os.path.join(path, "columns.json")) as f:
+        columns = json.load(f)
+
+    for name in COLUMN_DTYPES:
+        columns[name] = np.load(os.path.join(path, name + ".npy"),
+                                mmap_mode=mmap_mode)
+
+    return columns
+
+class ColumnarWriter(DatasetWriter):
+    """
+    Writes the annotations of an exported split as columns
+
+    The entries (Perneel format, with the names of the objects) are journaled
+    in annotations.jsonl in the same way as by DatasetWriter, so the export
+    can be resumed and updated incrementally. When all entries are written,
+    the journal is converted to the folder "columns" of the split:
+
+    image.npy : (n_objects,) index of the image of every object in "images"
+    keypoints.npy : (n_objects, n_keypoints, 2) one based x, y coordinates of
+        the keypoints, in the order of "keypoint_names", NaN if not annotated
+    visible.npy : (n_objects, n_keypoints) True if the keypoint is annotated
+    behaviour.npy : (n_objects,) index of the behaviour in "behaviours"
+    name.npy : (n_objects,) index of the name of the object in "names"
+    mask_image.npy : (n_masks,) index of the image of every mask in "images"
+    mask_offsets.npy : (n_masks + 1,) first row of every mask in mask_points
+    mask_points.npy : (n_points, 2) x, y coordinates of the corners of the
+        masks
+    columns.json : the dictionaries "images", "keypoint_names", "behaviours"
+        and "names"
+
+    The journal is read line by line and the columns are appended to the
+    files row by row, so only one entry is kept in memory. The journal is
+    kept after the export
+
+    Attributes
+    -----
+    self.keypoint_names : list
+        Names of the keypoints of the skeleton, order of the keypoints in the
+        columns
+
+    self.columns_path : str
+        Folder with the columns
+
+    Methods
+    -----
+    self.close
+        Finish the export, write the columns
+
+    self.read_entries
+        Read the entries of a finished export
+    """
+
+    def __init__(self, export_path, keypoint_names):
+
+        #the journal is the source of the columns, it is always kept
+        super().__init__(export_path, keep_jsonl=True)
+
+        self.keypoint_names = list(keypoint_names)
+        self.columns_path = os.path.join(export_path, "columns")
+
+    @property
+    def finished(self):
+        """
+        True if the export of the split was finished
+        """
+        #columns.json is written after the columns
+        return os.path.exists(os.path.join(self.columns_path, "columns.json"))
+
+    def _rows(self, entry, image_code, codes):
+        """
+        Rows of the columns of an entry
+
+        Parameters
+        ----------
+        entry : dict
+            Annotations of an image (Perneel format, with "names")
+        image_code : int
+            Index of the image in the dictionary of images
+        codes : dict
+            Dictionaries "behaviours" and "names", value -> index. New values
+            are added
+
+        Returns
+        -------
+        dict
+            Name of the column -> rows (numpy array). Instead of mask_offsets,
+            mask_lengths contains the number of points of every mask
+        """
+        n_keypoints = len(self.keypoint_names)
+        lengths = [len(value) for value in entry["keypoints"].values()]
+        n_objects = max(lengths + [len(entry["behaviour"]), len(entry["names"])])
+
+        keypoints = np.full((n_objects, n_keypoints, 2), np.nan, dtype=np.float32)
+        for j, keypoint in enumerate(self.keypoint_names):
+            coordinates = entry["keypoints"].get(keypoint, [])
+            if len(coordinates) > 0:
+                keypoints[:len(coordinates), j] = np.array(coordinates,
+                                                           dtype=np.float64)
+
+        rows = {"image": np.full(n_objects, image_code),
+                "keypoints": keypoints,
+                "visible": ~np.isnan(keypoints).any(axis=2)}
+
+        for column, values in [("behaviour", entry["behaviour"]),
+                               ("name", entry["names"])]:
+            dictionary = codes[column + "s"]
+            values = [str(value) if value is not None else None
+                      for value in values]
+            values += [None] * (n_objects - len(values))
+            #objects without value get code -1
+            rows[column] = np.array([dictionary.setdefault(value, len(dictionary))
+                                     if value is not None else -1
+                                     for value in values])
+
+        masks = [mask["points"].values() for mask in entry["masks"].values()]
+        rows["mask_image"] = np.full(len(masks), image_code)
+        rows["mask_lengths"] = np.array([len(points) for points in masks],
+                                        dtype=np.int64)
+        rows["mask_points"] = np.array([[point["x"], point["y"]]
+                                        for points in masks for point in points],
+                                       dtype=np.float64).reshape(-1, 2)
+
+        return rows
+
+    def close(self):
+        """
+        Finish the export, the columns are written from the journal
+        """
+        self.abort()
+        if self.n_entries == 0:
+            #an empty journal is never opened
+            open(self.jsonl_path, "w").close()
+
+        temporary_path = self.columns_path + ".tmp"
+        if os.path.exists(temporary_path):
+            shutil.rmtree(temporary_path)
+        os.mkdir(temporary_path)
+
+        dictionaries = {"images": [], "behaviours": {}, "names": {}}
+        n_rows = {name: 0 for name in COLUMN_DTYPES}
+        shapes = {"keypoints": (len(self.keypoint_names), 2),
+                  "visible": (len(self.keypoint_names),),
+                  "mask_points": (2,)}
+
+        #append the rows of every entry to raw files, the number of rows of
+        #the .npy files is only known at the end
+        files = {name: open(os.path.join(temporary_path, name + ".raw"), "wb")
+                 for name in COLUMN_DTYPES}
+        try:
+            files["mask_offsets"].write(np.zeros(1, dtype=np.int64).tobytes())
+            n_rows["mask_offsets"] = 1
+            with open(self.jsonl_path) as f_jsonl:
+                for line in f_jsonl:
+                    entry = json.loads(line)
+                    rows = self._rows(entry, len(dictionaries["images"]),
+                                      dictionaries)
+                    dictionaries["images"].append(entry["image"])
+
+                    #offsets of the masks in mask_points
+                    rows["mask_offsets"] = n_rows["mask_points"] +\
+                        np.cumsum(rows.pop("mask_lengths"))
+
+                    for name, dtype in COLUMN_DTYPES.items():
+                        files[name].write(rows[name].astype(dtype).tobytes())
+                        n_rows[name] += len(rows[name])
+        finally:
+            for f_raw in files.values():
+                f_raw.close()
+
+        #prepend a .npy header to the raw files
+        for name, dtype in COLUMN_DTYPES.items():
+            raw_path = os.path.join(temporary_path, name + ".raw")
+            header = {"descr": np.lib.format.dtype_to_descr(np.dtype(dtype)),
+                      "fortran_order": False,
+                      "shape": (n_rows[name],) + shapes.get(name, ())}
+            with open(os.path.join(temporary_path, name + ".npy"), "wb") as f_npy:
+                np.lib.format.write_array_header_1_0(f_npy, header)
+                with open(raw_path, "rb") as f_raw:
+                    shutil.copyfileobj(f_raw, f_npy)
+            os.remove(raw_path)
+
+        with open(os.path.join(temporary_path, "columns.json"), "w") as f:
+            json.dump({"version": COLUMNS_VERSION,
+                       "images": dictionaries["images"],
+                       "keypoint_names": self.keypoint_names,
+                       "behaviours": list(dictionaries["behaviours"]),
+                       "names": list(dictionaries["names"])}, f)
+
+        if os.path.exists(self.columns_path):
+            shutil.rmtree(self.columns_path)
+        os.replace(temporary_path, self.columns_path)
+
+    def read_entries(self):
+        """
+        Read the entries of a finished export from the journal
+
+        Returns
+        -------
+        list
+            Entries, in the order of the export. Empty if the export wasn't
+            finished
+        """
+        if not self.finished:
+            return []
+        with open(self.jsonl_path) as f:
+            return [json.loads(line) for line in f]
@@ -0,0 +1,946 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Oct 21 10:04:33 2026
+
+@author: Maarten
+
+Definition of the DatasetExporter class. The DatasetExporter class exports the
+annotated images of a project to a dataset, without graphical user interface.
+It is used by the export wizard (ExportDataset) and by the command line
+interface (kantool.py)
+"""
+#%% packages
+import os
+import json
+import time
+import shutil
+import numpy as np
+
+from export_engine import ExportEngine, ExportCancelled,\
+    export_image_psota_2019, export_image_perneel, export_image_columnar,\
+    export_shard, export_image_tensor
+from export_manifest import ExportManifest, hash_image, stable_split, video_names
+from dataset_split import split_files, group_key
+from dataset_writer import DatasetWriter
+from columnar_writer import ColumnarWriter
+from project_index import ProjectIndex
+from settings import Settings
+
+#%%
+#dataset type -> function which exports a single image (or shard)
+EXPORT_FUNCTIONS = {"Perneel": export_image_perneel,
+                    "Psota_2019": export_image_psota_2019,
+                    "Columnar": export_image_columnar,
+                    "Shards": export_shard,
+                    "Tensor": export_image_tensor}
+
+DATASET_TYPES = list(EXPORT_FUNCTIONS)
+
+#dataset types which can be updated incrementally
+INCREMENTAL_TYPES = ["Perneel", "Psota_2019", "Columnar"]
+
+def read_keypoint_names(project_dir):
+    """
+    Names of the keypoints of the skeleton of a project, in the order of
+    project/skeleton.json
+    """
+    with open(os.path.join(project_dir, "project", "skeleton.json")) as f:
+        skeleton = json.load(f)
+    return [skeleton[i]["name"] for i in skeleton]
+
+class DatasetExporter():
+    """
+    Exports the annotated images of a project to a dataset of a dataset type
+    of choice, split in a train, validation and test split
+
+    Questions to the user (replace an existing folder, resume an interrupted
+    export), messages and the progress are passed to callbacks, so the export
+    can run with or without graphical user interface
+
+    Attributes
+    -----
+    self.project_dir : str
+        Project directory
+
+    self.export_dir : str
+        Directory to store the exported dataset, the splits are written to
+        <export_dir>/<title>_train, _val and _test
+
+    self.title : str
+        Title of the exported dataset
+
+    self.dataset_type : str
+        Dataset type, one of DATASET_TYPES
+
+    self.keypoint_names : list
+        Names of the keypoints of the skeleton
+
+    self.val_perc : float
+        Percentage of the images in the validation split
+
+    self.test_perc : float
+        Percentage of the images in the test split
+
+    self.seed : int
+        Seed of the random split of the images, None for a different split
+        every export
+
+    self.stratify : str
+        Stratification of the split, one of STRATIFY_OPTIONS
+
+    self.group_pattern : str
+        Regular expression which defines groups of images (e.g. of the same
+        camera) which are kept in the same split, None if every image is its
+        own group
+
+    self.include_empty : bool
+        Include images without objects
+
+    self.include_video : bool
+        Include the corresponding video files
+
+    self.incremental : bool
+        Only update new and changed images of an existing export
+
+    self.settings : Settings
+        Settings, e.g. number of worker processes and link mode
+
+    self.project_index : ProjectIndex
+        Index of the annotated images of the project
+
+    self.statistics : dict
+        Number of exported images, duration (s) and throughput (images/s) of
+        the last export, with the duration of every task
+
+    Methods
+    -----
+    self.export
+        Export the dataset
+
+    self.cancel
+        Cancel the running export
+
+    self.list_files
+        List the images of the project which have to be exported
+
+    self.export_full
+        Export all images to new splits, or resume an interrupted export
+
+    self.load_interrupted_export
+        Check if an interrupted export has to be resumed
+
+    self.export_incremental
+        Update an existing export with the new and changed images
+
+    self.export_split
+        Export the images of a split, writing annotations.json image by image
+
+    self.export_shards
+        Export the images of a split to tar shards, in parallel
+
+    self.export_tensors
+        Export the images of a split to memory-mapped tensors, in parallel
+
+    self.create_writer
+        Create the writer of the annotations of a split
+
+    self.split_finished
+        Check if the export of a split was finished
+
+    self.make_split_folders
+        Make the folders of an exported split
+
+    self.export_images
+        Export the images of a split in parallel
+
+    self.run_engine
+        Run a function for all images on the export engine
+    """
+
+    def __init__(self, project_dir, export_dir, title, dataset_type,
+                 keypoint_names=None, val_perc=0, test_perc=0, seed=None,
+                 stratify="None", group_pattern=None, include_empty=False, include_video=False, incremental=False,
+                 settings=None, project_index=None, progress=None,
+                 ask_replace=None, ask_resume=None, inform=None):
+        """
+        Parameters
+        ----------
+        project_dir : str
+            Project directory
+        export_dir : str
+            Directory to store the exported dataset
+        title : str
+            Title of the exported dataset
+        dataset_type : str
+            Dataset type, one of DATASET_TYPES
+        keypoint_names : list, optional
+            Names of the keypoints of the skeleton. If None, they are read
+            from the skeleton of the project. The default is None.
+        val_perc : float, optional
+            Percentage of the images in the validation split. The default is
+            0.
+        test_perc : float, optional
+            Percentage of the images in the test split. The default is 0.
+        seed : int, optional
+            Seed of the random split of the images. If None, every export
+            splits the images differently. The default is None.
+        stratify : str, optional
+            Stratification of the split, one of STRATIFY_OPTIONS: "None",
+            "Behaviour" (most frequent behaviour of an image) or "Objects"
+            (number of objects of an image). The default is "None".
+        group_pattern : str, optional
+            Regular expression which defines the group of an image (e.g.
+            "^cam[0-9]+"), all images of a group are kept in the same split.
+            If None, every image is its own group. The default is None.
+        include_empty : bool, optional
+            Include images without objects. The default is False.
+        include_video : bool, optional
+            Include the corresponding video files. The default is False.
+        incremental : bool, optional
+            Only update new and changed images of an existing export. The
+            default is False.
+        settings : Settings, optional
+            Settings. If None, the default settings are used. The default is
+            None.
+        project_index : ProjectIndex, optional
+            Index of the annotated images of the project, e.g. the index of
+            the application. If None, a new index is created. The default is
+            None.
+        progress : callable, optional
+            Function progress(description, n_done, n_total, unit), called
+            regularly while images are exported. The default is None.
+        ask_replace : callable, optional
+            Function ask_replace(export_path), returns True if an existing
+            split folder may be replaced. If None, existing folders are not
+            replaced and the export stops. The default is None.
+        ask_resume : callable, optional
+            Function ask_resume(title), returns True if an interrupted export
+            has to be resumed. If None, interrupted exports aren't resumed.
+            The default is None.
+        inform : callable, optional
+            Function inform(message), shows a message to the user. The
+            default is None.
+        """
+        if dataset_type not in EXPORT_FUNCTIONS:
+            raise ValueError("unknown dataset type " + str(dataset_type))
+        if keypoint_names is None:
+            keypoint_names = read_keypoint_names(project_dir)
+        if settings is None:
+            settings = Settings()
+        if project_index is None:
+            project_index = ProjectIndex()
+
+        self.project_dir = project_dir
+        self.export_dir = export_dir
+        self.title = title
+        self.dataset_type = dataset_type
+        self.keypoint_names = list(keypoint_names)
+        self.val_perc = float(val_perc)
+        self.test_perc = float(test_perc)
+        self.seed = seed
+        self.stratify = stratify
+        self.group_pattern = group_pattern or None
+        self.include_empty = include_empty
+        self.include_video = include_video
+        self.incremental = incremental
+        self.settings = settings
+        self.project_index = project_index
+
+        self.progress = progress
+        self.ask_replace = ask_replace
+        self.ask_resume = ask_resume
+        self.inform = inform
+
+        self.export_engine = None
+        self.statistics = {}
+
+    def export(self):
+        """
+        Export the dataset
+
+        Returns
+        -------
+        bool
+            True if the export was finished, False if there were no images to
+            export, if the export was cancelled or if an existing folder may
+            not be replaced
+        """
+        self.statistics = {"n_images": 0, "seconds": 0, "images_per_second": 0,
+                           "tasks": []}
+        start = time.perf_counter()
+
+        #list all valid images
+        files = self.list_files()
+        function = EXPORT_FUNCTIONS[self.dataset_type]
+
+        if self.incremental and self.dataset_type in INCREMENTAL_TYPES:
+            #only export new and changed images
+            finished = self.export_incremental(function, files)
+        else:
+            if self.incremental and self.inform is not None:
+                self.inform("Incremental export isn't available for the " +
+                            self.dataset_type + " type\n\n" +
+                            "All images will be exported")
+            finished = self.export_full(function, files)
+
+        seconds = time.perf_counter() - start
+        self.statistics["seconds"] = seconds
+        if seconds > 0:
+            self.statistics["images_per_second"] = self.statistics["n_images"] / seconds
+
+        return finished
+
+    def cancel(self):
+        """
+        Cancel the running export, the images which are being exported are
+        finished
+        """
+        if self.export_engine is not None:
+            self.export_engine.cancel()
+
+    def list_files(self):
+        """
+        List the images of the project which have to be exported
+
+        Returns
+        -------
+        list
+            Names of the images
+        """
+        #scan the project folder, only annotation files which were modified
+        #since the previous scan are parsed
+        if self.project_index.directory != self.project_dir:
+            self.project_index.set_directory(self.project_dir)
+        self.project_index.refresh()
+
+        #images (.jpg or .png) accompanied with a .json file with annotations
+        #if empty images aren't included, only images with annotated objects
+        return self.project_index.annotated_images(
+            include_empty=self.include_empty)
+
+    def export_full(self, function, files):
+        """
+        Export all images to new splits (train, validation, test)
+
+        The splits are written to <title>_export.json in the export directory
+        before the images are exported, the file is removed when all splits
+        are exported. An interrupted export can be resumed by the next export
+        of the same images with the same options: exported splits are kept and
+        the annotations of an unfinished split are continued after the last
+        exported image
+
+        Parameters
+        ----------
+        function : callable
+            Function which exports a single image, e.g. export_image_perneel
+        files : list
+            Names of the images to export
+
+        Returns
+        -------
+        bool
+            True if the export was finished
+        """
+        state_path = os.path.join(self.export_dir, self.title + "_export.json")
+        options = {"dataset_type": self.dataset_type,
+                   "keypoints": self.keypoint_names,
+                   "include_video": self.include_video}
+
+        lists_files = self.load_interrupted_export(state_path, options, files)
+        resume = lists_files is not None
+
+        if not resume:
+            #if no valid files are present, end method
+            if len(files) == 0:
+                return False
+
+            #create splits (train, validation, test)
+            lists_files = split_files(
+                files, self.val_perc, self.test_perc, seed=self.seed, stratify=self.stratify,
+                summaries=self.project_index.summaries,
+                group_pattern=self.group_pattern)
+
+        suffices = ["_train", "_val", "_test"]
+
+        for split in range(3):
+            files = lists_files[split]
+
+            if len(files) > 0:
+                #check if there are filenames in files
+
+                export_path = os.path.join(self.export_dir,
+                                           self.title + suffices[split])
+
+                if resume and os.path.isdir(export_path):
+                    if self.split_finished(export_path):
+                        #split was exported before the interruption
+                        continue
+                    self.make_split_folders(export_path)
+                else:
+                    #construct export path and make all directories
+                    try:
+                        os.mkdir(export_path)
+                        self.make_split_folders(export_path)
+                    except FileExistsError:
+                        if (self.ask_replace is None) or\
+                            (not self.ask_replace(export_path)):
+                            return False
+
+                        #replace directories
+                        shutil.rmtree(export_path)
+                        os.mkdir(export_path)
+                        self.make_split_folders(export_path)
+
+                if not os.path.exists(state_path):
+                    #record the splits, so an interrupted export can be
+                    #resumed
+                    with open(state_path, "w") as f:
+                        json.dump({"options": options, "splits": lists_files}, f)
+
+                #export the images (in parallel), the annotations are written
+                #to annotations.json image by image
+                if not self.export_split(function, files, export_path,
+                                         suffices[split][1:], resume):
+                    #export was cancelled
+                    return False
+
+        #the export is finished
+        if os.path.exists(state_path):
+            os.remove(state_path)
+
+        return True
+
+    def load_interrupted_export(self, state_path, options, files):
+        """
+        Check if an interrupted export of the same images with the same
+        options exists and ask if it has to be resumed
+
+        Parameters
+        ----------
+        state_path : str
+            Path of the file with the splits of the interrupted export
+        options : dict
+            Options of the current export
+        files : list
+            Names of the images to export
+
+        Returns
+        -------
+        list
+            Names of the images of the train, validation and test split of the
+            interrupted export. None if no export has to be resumed
+        """
+        try:
+            with open(state_path) as f:
+                state = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+        lists_files = state["splits"]
+        if (state["options"] != options) or\
+            (sorted(sum(lists_files, [])) != sorted(files)):
+            #export of other images or with other options
+            return None
+
+        if (self.ask_resume is None) or (not self.ask_resume(self.title)):
+            os.remove(state_path)
+            return None
+
+        return lists_files
+
+    def export_incremental(self, function, files):
+        """
+        Update an existing export: only new and changed images are exported,
+        images which are no longer part of a split are removed from it
+
+        The export is compared with a manifest (<title>_manifest.json in the
+        export directory) written by the previous incremental export. Images
+        keep the split of the previous export (unless the split options
+        changed) and new images of a group join the split of their group.
+        Without seed and stratification, the other new images get a split
+        based on their name (or the name of their group), so the splits are
+        stable between exports; otherwise they are split with split_files
+
+        Parameters
+        ----------
+        function : callable
+            Function which exports a single image, e.g. export_image_perneel
+        files : list
+            Names of the images to export
+
+        Returns
+        -------
+        bool
+            True if the export was finished
+        """
+        project_dir = self.project_dir
+
+        options = {"dataset_type": self.dataset_type,
+                   "keypoints": self.keypoint_names,
+                   "include_video": self.include_video,
+                   "split": {"val_perc": self.val_perc,
+                             "test_perc": self.test_perc,
+                             "seed": self.seed,
+                             "stratify": self.stratify,
+                             "group_pattern": self.group_pattern}}
+        manifest = ExportManifest(os.path.join(self.export_dir,
+                                               self.title + "_manifest.json"),
+                                  options)
+        manifest.load()
+
+        #hash the images and annotation files, hashes of the previous export
+        #are re-used for files which weren't modified
+        entries = {}
+        files_to_hash = []
+        for filename in files:
+            if filename in manifest.entries:
+                entries[filename] = hash_image(filename, project_dir,
+                                               manifest.entries[filename])
+            else:
+                files_to_hash.append(filename)
+        new_entries = self.run_engine(hash_image, files_to_hash, "Hashing images",
+                                      project_dir=project_dir)
+        if new_entries is None:
+            #export was cancelled
+            return False
+        entries.update(zip(files_to_hash, new_entries))
+
+        #assign the splits: images keep the split of the previous export,
+        #unless the split options changed
+        keep_splits = (manifest.previous_options is not None) and\
+            (manifest.previous_options.get("split") == options["split"])
+        splits_groups = {} #group -> split of the images of the previous export
+        files_new = []
+        for filename, entry in entries.items():
+            if keep_splits and (filename in manifest.entries):
+                entry["split"] = manifest.entries[filename]["split"]
+                splits_groups.setdefault(group_key(filename, self.group_pattern),
+                                         entry["split"])
+            else:
+                files_new.append(filename)
+
+        #new images of a group of the previous export join its split
+        for filename in files_new:
+            split = splits_groups.get(group_key(filename, self.group_pattern))
+            if split is not None:
+                entries[filename]["split"] = split
+        files_new = [filename for filename in files_new
+                     if "split" not in entries[filename]]
+
+        if (self.seed is None) and (self.stratify in [None, "None"]):
+            #the split only depends on the name of the image (or of its
+            #group), so it doesn't change between exports
+            for filename in files_new:
+                entries[filename]["split"] = stable_split(
+                    group_key(filename, self.group_pattern),
+                    self.val_perc, self.test_perc)
+        else:
+            #the new images are split with the seed and stratification
+            lists_files = split_files(files_new, self.val_perc, self.test_perc,
+                                      seed=self.seed, stratify=self.stratify,
+                                      summaries=self.project_index.summaries,
+                                      group_pattern=self.group_pattern)
+            for split, files_split in zip(["train", "val", "test"], lists_files):
+                for filename in files_split:
+                    entries[filename]["split"] = split
+
+        for split in ["train", "val", "test"]:
+            export_path = os.path.join(self.export_dir, self.title + "_" + split)
+            files_split = sorted(filename for filename, entry in entries.items()
+                                 if entry["split"] == split)
+            if len(files_split) == 0 and not os.path.exists(export_path):
+                continue
+
+            os.makedirs(os.path.join(export_path, "images"), exist_ok=True)
+            if self.include_video:
+                os.makedirs(os.path.join(export_path, "video"), exist_ok=True)
+
+            #remove images and videos which are no longer part of the split
+            valid_names = {"images": set(files_split),
+                           "video": {video_name for filename in files_split
+                                     for video_name in video_names(filename)}}
+            for folder, names in valid_names.items():
+                if os.path.isdir(os.path.join(export_path, folder)):
+                    for name in os.listdir(os.path.join(export_path, folder)):
+                        if name not in names:
+                            os.remove(os.path.join(export_path, folder, name))
+
+            #annotations of the unchanged images are taken from the previous
+            #export
+            dicts_image = {dict_image["image"]: dict_image for dict_image in
+                           self.create_writer(export_path).read_entries()}
+
+            files_changed = [filename for filename in files_split
+                             if manifest.is_changed(filename, entries[filename]) or
+                             ("images/" + filename not in dicts_image)]
+
+            #videos of changed images are copied again (if still present)
+            for filename in files_changed:
+                for video_name in video_names(filename):
+                    video_path = os.path.join(export_path, "video", video_name)
+                    if os.path.lexists(video_path):
+                        os.remove(video_path)
+
+            dicts_changed = self.export_images(function, files_changed,
+                                               export_path, split)
+            if dicts_changed is None:
+                #export was cancelled
+                return False
+            for dict_image in dicts_changed:
+                dicts_image[dict_image["image"]] = dict_image
+
+            #write json file
+            writer = self.create_writer(export_path)
+            for filename in files_split:
+                writer.write(dicts_image["images/" + filename])
+            writer.close()
+
+        #the manifest is written last, so an interrupted export is
+        #completed by the next export
+        manifest.entries = entries
+        manifest.save()
+
+        return True
+
+    def export_split(self, function, files, export_path, split_name,
+                     resume=False):
+        """
+        Export the images of a split, the annotations are written to
+        annotations.json image by image (see DatasetWriter)
+
+        Parameters
+        ----------
+        function : callable
+            Function which exports a single image, e.g. export_image_perneel
+        files : list
+            Names of the images
+        export_path : str
+            Directory of the exported split
+        split_name : str
+            Name of the split, shown with the progress
+        resume : bool, optional
+            Continue after the last image of an interrupted export of the
+            split. The default is False.
+
+        Returns
+        -------
+        bool
+            True if the split was exported, False if the export was cancelled
+        """
+        if self.dataset_type == "Shards":
+            #finished shards are kept by export_shard
+            return self.export_shards(function, files, export_path, split_name)
+        if self.dataset_type == "Tensor":
+            return self.export_tensors(function, files, export_path, split_name)
+
+        writer = self.create_writer(export_path)
+        n_done = 0
+        if resume:
+            n_done = writer.resume(["images/" + filename for filename in files])
+
+        try:
+            results = self.export_images(function, files[n_done:], export_path,
+                                         split_name, on_result=writer.write)
+        finally:
+            writer.abort()
+        if results is None:
+            return False
+
+        writer.close()
+        return True
+
+    def export_shards(self, function, files, export_path, split_name):
+        """
+        Export the images of a split to tar shards of at most
+        settings.shard_size images, one shard per worker process. The shards
+        are listed in shards.json
+
+        Parameters
+        ----------
+        function : callable
+            Function which exports a shard, e.g. export_shard
+        files : list
+            Names of the images
+        export_path : str
+            Directory of the exported split
+        split_name : str
+            Name of the split, shown with the progress
+
+        Returns
+        -------
+        bool
+            True if the split was exported, False if the export was cancelled
+        """
+        shard_size = self.settings.shard_size
+        shards = [("shard-%06d.tar" % i, files[start: start + shard_size])
+                  for i, start in enumerate(range(0, len(files), shard_size))]
+
+        entries = self.run_engine(function, shards,
+                                  "Exporting " + split_name + " split",
+                                  unit="shards",
+                                  project_dir=self.project_dir,
+                                  export_path=export_path,
+                                  keypoint_names=self.keypoint_names,
+                                  include_video=self.include_video)
+        if entries is None:
+            return False
+        self.statistics["n_images"] += len(files)
+
+        #write the index of the shards
+        index = {"n_samples": len(files),
+                 "n_bytes": sum(entry["n_bytes"] for entry in entries),
+                 "shards": entries}
+        with open(os.path.join(export_path, "shards.json"), "w") as f:
+            json.dump(index, f, indent=2)
+
+        return True
+
+    def export_tensors(self, function, files, export_path, split_name):
+        """
+        Export the images of a split to memory-mapped tensors (.npy files in
+        the folder "tensors" of the split):
+
+        images.npy : (n_images, height, width, 3) uint8 RGB masked images,
+            resized to settings.tensor_height x settings.tensor_width
+            (letterboxed if settings.tensor_letterbox)
+        keypoints.npy : (n_images, max_objects, n_keypoints, 2) float32 one
+            based x, y coordinates in the resized images, NaN if not
+            annotated or for padding objects
+        behaviour.npy : (n_images, max_objects) int32 index of the behaviour
+            in "behaviours", -1 for padding objects
+        transforms.npy : (n_images, 4) float32 scale_x, scale_y, pad_x,
+            pad_y: pixel (x, y) of an image is pixel
+            (x * scale_x + pad_x, y * scale_y + pad_y) of the resized image
+        tensors.json : the names of the images, keypoints and behaviours
+
+        The tensors are created first, every worker process writes the rows of
+        its images
+
+        Parameters
+        ----------
+        function : callable
+            Function which exports an image to a row, e.g. export_image_tensor
+        files : list
+            Names of the images
+        export_path : str
+            Directory of the exported split
+        split_name : str
+            Name of the split, shown with the progress
+
+        Returns
+        -------
+        bool
+            True if the split was exported, False if the export was cancelled
+        """
+        settings = self.settings
+        tensors_path = os.path.join(export_path, "tensors")
+        keypoint_names = self.keypoint_names
+
+        #number of objects of the image with the most objects, from the index
+        #of the project
+        summaries = self.project_index.summaries
+        max_objects = max(summaries[filename]["n_objects"] for filename in files)
+
+        #create the tensors
+        shapes = {"images": ((len(files), settings.tensor_height,
+                              settings.tensor_width, 3), np.uint8),
+                  "keypoints": ((len(files), max_objects, len(keypoint_names), 2),
+                                np.float32),
+                  "transforms": ((len(files), 4), np.float32)}
+        for name, (shape, dtype) in shapes.items():
+            tensor = np.lib.format.open_memmap(os.path.join(tensors_path, name + ".npy"),
+                                               mode="w+", dtype=dtype, shape=shape)
+            if name == "keypoints":
+                tensor[:] = np.nan
+            del tensor
+
+        #behaviours are encoded in the order of the images
+        behaviour = np.full((len(files), max_objects), -1, dtype=np.int32)
+        behaviours = {}
+        row = [0]
+        def add_behaviours(behaviours_image):
+            behaviour[row[0], :len(behaviours_image)] = \
+                [behaviours.setdefault(value, len(behaviours))
+                 for value in behaviours_image]
+            row[0] += 1
+
+        results = self.run_engine(function, list(enumerate(files)),
+                                  "Exporting " + split_name + " split",
+                                  on_result=add_behaviours,
+                                  project_dir=self.project_dir,
+                                  export_path=export_path,
+                                  keypoint_names=keypoint_names,
+                                  height=settings.tensor_height,
+                                  width=settings.tensor_width,
+                                  letterbox=settings.tensor_letterbox)
+        if results is None:
+            return False
+        self.statistics["n_images"] += len(files)
+
+        np.save(os.path.join(tensors_path, "behaviour.npy"), behaviour)
+
+        #tensors.json is written last, it marks a finished split
+        with open(os.path.join(tensors_path, "tensors.json"), "w") as f:
+            json.dump({"images": files,
+                       "keypoint_names": keypoint_names,
+                       "behaviours": list(behaviours)}, f, indent=2)
+
+        return True
+
+    def create_writer(self, export_path):
+        """
+        Create the writer of the annotations of a split, depending on the
+        dataset type
+
+        Parameters
+        ----------
+        export_path : str
+            Directory of the exported split
+
+        Returns
+        -------
+        DatasetWriter
+            Writer of annotations.json, or a ColumnarWriter for the columnar
+            dataset type
+        """
+        if self.dataset_type == "Columnar":
+            return ColumnarWriter(export_path, self.keypoint_names)
+        return DatasetWriter(export_path, keep_jsonl=self.settings.export_jsonl)
+
+    def split_finished(self, export_path):
+        """
+        Check if the export of a split was finished
+
+        Parameters
+        ----------
+        export_path : str
+            Directory of the exported split
+
+        Returns
+        -------
+        bool
+            True if the annotations (or the index of the shards) were written
+        """
+        if self.dataset_type == "Shards":
+            return os.path.exists(os.path.join(export_path, "shards.json"))
+        if self.dataset_type == "Tensor":
+            return os.path.exists(os.path.join(export_path, "tensors", "tensors.json"))
+        return self.create_writer(export_path).finished
+
+    def make_split_folders(self, export_path):
+        """
+        Make the folders of an exported split (if they don't exist yet)
+
+        Parameters
+        ----------
+        export_path : str
+            Directory of the exported split
+        """
+        if self.dataset_type == "Shards":
+            #images and videos are stored in the shards
+            return
+        if self.dataset_type == "Tensor":
+            #images are stored in the tensors, videos aren't exported
+            os.makedirs(os.path.join(export_path, "tensors"), exist_ok=True)
+            return
+
+        os.makedirs(os.path.join(export_path, "images"), exist_ok=True)
+        if self.include_video:
+            os.makedirs(os.path.join(export_path, "video"), exist_ok=True)
+
+    def export_images(self, function, files, export_path, split_name,
+                      on_result=None):
+        """
+        Export the images of a split on a pool of worker processes
+
+        Parameters
+        ----------
+        function : callable
+            Function which exports a single image, e.g. export_image_perneel
+        files : list
+            Names of the images
+        export_path : str
+            Directory of the exported split
+        split_name : str
+            Name of the split, shown with the progress
+        on_result : callable, optional
+            Function which is called with the annotations of every image, in
+            the order of files. The annotations are then not returned. The
+            default is None.
+
+        Returns
+        -------
+        list
+            Annotations of the images, in the order of files. None if the
+            export was cancelled
+        """
+        results = self.run_engine(function, files,
+                                  "Exporting " + split_name + " split",
+                                  on_result=on_result,
+                                  project_dir=self.project_dir,
+                                  export_path=export_path,
+                                  keypoint_names=self.keypoint_names,
+                                  include_video=self.include_video,
+                                  link_mode=self.settings.export_link_mode)
+        if results is not None:
+            self.statistics["n_images"] += len(files)
+        return results
+
+    def run_engine(self, function, files, description, on_result=None,
+                   unit="images", **kwargs):
+        """
+        Run a function for all images on a pool of worker processes, while
+        the progress is passed to self.progress
+
+        Parameters
+        ----------
+        function : callable
+            Module level function function(filename, **kwargs)
+        files : list
+            Names of the images
+        description : str
+            Description of the task, shown with the progress
+        on_result : callable, optional
+            Function which is called with every return value of function, in
+            the order of files, as soon as it is available. The return values
+            are then not collected. The default is None.
+        unit : str, optional
+            Unit of the items of files, shown with the progress. The default
+            is "images".
+        **kwargs
+            Keyword arguments of function, equal for all images
+
+        Returns
+        -------
+        list
+            Return values of function, in the order of files (empty if
+            on_result is given). None if the task was cancelled
+        """
+        if len(files) == 0:
+            return []
+
+        self.export_engine = ExportEngine(n_workers=self.settings.n_export_workers)
+
+        progress = None
+        if self.progress is not None:
+            def progress(n_done, n_total):
+                self.progress(description, n_done, n_total, unit)
+
+        start = time.perf_counter()
+        results = []
+        try:
+            for result in self.export_engine.imap(function, files,
+                                                  progress=progress, **kwargs):
+                if on_result is None:
+                    results.append(result)
+                else:
+                    on_result(result)
+        except ExportCancelled:
+            results = None
+        finally:
+            self.export_engine = None
+            self.statistics.setdefault("tasks", []).append(
+                {"description": description, "n": len(files), "unit": unit,
+                 "seconds": time.perf_counter() - start})
+
+        return results
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Oct 21 15:20:47 2026
+
+@author: Maarten
+
+Split of the images of a dataset in a train, validation and test split. The
+split is reproducible with a seed, can be stratified by behaviour or by number
+of objects and keeps groups of images (e.g. of the same camera or pen) in the
+same split. Only the summaries of the project index are used, so no annotation
+file is opened
+"""
+#%% packages
+import re
+import random
+from collections import Counter, defaultdict
+
+#%%
+STRATIFY_OPTIONS = ["None", "Behaviour", "Objects"]
+
+def object_bucket(n_objects):
+    """
+    Bucket of the number of objects of an image: "0", "1", "2-3", "4-7", ...
+    """
+    if n_objects <= 1:
+        return str(n_objects)
+    lower = 2 ** (n_objects.bit_length() - 1)
+    return str(lower) + "-" + str(2 * lower - 1)
+
+def stratum(summary, stratify):
+    """
+    Stratum of an image
+
+    Parameters
+    ----------
+    summary : dict
+        Summary of the annotation file of the image (see ProjectIndex)
+    stratify : str
+        "Behaviour": most frequent behaviour of the objects of the image (""
+        if the image has no objects), "Objects": bucket of the number of
+        objects, "None": all images are in the same stratum
+
+    Returns
+    -------
+    str
+        Stratum
+    """
+    if stratify == "Behaviour":
+        behaviours = [str(behaviour) for behaviour in summary["behaviours"]]
+        if len(behaviours) == 0:
+            return ""
+        #most frequent behaviour, ties are broken by the name of the behaviour
+        #(list.count is faster than a Counter for the few objects of an image)
+        return min(set(behaviours),
+                   key=lambda behaviour: (-behaviours.count(behaviour), behaviour))
+    if stratify == "Objects":
+        return object_bucket(summary["n_objects"])
+    return ""
+
+def group_key(filename, group_pattern=None):
+    """
+    Group of an image: the first match of group_pattern in the name of the
+    image (its first parenthesized group, if any). Images without match and
+    all images if group_pattern is None form their own group
+
+    Parameters
+    ----------
+    filename : str
+        Name of the image
+    group_pattern : str or compiled regular expression, optional
+        Regular expression, e.g. "^[^_]+" for the prefix of the name before
+        the first underscore. The default is None.
+
+    Returns
+    -------
+    str
+        Group of the image
+    """
+    if group_pattern is None:
+        return filename
+    match = re.search(group_pattern, filename)
+    if match is None:
+        return filename
+    return match.group(1) if match.re.groups > 0 else match.group(0)
+
+def _split_counts(n_strata, fractions):
+    """
+    Number of images of every stratum in the validation and test split. The
+    counts of the strata are rounded cumulatively, so the size of every split
+    is the rounded fraction of all images and the size of every split of a
+    stratum differs less than one image from its fraction of the stratum
+    """
+    counts = []
+    total = 0
+    assigned = [0, 0]
+    for n in n_strata:
+        total += n
+        count = [round(fraction * total) - done
+                 for fraction, done in zip(fractions, assigned)]
+        count[0] = max(0, min(count[0], n))
+        count[1] = max(0, min(count[1], n - count[0]))
+        assigned = [done + c for done, c in zip(assigned, count)]
+        counts.append(count)
+    return counts
+
+def split_files(files, val_perc, test_perc, seed=None, stratify="None",
+                summaries=None, group_pattern=None):
+    """
+    Split images in a train, validation and test split
+
+    Without stratification and groups, the images are shuffled and the first
+    images are assigned to the validation split, the next ones to the test
+    split and the others to the train split. With stratification, every
+    stratum is split in the same proportions. With groups, all images of a
+    group are assigned to the same split (no leakage between the splits); the
+    groups are assigned largest first to the split which needs their images
+    (of their strata) the most. Then the seed only changes the order of
+    groups of the same size
+
+    Parameters
+    ----------
+    files : list
+        Names of the images
+    val_perc : float
+        Percentage of the images in the validation split
+    test_perc : float
+        Percentage of the images in the test split, the other images are
+        assigned to the train split
+    seed : int, optional
+        Seed of the random generator. If None, the global random generator
+        is used. The default is None.
+    stratify : str, optional
+        One of STRATIFY_OPTIONS, see stratum. The default is "None".
+    summaries : dict, optional
+        Name of the image -> summary of its annotation file (see
+        ProjectIndex). Required for stratification. The default is None.
+    group_pattern : str, optional
+        Regular expression which defines the group of an image, see
+        group_key. The default is None.
+
+    Returns
+    -------
+    list
+        Names of the images of the train, validation and test split, every
+        split sorted
+    """
+    rng = random if seed is None else random.Random(seed)
+    fractions = [max(0, 1 - (val_perc + test_perc) / 100), val_perc / 100,
+                 test_perc / 100]
+    files = list(files)
+
+    if (stratify in [None, "None"]) and (group_pattern in [None, ""]):
+        #shuffle files
+        rng.shuffle(files)
+
+        val_size = round(fractions[1] * len(files))
+        test_size = round(fractions[2] * len(files))
+
+        files_val = files[:val_size]
+        files_test = files[val_size: val_size + test_size]
+        files_train = files[val_size + test_size:] #all the other images
+
+    elif group_pattern in [None, ""]:
+        #stratified: every stratum is shuffled and split
+        strata = defaultdict(list)
+        for filename in files:
+            strata[stratum(summaries[filename], stratify)].append(filename)
+        keys = sorted(strata)
+
+        files_train, files_val, files_test = [], [], []
+        counts = _split_counts([len(strata[key]) for key in keys], fractions[1:])
+        for key, (n_val, n_test) in zip(keys, counts):
+            files_stratum = strata[key]
+            rng.shuffle(files_stratum)
+            files_val += files_stratum[:n_val]
+            files_test += files_stratum[n_val: n_val + n_test]
+            files_train += files_stratum[n_val + n_test:]
+
+    else:
+        files_train, files_val, files_test = _split_groups(
+            files, fractions, rng, stratify, summaries, group_pattern)
+
+    #sort the splits in place
+    files_train.sort()
+    files_val.sort()
+    files_test.sort()
+
+    return [files_train, files_val, files_test]
+
+def _split_groups(files, fractions, rng, stratify, summaries, group_pattern):
+    """
+    Split groups of images, see split_files
+    """
+    pattern = re.compile(group_pattern)
+
+    #images and stratum counts of every group
+    groups = defaultdict(list)
+    for filename in files:
+        groups[group_key(filename, pattern)].append(filename)
+    keys = sorted(groups)
+    rng.shuffle(keys)
+
+    counts = {}
+    totals = Counter()
+    for key in keys:
+        if stratify in [None, "None"]:
+            counts[key] = {"": len(groups[key])}
+        else:
+            counts[key] = Counter(stratum(summaries[filename], stratify)
+                                  for filename in groups[key])
+        totals.update(counts[key])
+
+    #largest groups first, groups of the same size in random order
+    keys.sort(key=lambda key: -len(groups[key]))
+
+    #remaining number of images (per stratum) every split needs. A group is
+    #assigned to the split for which the squared deviations from the targets
+    #(relative to the targets) of the number of images and of the number of
+    #images of every stratum decrease the most
+    targets = [{stratum_key: fraction * n for stratum_key, n in totals.items()}
+               for fraction in fractions]
+    needs = [dict(target) for target in targets]
+    sizes = [fraction * len(files) for fraction in fractions]
+
+    splits = [[], [], []]
+    for key in keys:
+        group_counts = counts[key]
+        n = len(groups[key])
+        scores = []
+        for split in range(3):
+            if fractions[split] <= 0:
+                scores.append(float("-inf"))
+                continue
+            need = needs[split]
+            target = targets[split]
+            scores.append(sum((2 * need[stratum_key] - count) * count /
+                              target[stratum_key]
+                              for stratum_key, count in group_counts.items()) +
+                          (2 * sizes[split] - n) * n /
+                          (fractions[split] * len(files)))
+        split = scores.index(max(scores))
+
+        splits[split] += groups[key]
+        sizes[split] -= n
+        need = needs[split]
+        for stratum_key, count in group_counts.items():
+            need[stratum_key] -= count
+
+    return splits
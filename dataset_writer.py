@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 09:12:51 2026
+
+@author: Maarten
+
+Definition of the DatasetWriter class. The DatasetWriter class writes the
+annotations.json of an exported dataset split one entry at a time, so the
+memory use doesn't grow with the size of the dataset and an interrupted export
+can be resumed
+"""
+#%% packages
+import os
+import json
+
+#%%
+def entry_text(key, entry, indent=2):
+    """
+    Text of an entry of a dictionary, as it is written by
+    json.dump(dictionary, f, indent=indent)
+
+    Parameters
+    ----------
+    key : str
+        Key of the entry
+    entry : dict
+        Value of the entry
+    indent : int, optional
+        Indentation. The default is 2.
+
+    Returns
+    -------
+    str
+        Text of the entry (without separator)
+    """
+    #strings in json never contain a newline, so every newline starts a new
+    #line which is indented one level deeper
+    text = json.dumps(entry, indent=indent).replace("\n", "\n" + " " * indent)
+    return " " * indent + json.dumps(key) + ": " + text
+
+class DatasetWriter():
+    """
+    Writes the annotations of an exported split entry by entry
+
+    Every entry is appended to a journal (annotations.jsonl, one entry per
+    line), which is flushed after every entry. When all entries are written,
+    the journal is converted to annotations.json, which is identical to
+    json.dump({"0": entry_0, "1": entry_1, ...}, f, indent=2). Both files are
+    read and written line by line, so only one entry is kept in memory. The
+    journal of an interrupted export is used to resume the export from the
+    last completed entry
+
+    Attributes
+    -----
+    self.export_path : str
+        Directory of the exported split
+
+    self.keep_jsonl : bool
+        Keep annotations.jsonl (JSON Lines variant of annotations.json) after
+        the export is finished
+
+    self.n_entries : int
+        Number of written entries
+
+    Methods
+    -----
+    self.resume
+        Continue the journal of an interrupted export
+
+    self.write
+        Write an entry
+
+    self.close
+        Finish the export, write annotations.json
+
+    self.abort
+        Stop writing, the journal is kept so the export can be resumed
+
+    self.read_entries
+        Read the entries of a finished export
+    """
+
+    def __init__(self, export_path, keep_jsonl=False):
+
+        self.export_path = export_path
+        self.keep_jsonl = keep_jsonl
+        self.n_entries = 0
+
+        self.jsonl_path = os.path.join(export_path, "annotations.jsonl")
+        self.json_path = os.path.join(export_path, "annotations.json")
+        self._file = None
+        self._mode = "w" #a new journal replaces an existing journal
+
+    @property
+    def finished(self):
+        """
+        True if the export of the split was finished
+        """
+        return os.path.exists(self.json_path)
+
+    def resume(self, images):
+        """
+        Continue the journal of an interrupted export. An incomplete last
+        entry is removed from the journal
+
+        Parameters
+        ----------
+        images : list
+            Paths of the images of all entries ("image" value of the entries),
+            in the order of the export. The journal is only resumed if its
+            entries match the first images
+
+        Returns
+        -------
+        int
+            Number of completed entries, the export continues with
+            images[n_entries]
+        """
+        self.n_entries = 0
+        if not os.path.exists(self.jsonl_path):
+            return 0
+        self._mode = "a"
+
+        n_bytes = 0 #size of the complete entries
+        with open(self.jsonl_path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    #entry which was being written
+                    break
+                try:
+                    image = json.loads(line)["image"]
+                except ValueError:
+                    break
+                if (self.n_entries >= len(images)) or\
+                    (image != images[self.n_entries]):
+                    #journal of another export, start over
+                    self.n_entries = 0
+                    n_bytes = 0
+                    break
+                self.n_entries += 1
+                n_bytes += len(line)
+
+        #remove the incomplete entry (if any)
+        with open(self.jsonl_path, "r+b") as f:
+            f.truncate(n_bytes)
+
+        return self.n_entries
+
+    def write(self, entry):
+        """
+        Write an entry
+
+        Parameters
+        ----------
+        entry : dict
+            Annotations of an image
+        """
+        if self._file is None:
+            self._file = open(self.jsonl_path, self._mode)
+
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+        self.n_entries += 1
+
+    def close(self):
+        """
+        Finish the export, annotations.json is written from the journal
+        """
+        self.abort()
+
+        temporary_path = self.json_path + ".tmp"
+        with open(temporary_path, "w") as f_json:
+            if self.n_entries == 0:
+                f_json.write("{}")
+                #an empty journal is never opened
+                open(self.jsonl_path, "w").close()
+            else:
+                f_json.write("{\n")
+                with open(self.jsonl_path) as f_jsonl:
+                    for i, line in enumerate(f_jsonl):
+                        if i > 0:
+                            f_json.write(",\n")
+                        f_json.write(entry_text(str(i), json.loads(line)))
+                f_json.write("\n}")
+        os.replace(temporary_path, self.json_path)
+
+        if not self.keep_jsonl and os.path.exists(self.jsonl_path):
+            os.remove(self.jsonl_path)
+
+    def abort(self):
+        """
+        Stop writing. The journal is kept, so the export can be resumed
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def read_entries(self):
+        """
+        Read the entries of a finished export
+
+        Returns
+        -------
+        list
+            Entries, in the order of the export. Empty if the export wasn't
+            finished
+        """
+        if not self.finished:
+            return []
+        with open(self.json_path) as f:
+            return list(json.load(f).values())
@@ -9,17 +9,14 @@ construct a wizard to export a keypoint dataset to a dataset format of choice
 """
 
 #%% import packages
-import os
-import json
-import shutil
+import re
 import tkinter as tk
 from tkinter import ttk
 import tkinter.filedialog as tkfiledialog
 import tkinter.messagebox as tkmessagebox
-import random
-import pandas as pd
-import cv2
-import numpy as np
+
+from dataset_export import DatasetExporter, DATASET_TYPES
+from dataset_split import STRATIFY_OPTIONS
 
 #%%
 
@@ -48,6 +45,16 @@ class ExportDataset(tk.Toplevel):
     self.dataset_type : tkinter.StringVar
         Dataset type
 
+    self.seed : tkinter.StringVar
+        Seed of the random split, empty for a different split every export
+
+    self.stratify : tkinter.StringVar
+        Stratification of the split, one of STRATIFY_OPTIONS
+
+    self.group_pattern : tkinter.StringVar
+        Regular expression which defines groups of images which are kept in
+        the same split, empty if every image is its own group
+
     Methods
     -----
     self.choose_directory
@@ -60,18 +67,30 @@ class ExportDataset(tk.Toplevel):
     self.confirm
         Confirm the title, directory and type and export the dataset
 
-    self.to_psota_2019
-        Export dataset to Psota_2019 format
+    self.export
+        Export the dataset with a DatasetExporter, showing the progress
+
+    self.show_progress
+        Show the progress of the export
+
+    self.ask_replace
+        Ask if an existing folder of a split may be replaced
+
+    self.ask_resume
+        Ask if an interrupted export has to be resumed
+
+    self.cancel_export
+        Cancel the running export
     """
     def __init__(self, master):
         tk.Toplevel.__init__(self, master)
         self.master = master
 
-        self.dataset_types = ["Perneel", "Psota_2019"]
+        self.dataset_types = DATASET_TYPES
         self.skeleton = self.master.skeleton
 
         #set default size
-        self.geometry('600x360')
+        self.geometry('600x470')
 
         #set title
         self.title("Export dataset")
@@ -83,21 +102,28 @@ class ExportDataset(tk.Toplevel):
         self.train_perc = tk.StringVar(value='100') #% of data in training split
         self.val_perc = tk.StringVar(value='0') #% of data in validation
         self.test_perc = tk.StringVar(value='0') #% of data in test split
+        self.seed = tk.StringVar() #seed of the random split
+        self.stratify = tk.StringVar() #stratification of the split
+        self.group_pattern = tk.StringVar() #regular expression of the groups
         self.include_empty = tk.IntVar(value=0)
         #include images without object in exported dataset
         self.include_video = tk.IntVar(value=0)
         #include corresponding videos in dataset
+        self.incremental = tk.IntVar(value=0)
+        #only update new and changed images of an existing export
 
         #set memory attributes for the split-percentage attributes
         self.train_perc.old_value = '100'
         self.val_perc.old_value = '0'
         self.test_perc.old_value = '0'
+        self.seed.old_value = ''
 
         #use .trace() to add a method to the tkinter variables that takes action
         #if the user entered an invalid value
         self.train_perc.trace('w', self.check_integer_value)
         self.val_perc.trace('w', self.check_integer_value)
         self.test_perc.trace('w', self.check_integer_value)
+        self.seed.trace('w', self.check_seed_value)
 
         #create frames
         """
@@ -114,6 +140,9 @@ class ExportDataset(tk.Toplevel):
         |  frame_split  |
         |---------------|
         |---------------|
+        |frame_sampling |
+        |---------------|
+        |---------------|
         | frame_options |
         |---------------|
         """
@@ -121,9 +150,11 @@ class ExportDataset(tk.Toplevel):
         self.frame_dir = tk.Frame(self)
         self.frame_type = tk.Frame(self)
         self.frame_split = tk.Frame(self)
+        self.frame_sampling = tk.Frame(self)
         self.frame_options = tk.Frame(self)
         frame_split_labels = tk.Frame(self.frame_split)
         frame_split_fields = tk.Frame(self.frame_split)
+        frame_sampling_fields = tk.Frame(self.frame_sampling)
         frame_options_fields = tk.Frame(self.frame_options)
 
         #create labels
@@ -141,6 +172,15 @@ class ExportDataset(tk.Toplevel):
                                    text="Validation (%)", anchor='w')
         self.label_test_perc = tk.Label(frame_split_labels,
                                    text="Test (%)", anchor='w')
+        self.label_sampling = tk.Label(self.frame_sampling,
+                                       text="Sampling", width=8, anchor='w')
+        self.label_seed = tk.Label(frame_sampling_fields,
+                                   text="Seed (empty: random)", anchor='w')
+        self.label_stratify = tk.Label(frame_sampling_fields,
+                                       text="Stratify", anchor='w')
+        self.label_group_pattern = tk.Label(frame_sampling_fields,
+                                            text="Group pattern (regex)",
+                                            anchor='w')
         self.label_options = tk.Label(self.frame_options,
                                       text="Options", anchor="w")
         self.label_include_empty = tk.Label(frame_options_fields,
@@ -149,6 +189,10 @@ class ExportDataset(tk.Toplevel):
         self.label_include_video = tk.Label(frame_options_fields,
                                             text="Include corresponding video files",
                                             anchor="w")
+        self.label_incremental = tk.Label(frame_options_fields,
+                                          text="Only update new and changed images " +
+                                          "(incremental)",
+                                          anchor="w")
 
         #create entry fields
         self.field_title = tk.Entry(self.frame_title,
@@ -166,6 +210,12 @@ class ExportDataset(tk.Toplevel):
         self.field_test_perc = tk.Entry(self.frame_split,
                                         width=3,
                                         textvariable=self.test_perc)
+        self.field_seed = tk.Entry(frame_sampling_fields,
+                                   width=12,
+                                   textvariable=self.seed)
+        self.field_group_pattern = tk.Entry(frame_sampling_fields,
+                                            width=30,
+                                            textvariable=self.group_pattern)
 
         #create checkboxes/checkbuttons
         self.checkbtn_include_empty = tk.Checkbutton(frame_options_fields,
@@ -174,6 +224,9 @@ class ExportDataset(tk.Toplevel):
         self.checkbtn_include_video = tk.Checkbutton(frame_options_fields,
                                                      variable=self.include_video,
                                                      height=1)
+        self.checkbtn_incremental = tk.Checkbutton(frame_options_fields,
+                                                   variable=self.incremental,
+                                                   height=1)
 
         #create drop down boxes
         self.field_type = ttk.Combobox(self.frame_type,
@@ -181,11 +234,18 @@ class ExportDataset(tk.Toplevel):
                                        width=22,
                                        textvariable=self.dataset_type)
 
+        self.field_stratify = ttk.Combobox(frame_sampling_fields,
+                                           state="readonly",
+                                           width=10,
+                                           textvariable=self.stratify)
+
         #add values to drop down boxes
         self.field_type['values'] = tuple(self.dataset_types)
+        self.field_stratify['values'] = tuple(STRATIFY_OPTIONS)
 
         #set default value for drop down box
         self.dataset_type.set(self.dataset_types[0])
+        self.stratify.set(STRATIFY_OPTIONS[0])
 
         #create buttons
         #create an invisible image of 1 pixel
@@ -210,6 +270,20 @@ class ExportDataset(tk.Toplevel):
                                    text="OK",
                                    command=self.confirm)
 
+        #progress of the export, only shown while exporting
+        self.exporter = None
+        self.frame_progress = tk.Frame(self)
+        self.label_progress = tk.Label(self.frame_progress, anchor='w')
+        self.progressbar = ttk.Progressbar(self.frame_progress,
+                                           orient="horizontal",
+                                           mode="determinate")
+        self.button_cancel = tk.Button(self.frame_progress,
+                                       text="Cancel",
+                                       command=self.cancel_export)
+        self.label_progress.pack(anchor='nw', padx=5)
+        self.progressbar.pack(side='left', fill='x', expand=True, padx=5)
+        self.button_cancel.pack(side='left', padx=5)
+
         #pack all elements
         #frame_title
         self.label_title.pack(side='left', anchor='nw', padx=5)
@@ -237,6 +311,17 @@ class ExportDataset(tk.Toplevel):
         self.field_test_perc.pack(side='top', anchor='nw', padx=5)
         frame_split_fields.pack(side='left', anchor='nw')
 
+        #frame_sampling
+        self.label_sampling.pack(side='left', anchor='nw', padx=5)
+
+        self.label_seed.grid(sticky="w", row=0, column=0, padx=5)
+        self.label_stratify.grid(sticky="w", row=1, column=0, padx=5)
+        self.label_group_pattern.grid(sticky="w", row=2, column=0, padx=5)
+        self.field_seed.grid(sticky="w", row=0, column=1, padx=5)
+        self.field_stratify.grid(sticky="w", row=1, column=1, padx=5)
+        self.field_group_pattern.grid(sticky="w", row=2, column=1, padx=5)
+        frame_sampling_fields.pack(side='left', anchor="nw")
+
         #frame_options
         self.label_options.pack(side='left', anchor='nw', padx=5)
 
@@ -244,6 +329,8 @@ class ExportDataset(tk.Toplevel):
         self.checkbtn_include_video.grid(sticky="w", row=1, column=0)
         self.label_include_empty.grid(sticky="w", row=0, column=1)
         self.label_include_video.grid(sticky="w", row=1, column=1)
+        self.checkbtn_incremental.grid(sticky="w", row=2, column=0)
+        self.label_incremental.grid(sticky="w", row=2, column=1)
         frame_options_fields.pack(side='left', anchor="nw")
 
         #self
@@ -251,6 +338,7 @@ class ExportDataset(tk.Toplevel):
         self.frame_dir.pack(pady=5, anchor='nw')
         self.frame_type.pack(pady=5, anchor='nw')
         self.frame_split.pack(pady=5, anchor='nw')
+        self.frame_sampling.pack(pady=5, anchor='nw')
         self.frame_options.pack(pady=5, anchor='nw')
         self.button_ok.pack(pady=5, side="bottom")
 
@@ -300,438 +388,170 @@ class ExportDataset(tk.Toplevel):
         """
         Confirm the title, directory, type, dataset split and export the dataset
 
-        Depending on the dataset type, the appropriate method, responsible for
-        the actual exporting, will be called
+        The actual export is done by a DatasetExporter
         """
 
         #normalize dataset split percentages so they sum up to 100%
         #if this would not be the case
 
-        #get values
-        train_perc =  int(self.train_perc.get())
-        val_perc =  int(self.val_perc.get())
-        test_perc =  int(self.test_perc.get())
+        #get values (an empty field is a zero entry)
+        train_perc =  int(self.train_perc.get() or 0)
+        val_perc =  int(self.val_perc.get() or 0)
+        test_perc =  int(self.test_perc.get() or 0)
 
         #calculate sum of split percentages
         split_sum = train_perc + val_perc + test_perc
+        if split_sum == 0:
+            #no split given, all images in the training split
+            train_perc, split_sum = 100, 100
 
         #renormalise if necessary
         if split_sum != 100:
-            train_perc = round(train_perc / split_sum)
-            val_perc = round(val_perc / split_sum)
-            test_perc = round(test_perc / split_sum)
+            train_perc = round(100 * train_perc / split_sum)
+            val_perc = round(100 * val_perc / split_sum)
+            test_perc = round(100 * test_perc / split_sum)
 
             #if all three splits are equal, the previous calculations
             #will result in a sum of 99 instaed of 100
             if train_perc + val_perc + test_perc != 100:
                 train_perc = 100 - val_perc - test_perc
 
-            #assign new values
-            self.train_perc.set(str(train_perc))
-            self.val_perc.set(str(val_perc))
-            self.test_perc.set(str(test_perc))
-
-        #get dataset type
-        dataset_type = self.dataset_type.get()
+        #assign new values
+        self.train_perc.set(str(train_perc))
+        self.val_perc.set(str(val_perc))
+        self.test_perc.set(str(test_perc))
 
-        if dataset_type == "Psota_2019":
-            self.to_psota_2019()
-        elif dataset_type == "Perneel":
-            self.to_perneel()
-        else:
-            message = "something went wrong"
+        #check the regular expression of the groups
+        try:
+            re.compile(self.group_pattern.get())
+        except re.error as error:
             tkmessagebox.showerror(title="Error",
-                                   message=message)
+                                   message="Invalid group pattern: " + str(error))
+            self.field_group_pattern.focus()
             return
 
-    def to_psota_2019(self):
+        #export the dataset
+        self.export()
+
+    def export(self):
         """
-        Export dataset to Psota_2019 format.
+        Export the dataset with a DatasetExporter, while the progress is shown
+        in the wizard. The wizard is closed when the export is finished
         """
+        self.exporter = DatasetExporter(
+            project_dir=self.master.wdir,
+            export_dir=self.wdir.get(),
+            title=self.dataset_title.get(),
+            dataset_type=self.dataset_type.get(),
+            keypoint_names=self.skeleton.keypoints,
+            val_perc=float(self.val_perc.get()),
+            test_perc=float(self.test_perc.get()),
+            seed=int(self.seed.get()) if self.seed.get() != '' else None,
+            stratify=self.stratify.get(),
+            group_pattern=self.group_pattern.get() or None,
+            include_empty=self.include_empty.get() == 1,
+            include_video=self.include_video.get() == 1,
+            incremental=self.incremental.get() == 1,
+            settings=self.master.settings,
+            project_index=self.master.project_index,
+            progress=self.show_progress,
+            ask_replace=self.ask_replace,
+            ask_resume=self.ask_resume,
+            inform=lambda message: tkmessagebox.showinfo(title="Export",
+                                                         message=message))
+
+        #show the progress instead of the OK button
+        self.button_ok.pack_forget()
+        self.frame_progress.pack(pady=5, side="bottom", fill='x')
+        self.protocol("WM_DELETE_WINDOW", self.cancel_export)
+
+        try:
+            finished = self.exporter.export()
+        finally:
+            self.exporter = None
+            self.protocol("WM_DELETE_WINDOW", self.destroy)
+            self.frame_progress.pack_forget()
+            self.button_ok.pack(pady=5, side="bottom")
+
+        if finished:
+            #Destroy wizard
+            self.destroy()
+
+    def show_progress(self, description, n_done, n_total, unit):
+        """
+        Show the progress of the export
 
-        #list all valid images
-        files_list = os.listdir()
-        files = []
-        for filename in files_list:
-            if (len(filename.split(".")) == 2) and\
-                (filename.split(".")[-1] in ['png', 'jpg']) and\
-                (filename.split(".")[0] + ".json" in files_list):
-                #file is an image (.jpg or .png), accompanied with a .json file
-                #with annotations
-
-                if self.include_empty.get() == 1:
-                    #all images may be included in the exported dataset
-                    files.append(filename)
-                else: #self.include_empty.get() == 0:
-                    #only images with annotated objects may be included
-
-                    #read annotations
-                    with open(filename.split(".")[0] + ".json") as f:
-                        dict_annotations = json.load(f)
-
-                    if "keypoints" in dict_annotations:
-                        n_keypoints = len(dict_annotations["keypoints"]\
-                                          [self.skeleton.keypoints[0]])
-                        if n_keypoints > 0:
-                            #image contains annotated objects
-                            files.append(filename)
-
-        #if no valid files are present, end method
-        if len(files) == 0:
-            return
+        Parameters
+        ----------
+        description : str
+            Description of the running task
+        n_done : int
+            Number of finished items
+        n_total : int
+            Number of items
+        unit : str
+            Unit of the items, e.g. "images"
+        """
+        self.label_progress.config(text=description + ": " +
+                                   str(n_done) + "/" + str(n_total) + " " + unit)
+        self.progressbar.config(maximum=n_total, value=n_done)
+        #process gui events, e.g. a click on the cancel button
+        self.update()
+
+    def ask_replace(self, export_path):
+        """
+        Ask if an existing folder of a split may be replaced
 
-        #create splits (train, validation, test)
-
-        #shuffle files
-        random.shuffle(files) #shuffles the list in place
-
-        val_size = round(float(self.val_perc.get()) / 100 * len(files))
-        test_size = round(float(self.test_perc.get()) / 100 * len(files))
-
-        files_val =  files[:val_size]
-        files_test = files[val_size: val_size + test_size]
-        files_train = files[val_size + test_size:] #all the other images
-
-        #sort the splits in place
-        files_train.sort()
-        files_val.sort()
-        files_test.sort()
-
-        lists_files = [files_train, files_val, files_test]
-        suffices = ["_train", "_val", "_test"]
-
-        for split in range(3):
-            files = lists_files[split]
-
-            if len(files) > 0:
-                #check if there are filenames in files
-
-                #construct export path and make all directories
-                try:
-                    export_path = os.path.join(self.wdir.get(),
-                                               self.dataset_title.get() + suffices[split])
-                    os.mkdir(export_path)
-                    os.mkdir(os.path.join(export_path, "images"))
-                    if self.include_video:
-                        os.mkdir(os.path.join(export_path, "video"))
-                except FileExistsError:
-                    message = export_path + " already exists\n\n" +\
-                              "Do you want to replace the existing folder?"
-                    answer = tkmessagebox.askyesnocancel(title="Error",
-                                                         message=message)
-                    if answer is None:
-                        #Destroy wizard
-                        self.destroy()
-                    if answer:
-                        #answer is True/Yes
-                        #replace directories
-                        shutil.rmtree(export_path)
-                        os.mkdir(export_path)
-                        os.mkdir(os.path.join(export_path, "images"))
-                    else:
-                        #answer is False/No
-                        #return to wizard and set focus on first entryfield
-                        self.field_title.focus()
-                        self.field_title.select_range(0, "end")
-                        return
-
-                #create export dictionary
-                dataset_dict = {}
-
-                i = 0
-                for filename in files:
-                    if (len(filename.split(".")) == 2) and\
-                        (filename.split(".")[-1] in ['png', 'jpg']) and\
-                        (filename.split(".")[0] + ".json" in files_list):
-                        #file is an image (.jpg or .png), accompanied with a .json file
-                        #with annotations
-
-                        #read image
-                        image = cv2.imread(filename)
-
-                        #read annotations
-                        with open(filename.split(".")[0] + ".json") as f:
-                            dict_annotations = json.load(f)
-
-                        #apply masks (if present)
-                        if "masks" in dict_annotations:
-                            masks = dict_annotations["masks"]
-
-                            #apply masks
-                            for key in masks:
-                                #extract edges of mask
-                                points_dict = masks[key]["points"]
-                                mask = np.empty(shape=(0,2))
-                                for point_key in points_dict:
-                                    x = points_dict[point_key]['x']
-                                    y = points_dict[point_key]['y']
-                                    mask = np.append(mask,[[x, y]], axis=0)
-
-                                #round coordinates and draw mask on image
-                                mask = np.int64(mask).reshape((-1, 1, 2))
-
-                                image= cv2.fillPoly(image,
-                                                    [mask],
-                                                    color=[0,0,0])
-
-                        #get keypoint annotations
-                        if "keypoints" in dict_annotations:
-                            dict_keypoints = {}
-                            for key, item in dict_annotations["keypoints"].items():
-                                coordinates = np.array(item)
-                                dict_keypoints[key + "_x"] = coordinates[:,0].tolist()
-                                dict_keypoints[key + "_y"] = coordinates[:,1].tolist()
-
-                            df_keypoints = pd.DataFrame(dict_keypoints)
-                            del dict_keypoints
-
-                            if len(df_keypoints) > 0:
-                                objects_present = True
-                            else: #len(df_keypoints) == 0:
-                                #no objects (annotated) on image
-                                objects_present = False
-
-                        #Python is zero based, Matlab (and Psota) one based, therefore
-                        #we have to increase all locations with one
-                        df_keypoints = df_keypoints + 1
-                        #replace NaN with zero
-                        df_keypoints = df_keypoints.fillna(0)
-
-                        #construct dictionary for image
-                        dict_image = {}
-                        dict_image["image"] = "images/" + filename
-
-                        for j, keypoint in enumerate(self.skeleton.keypoints):
-                            if objects_present:
-                                #add keypoint coordinates
-                                dict_image[keypoint] = \
-                                    df_keypoints.iloc[:, 2 * j: 2 * j + 2].\
-                                    to_numpy().tolist()
-                            else:
-                                #no objects present on image
-                                dict_image[keypoint] = []
-
-                        #save image
-                        cv2.imwrite(os.path.join(export_path, "images", filename),
-                                    image)
-
-                        #copy video file if present
-                        if self.include_video:
-                            extensions = [".mp4", ".avi", ".mov"]
-                            for ext in extensions:
-                                video_name = filename.split(".")[0] + ext
-                                if video_name in files_list:
-                                    src = video_name
-                                    dst = os.path.join(export_path, "video", video_name)
-                                    shutil.copyfile(src, dst)
-
-                        #add image dictionary to dataset dictionary
-                        dataset_dict[str(i)] = dict_image
-                        i += 1
-
-                #write json file
-                os.chdir(export_path)
-                file = open("annotations.json", "w")
-                json.dump(dataset_dict, file, indent=2)
-                file.close()
-                #return to project directory
-                os.chdir(self.master.wdir)
-
-        #Destroy wizard
-        self.destroy()
-
-    def to_perneel(self):
+        Parameters
+        ----------
+        export_path : str
+            Directory of the exported split
+
+        Returns
+        -------
+        bool
+            True if the folder may be replaced
         """
-        Export dataset to Psota_2019 format.
+        message = export_path + " already exists\n\n" +\
+                  "Do you want to replace the existing folder?"
+        answer = tkmessagebox.askyesnocancel(title="Error",
+                                             message=message)
+        if answer is None:
+            #Destroy wizard
+            self.destroy()
+        elif not answer:
+            #answer is False/No
+            #return to wizard and set focus on first entryfield
+            self.field_title.focus()
+            self.field_title.select_range(0, "end")
+
+        return bool(answer)
+
+    def ask_resume(self, title):
         """
+        Ask if an interrupted export has to be resumed
 
-        #list all valid images
-        files_list = os.listdir()
-        files = []
-        for filename in files_list:
-            if (len(filename.split(".")) == 2) and\
-                (filename.split(".")[-1] in ['png', 'jpg']) and\
-                (filename.split(".")[0] + ".json" in files_list):
-                #file is an image (.jpg or .png), accompanied with a .json file
-                #with annotations
-
-                if self.include_empty.get() == 1:
-                    #all images may be included in the exported dataset
-                    files.append(filename)
-                else: #self.include_empty.get() == 0:
-                    #only images with annotated objects may be included
-
-                    #read annotations
-                    with open(filename.split(".")[0] + ".json") as f:
-                        dict_annotations = json.load(f)
-
-                    if "keypoints" in dict_annotations:
-                        n_keypoints = len(dict_annotations["keypoints"]\
-                                          [self.skeleton.keypoints[0]])
-                        if n_keypoints > 0:
-                            #image contains annotated objects
-                            files.append(filename)
-
-        #if no valid files are present, end method
-        if len(files) == 0:
-            return
+        Parameters
+        ----------
+        title : str
+            Title of the exported dataset
+
+        Returns
+        -------
+        bool
+            True if the export has to be resumed
+        """
+        message = "An interrupted export of " + title +\
+                  " was found\n\nDo you want to resume it?"
+        return tkmessagebox.askyesno(title="Resume export", message=message)
 
-        #create splits (train, validation, test)
-
-        #shuffle files
-        random.shuffle(files) #shuffles the list in place
-
-        val_size = round(float(self.val_perc.get()) / 100 * len(files))
-        test_size = round(float(self.test_perc.get()) / 100 * len(files))
-
-        files_val =  files[:val_size]
-        files_test = files[val_size: val_size + test_size]
-        files_train = files[val_size + test_size:] #all the other images
-
-        #sort the splits in place
-        files_train.sort()
-        files_val.sort()
-        files_test.sort()
-
-        lists_files = [files_train, files_val, files_test]
-        suffices = ["_train", "_val", "_test"]
-
-        for split in range(3):
-            files = lists_files[split]
-
-            if len(files) > 0:
-                #check if there are filenames in files
-
-                #construct export path and make all directories
-                try:
-                    export_path = os.path.join(self.wdir.get(),
-                                               self.dataset_title.get() + suffices[split])
-                    os.mkdir(export_path)
-                    os.mkdir(os.path.join(export_path, "images"))
-                    if self.include_video:
-                        os.mkdir(os.path.join(export_path, "video"))
-                except FileExistsError:
-                    message = export_path + " already exists\n\n" +\
-                              "Do you want to replace the existing folder?"
-                    answer = tkmessagebox.askyesnocancel(title="Error",
-                                                         message=message)
-                    if answer is None:
-                        #Destroy wizard
-                        self.destroy()
-                    if answer:
-                        #answer is True/Yes
-                        #replace directories
-                        shutil.rmtree(export_path)
-                        os.mkdir(export_path)
-                        os.mkdir(os.path.join(export_path, "images"))
-                    else:
-                        #answer is False/No
-                        #return to wizard and set focus on first entryfield
-                        self.field_title.focus()
-                        self.field_title.select_range(0, "end")
-                        return
-
-                #create export dictionary
-                dataset_dict = {}
-
-                i = 0
-                for filename in files:
-                    if (len(filename.split(".")) == 2) and\
-                        (filename.split(".")[-1] in ['png', 'jpg']) and\
-                        (filename.split(".")[0] + ".json" in files_list):
-                        #file is an image (.jpg or .png), accompanied with a .json file
-                        #with annotations
-
-                        #read image
-                        image = cv2.imread(filename)
-
-                        #read annotations
-                        with open(filename.split(".")[0] + ".json") as f:
-                            dict_annotations = json.load(f)
-
-                        #apply masks (if present)
-                        if "masks" in dict_annotations:
-                            masks = dict_annotations["masks"]
-
-                            #apply masks
-                            for key in masks:
-                                #extract edges of mask
-                                points_dict = masks[key]["points"]
-                                mask = np.empty(shape=(0,2))
-                                for point_key in points_dict:
-                                    x = points_dict[point_key]['x']
-                                    y = points_dict[point_key]['y']
-                                    mask = np.append(mask,[[x, y]], axis=0)
-
-                                #round coordinates and draw mask on image
-                                mask = np.int64(mask).reshape((-1, 1, 2))
-
-                                image= cv2.fillPoly(image,
-                                                    [mask],
-                                                    color=[0,0,0])
-
-                        #get keypoint annotations
-                        if "keypoints" in dict_annotations:
-                            dict_keypoints = {}
-
-                            for key, item in dict_annotations["keypoints"].items():
-                                coordinates = np.array(item)
-
-                                #Python is zero based, exported coordinates are
-                                #one based, therefore we have to increase all
-                                #locations with one
-                                coordinates = coordinates + 1
-
-                                #In the perneel convention, nan values are
-                                #kept as nan (and not replaced by zeros)
-
-                                #add to dict_keypoints
-                                dict_keypoints[key] = coordinates.tolist()
-
-                        else: #"keypoints" not in dict_annotations:
-                            for j, keypoint in enumerate(self.skeleton.keypoints):
-                                dict_keypoints[keypoint] = []
-
-                        #get behaviour annotations in right format
-                        behaviour_list = []
-                        for key, item in dict_annotations["behaviour"]["behaviour"].items():
-                            behaviour_list.append(item)
-
-                        #construct dictionary for image
-                        dict_image = {}
-                        dict_image["image"] = "images/" + filename
-                        dict_image["keypoints"] = dict_keypoints
-                        dict_image["behaviour"] = behaviour_list
-                        dict_image["masks"] = dict_annotations["masks"]
-
-                        #save image
-                        cv2.imwrite(os.path.join(export_path, "images", filename),
-                                    image)
-
-                        #copy video file if present
-                        if self.include_video:
-                            extensions = [".mp4", ".avi", ".mov"]
-                            for ext in extensions:
-                                video_name = filename.split(".")[0] + ext
-                                if video_name in files_list:
-                                    src = video_name
-                                    dst = os.path.join(export_path, "video", video_name)
-                                    shutil.copyfile(src, dst)
-
-                        #add image dictionary to dataset dictionary
-                        dataset_dict[str(i)] = dict_image
-                        i += 1
-
-                #write json file
-                os.chdir(export_path)
-                file = open("annotations.json", "w")
-                json.dump(dataset_dict, file, indent=2)
-                file.close()
-                #return to project directory
-                os.chdir(self.master.wdir)
-
-        #Destroy wizard
-        self.destroy()
+    def cancel_export(self):
+        """
+        Cancel the running export, the images which are being exported are
+        finished
+        """
+        if self.exporter is not None:
+            self.exporter.cancel()
 
     def check_integer_value(self, *args):
         """
@@ -760,3 +580,13 @@ class ExportDataset(tk.Toplevel):
             else:
                 # there's non-digit characters in the input; reject this
                 textvar.set(textvar.old_value)
+
+    def check_seed_value(self, *args):
+        """
+        Check if the changes to self.seed still result in a valid entry (empty
+        or a non-negative integer), otherwise the changes are undone
+        """
+        if self.seed.get().isdigit() or (self.seed.get() == ''):
+            self.seed.old_value = self.seed.get()
+        else:
+            self.seed.set(self.seed.old_value)
@@ -0,0 +1,772 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 16:05:37 2026
+
+@author: Maarten
+
+Export of the images of a dataset split. The export of a single image (reading
+the image, applying the masks, writing the image and collecting its
+annotations) is a pure function, so the images can be exported in parallel by
+the ExportEngine class. Images without masks are linked or copied instead of
+re-encoded. Images can also be exported to tar shards, one shard per task, or
+to fixed-size tensors, one row per task
+"""
+#%% packages
+import os
+import io
+import json
+import shutil
+import tarfile
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import pandas as pd
+import cv2
+import numpy as np
+from PIL import Image
+try:
+    import fcntl #only available on unix
+except ImportError:
+    fcntl = None
+
+#%% export of a single image
+def _read_annotations(filename, project_dir):
+    """
+    Read the .json annotation file of an image
+    """
+    with open(os.path.join(project_dir, filename.split(".")[0] + ".json")) as f:
+        return json.load(f)
+
+def _mask_polygons(dict_annotations):
+    """
+    Corners of the masks of an image, as drawn on the image
+
+    Returns
+    -------
+    list
+        (n_points, 2) x, y coordinates (truncated to integers) of every mask
+    """
+    #the points of a mask are converted at once, instead of appending them
+    #one by one (which copies the array for every point)
+    return [np.array([[point['x'], point['y']] for point in mask["points"].values()],
+                     dtype=np.float64).astype(np.int64).reshape((-1, 2))
+            for mask in dict_annotations.get("masks", {}).values()]
+
+def _apply_masks(image, polygons):
+    """
+    Draw the masks of an image (polygons, see _mask_polygons) in black on the
+    image
+    """
+    for mask in polygons:
+        #draw mask on image
+        image = cv2.fillPoly(image,
+                             [mask.reshape((-1, 1, 2))],
+                             color=[0,0,0])
+
+    return image
+
+#ioctl request of linux to share the data blocks of two files (reflink)
+_FICLONE = 0x40049409
+
+def link_file(src, dst, link_mode="reflink"):
+    """
+    Create dst with the same content as src, without decoding or re-encoding
+    it. An existing file dst is replaced
+
+    Parameters
+    ----------
+    src : str
+        Path of the source file
+    dst : str
+        Path of the new file
+    link_mode : str, optional
+        "hardlink": dst is a hard link to src (dst shares its data with src,
+        so modifying dst in place also modifies src), if that fails a reflink
+        is tried.
+        "reflink": dst shares the data blocks of src until one of both is
+        modified (copy-on-write, only supported by some file systems on
+        linux), if that fails the file is copied.
+        "copy": the bytes of src are copied.
+        The default is "reflink".
+    """
+    #remove an existing dst, so a hard link to another file isn't modified
+    if os.path.lexists(dst):
+        os.remove(dst)
+
+    if link_mode == "hardlink":
+        try:
+            os.link(src, dst)
+            return
+        except OSError:
+            #different file systems or no support for hard links
+            link_mode = "reflink"
+
+    if link_mode == "reflink" and fcntl is not None:
+        try:
+            with open(src, "rb") as f_src, open(dst, "wb") as f_dst:
+                fcntl.ioctl(f_dst.fileno(), _FICLONE, f_src.fileno())
+            return
+        except OSError:
+            #no support for reflinks, copy the file instead
+            pass
+
+    shutil.copyfile(src, dst)
+
+def _needs_decoding(image_path, polygons):
+    """
+    Check if an image has to be decoded to export it. If not, the exported
+    image is a copy of the original file
+
+    An image is decoded if one of its masks covers pixels of the image, or if
+    a copy of the file wouldn't result in the same (8 bit, 3 channel, upright)
+    image as cv2.imread, e.g. for images with an EXIF orientation
+    """
+    with Image.open(image_path) as image:
+        width, height = image.size
+        if image.mode != "RGB" or image.getexif().get(0x0112, 1) != 1:
+            return True
+
+    for mask in polygons:
+        if len(mask) == 0:
+            continue
+
+        #coordinates are truncated in the same way as by _apply_masks
+        (x_min, y_min), (x_max, y_max) = mask.min(axis=0), mask.max(axis=0)
+        if (x_max >= 0) and (x_min < width) and (y_max >= 0) and (y_min < height):
+            #bounding box of the mask overlaps the image
+            return True
+
+    return False
+
+def _export_image_file(filename, dict_annotations, project_dir, export_path,
+                       include_video, link_mode):
+    """
+    Write the (masked) image to the export folder and copy the corresponding
+    video files. Images without masks that cover the image are not decoded,
+    but linked or copied
+    """
+    src = os.path.join(project_dir, filename)
+    dst = os.path.join(export_path, "images", filename)
+
+    #the polygons of the masks are built once, for both checking and drawing
+    polygons = _mask_polygons(dict_annotations)
+
+    if _needs_decoding(src, polygons):
+        #read image
+        image = cv2.imread(src)
+
+        #apply masks (if present)
+        image = _apply_masks(image, polygons)
+
+        #save image
+        if os.path.lexists(dst):
+            os.remove(dst)
+        cv2.imwrite(dst, image)
+    else:
+        link_file(src, dst, link_mode)
+
+    #copy video file if present
+    if include_video:
+        extensions = [".mp4", ".avi", ".mov"]
+        for ext in extensions:
+            video_name = filename.split(".")[0] + ext
+            src = os.path.join(project_dir, video_name)
+            if os.path.exists(src):
+                dst = os.path.join(export_path, "video", video_name)
+                link_file(src, dst, link_mode)
+
+def _image_bytes(filename, dict_annotations, project_dir):
+    """
+    Content of the exported (masked) image file. Images without masks that
+    cover the image are not decoded, their file is read as is
+    """
+    src = os.path.join(project_dir, filename)
+
+    #the polygons of the masks are built once, for both checking and drawing
+    polygons = _mask_polygons(dict_annotations)
+
+    if _needs_decoding(src, polygons):
+        #read image and apply masks (if present)
+        image = _apply_masks(cv2.imread(src), polygons)
+
+        #encode in the same format as the original file
+        _, buffer = cv2.imencode("." + filename.split(".")[-1], image)
+        return buffer.tobytes()
+
+    with open(src, "rb") as f:
+        return f.read()
+
+def _perneel_annotations(filename, dict_annotations, keypoint_names):
+    """
+    Annotations of an image in the Perneel format
+    """
+    #get keypoint annotations
+    dict_keypoints = {}
+    if "keypoints" in dict_annotations:
+        for key, item in dict_annotations["keypoints"].items():
+            coordinates = np.array(item)
+
+            #Python is zero based, exported coordinates are
+            #one based, therefore we have to increase all
+            #locations with one
+            coordinates = coordinates + 1
+
+            #In the perneel convention, nan values are
+            #kept as nan (and not replaced by zeros)
+
+            #add to dict_keypoints
+            dict_keypoints[key] = coordinates.tolist()
+
+    else: #"keypoints" not in dict_annotations:
+        for j, keypoint in enumerate(keypoint_names):
+            dict_keypoints[keypoint] = []
+
+    #get behaviour annotations in right format
+    behaviour_list = []
+    for key, item in dict_annotations["behaviour"]["behaviour"].items():
+        behaviour_list.append(item)
+
+    #construct dictionary for image
+    dict_image = {}
+    dict_image["image"] = "images/" + filename
+    dict_image["keypoints"] = dict_keypoints
+    dict_image["behaviour"] = behaviour_list
+    dict_image["masks"] = dict_annotations["masks"]
+
+    return dict_image
+
+def export_image_psota_2019(filename, project_dir, export_path, keypoint_names,
+                            include_video=False, link_mode="reflink"):
+    """
+    Export an image in the Psota_2019 format
+
+    Parameters
+    ----------
+    filename : str
+        Name of the image, in the project directory
+    project_dir : str
+        Project directory
+    export_path : str
+        Directory of the exported split, the image is written to its folder
+        "images", the video files to its folder "video"
+    keypoint_names : list
+        Names of the keypoints of the skeleton
+    include_video : bool, optional
+        Copy the video files corresponding with the image (same name, with
+        extension .mp4, .avi or .mov) to the export directory. The default is
+        False.
+    link_mode : str, optional
+        How images without masks and video files are copied, see link_file.
+        The default is "reflink".
+
+    Returns
+    -------
+    dict
+        Annotations of the image in the Psota_2019 format
+    """
+    #read annotations
+    dict_annotations = _read_annotations(filename, project_dir)
+
+    #get keypoint annotations
+    df_keypoints = pd.DataFrame()
+    objects_present = False
+    if "keypoints" in dict_annotations:
+        dict_keypoints = {}
+        for key, item in dict_annotations["keypoints"].items():
+            coordinates = np.array(item)
+            dict_keypoints[key + "_x"] = coordinates[:,0].tolist()
+            dict_keypoints[key + "_y"] = coordinates[:,1].tolist()
+
+        df_keypoints = pd.DataFrame(dict_keypoints)
+        del dict_keypoints
+
+        if len(df_keypoints) > 0:
+            objects_present = True
+        else: #len(df_keypoints) == 0:
+            #no objects (annotated) on image
+            objects_present = False
+
+    #Python is zero based, Matlab (and Psota) one based, therefore
+    #we have to increase all locations with one
+    df_keypoints = df_keypoints + 1
+    #replace NaN with zero
+    df_keypoints = df_keypoints.fillna(0)
+
+    #construct dictionary for image
+    dict_image = {}
+    dict_image["image"] = "images/" + filename
+
+    for j, keypoint in enumerate(keypoint_names):
+        if objects_present:
+            #add keypoint coordinates
+            dict_image[keypoint] = \
+                df_keypoints.iloc[:, 2 * j: 2 * j + 2].\
+                to_numpy().tolist()
+        else:
+            #no objects present on image
+            dict_image[keypoint] = []
+
+    _export_image_file(filename, dict_annotations, project_dir, export_path,
+                       include_video, link_mode)
+
+    return dict_image
+
+def export_image_perneel(filename, project_dir, export_path, keypoint_names,
+                         include_video=False, link_mode="reflink"):
+    """
+    Export an image in the Perneel format
+
+    Parameters
+    ----------
+    filename : str
+        Name of the image, in the project directory
+    project_dir : str
+        Project directory
+    export_path : str
+        Directory of the exported split, the image is written to its folder
+        "images", the video files to its folder "video"
+    keypoint_names : list
+        Names of the keypoints of the skeleton
+    include_video : bool, optional
+        Copy the video files corresponding with the image (same name, with
+        extension .mp4, .avi or .mov) to the export directory. The default is
+        False.
+    link_mode : str, optional
+        How images without masks and video files are copied, see link_file.
+        The default is "reflink".
+
+    Returns
+    -------
+    dict
+        Annotations of the image in the Perneel format
+    """
+    #read annotations
+    dict_annotations = _read_annotations(filename, project_dir)
+    dict_image = _perneel_annotations(filename, dict_annotations, keypoint_names)
+
+    _export_image_file(filename, dict_annotations, project_dir, export_path,
+                       include_video, link_mode)
+
+    return dict_image
+
+def export_image_columnar(filename, project_dir, export_path, keypoint_names,
+                          include_video=False, link_mode="reflink"):
+    """
+    Export an image for the columnar format (see ColumnarWriter)
+
+    Parameters
+    ----------
+    filename : str
+        Name of the image, in the project directory
+    project_dir : str
+        Project directory
+    export_path : str
+        Directory of the exported split, the image is written to its folder
+        "images", the video files to its folder "video"
+    keypoint_names : list
+        Names of the keypoints of the skeleton
+    include_video : bool, optional
+        Copy the video files corresponding with the image (same name, with
+        extension .mp4, .avi or .mov) to the export directory. The default is
+        False.
+    link_mode : str, optional
+        How images without masks and video files are copied, see link_file.
+        The default is "reflink".
+
+    Returns
+    -------
+    dict
+        Annotations of the image in the Perneel format, with the names of the
+        objects ("names")
+    """
+    #read annotations once, for the Perneel annotations and the names
+    dict_annotations = _read_annotations(filename, project_dir)
+    dict_image = _perneel_annotations(filename, dict_annotations, keypoint_names)
+
+    #add the names of the objects
+    dict_image["names"] = list(dict_annotations.get("names", {}).get("name", {}).values())
+
+    _export_image_file(filename, dict_annotations, project_dir, export_path,
+                       include_video, link_mode)
+
+    return dict_image
+
+def _add_to_tar(tar, name, content, mtime):
+    """
+    Add a file with content (bytes) to an open tar file
+    """
+    info = tarfile.TarInfo(name)
+    info.size = len(content)
+    info.mtime = mtime
+    tar.addfile(info, io.BytesIO(content))
+
+def _shard_entry(path):
+    """
+    Index entry of an existing shard
+    """
+    with tarfile.open(path) as tar:
+        keys = [name[:-len(".json")] for name in tar.getnames()
+                if name.endswith(".json")]
+
+    return {"name": os.path.basename(path),
+            "n_samples": len(keys),
+            "n_bytes": os.path.getsize(path),
+            "keys": keys}
+
+def export_shard(shard, project_dir, export_path, keypoint_names,
+                 include_video=False):
+    """
+    Export images to a tar shard, in the WebDataset layout: the files of a
+    sample have the same key (name of the image without extension), e.g.
+    00002.jpg (masked image), 00002.json (annotations in the Perneel format)
+    and 00002.mp4 (video). A shard which exists already is kept, so an
+    interrupted export continues with the unfinished shards
+
+    Parameters
+    ----------
+    shard : tuple
+        Name of the shard file and names of the images in the shard
+    project_dir : str
+        Project directory
+    export_path : str
+        Directory of the exported split, the shard is written to this
+        directory
+    keypoint_names : list
+        Names of the keypoints of the skeleton
+    include_video : bool, optional
+        Add the video files corresponding with the images (same name, with
+        extension .mp4, .avi or .mov) to the shard. The default is False.
+
+    Returns
+    -------
+    dict
+        Index entry of the shard: name of the shard file, number of samples,
+        size of the file (bytes) and keys of the samples
+    """
+    name, filenames = shard
+    path = os.path.join(export_path, name)
+    if os.path.exists(path):
+        #shard of an interrupted export
+        return _shard_entry(path)
+
+    #the shard gets its name when it is complete
+    temporary_path = path + ".tmp"
+    keys = []
+    with tarfile.open(temporary_path, "w") as tar:
+        for filename in filenames:
+            key, extension = filename.split(".")
+
+            #read annotations
+            dict_annotations = _read_annotations(filename, project_dir)
+            dict_image = _perneel_annotations(filename, dict_annotations,
+                                              keypoint_names)
+            #the image is a file of the sample instead of a file in images/
+            dict_image["image"] = filename
+
+            mtime = int(os.path.getmtime(os.path.join(project_dir, filename)))
+            _add_to_tar(tar, filename,
+                        _image_bytes(filename, dict_annotations, project_dir),
+                        mtime)
+            _add_to_tar(tar, key + ".json",
+                        json.dumps(dict_image).encode("utf-8"), mtime)
+
+            #add video file if present
+            if include_video:
+                extensions = [".mp4", ".avi", ".mov"]
+                for ext in extensions:
+                    src = os.path.join(project_dir, key + ext)
+                    if os.path.exists(src):
+                        tar.add(src, arcname=key + ext)
+
+            keys.append(key)
+    os.replace(temporary_path, path)
+
+    return {"name": name,
+            "n_samples": len(keys),
+            "n_bytes": os.path.getsize(path),
+            "keys": keys}
+
+def _letterbox(image, height, width, letterbox=True):
+    """
+    Resize an image to height x width. If letterbox, the aspect ratio is kept
+    and the image is centered and padded with black
+
+    Returns
+    -------
+    numpy array (height, width, 3)
+        Resized image
+    list
+        scale_x, scale_y, pad_x, pad_y: a pixel (x, y) of the image is pixel
+        (x * scale_x + pad_x, y * scale_y + pad_y) of the resized image
+    """
+    image_height, image_width = image.shape[:2]
+
+    if letterbox:
+        scale_x = scale_y = min(height / image_height, width / image_width)
+    else:
+        scale_x = width / image_width
+        scale_y = height / image_height
+    new_width = min(width, max(1, round(image_width * scale_x)))
+    new_height = min(height, max(1, round(image_height * scale_y)))
+    pad_x = (width - new_width) // 2
+    pad_y = (height - new_height) // 2
+
+    resized = np.zeros((height, width, 3), dtype=np.uint8)
+    resized[pad_y: pad_y + new_height, pad_x: pad_x + new_width] = \
+        cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_AREA)
+
+    return resized, [scale_x, scale_y, pad_x, pad_y]
+
+def export_image_tensor(item, project_dir, export_path, keypoint_names,
+                        height, width, letterbox=True):
+    """
+    Export an image to the tensors of a split, which were created by the
+    export wizard (see ExportDataset.export_tensors). Every image is written
+    to its own row of the memory-mapped tensors, so the images can be
+    exported in parallel
+
+    Parameters
+    ----------
+    item : tuple
+        Row of the image in the tensors and name of the image
+    project_dir : str
+        Project directory
+    export_path : str
+        Directory of the exported split, the tensors are in its folder
+        "tensors"
+    keypoint_names : list
+        Names of the keypoints of the skeleton
+    height : int
+        Height of the images in the tensors
+    width : int
+        Width of the images in the tensors
+    letterbox : bool, optional
+        Keep the aspect ratio of the images (padded with black). If False,
+        the images are stretched. The default is True.
+
+    Returns
+    -------
+    list
+        Behaviour of every object of the image
+    """
+    row, filename = item
+    tensors_path = os.path.join(export_path, "tensors")
+
+    #read annotations
+    dict_annotations = _read_annotations(filename, project_dir)
+
+    #read image, apply masks (if present) and resize
+    image = cv2.imread(os.path.join(project_dir, filename))
+    image = _apply_masks(image, _mask_polygons(dict_annotations))
+    image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    image, transform = _letterbox(image, height, width, letterbox)
+
+    #keypoints in the coordinates of the resized image, NaN if not annotated
+    #or for padding objects
+    images = np.load(os.path.join(tensors_path, "images.npy"), mmap_mode="r+")
+    keypoints = np.load(os.path.join(tensors_path, "keypoints.npy"), mmap_mode="r+")
+    transforms = np.load(os.path.join(tensors_path, "transforms.npy"), mmap_mode="r+")
+    max_objects = keypoints.shape[1]
+
+    keypoints_image = np.full(keypoints.shape[1:], np.nan, dtype=np.float32)
+    scale_x, scale_y, pad_x, pad_y = transform
+    for j, keypoint in enumerate(keypoint_names):
+        coordinates = dict_annotations.get("keypoints", {}).get(keypoint, [])
+        coordinates = np.array(coordinates, dtype=np.float64).reshape(-1, 2)[:max_objects]
+
+        #Python is zero based, exported coordinates are one based
+        keypoints_image[:len(coordinates), j, 0] = coordinates[:, 0] * scale_x + pad_x + 1
+        keypoints_image[:len(coordinates), j, 1] = coordinates[:, 1] * scale_y + pad_y + 1
+
+    #write the rows of the image
+    images[row] = image
+    keypoints[row] = keypoints_image
+    transforms[row] = transform
+    del images, keypoints, transforms
+
+    return list(dict_annotations["behaviour"]["behaviour"].values())[:max_objects]
+
+#%% parallel export
+class ExportCancelled(Exception):
+    """
+    Raised by ExportEngine.map if the export was cancelled
+    """
+
+class ExportEngine():
+    """
+    Exports images in parallel on a pool of worker processes
+
+    At most max_in_flight images are submitted to the workers at the same
+    time, so the memory used by pending images stays bounded. The results are
+    returned in the order of the images, so the exported annotations don't
+    depend on the order in which the workers finish
+
+    Attributes
+    -----
+    self.n_workers : int
+        Number of worker processes. If 0, the images are exported one by one
+        in the calling process
+
+    self.max_in_flight : int
+        Maximal number of images submitted to the workers or waiting to be
+        returned at the same time
+
+    Methods
+    -----
+    self.map
+        Export images and return their annotations, in the order of the
+        images
+
+    self.imap
+        Export images and yield their annotations as soon as they are
+        available, in the order of the images
+
+    self.cancel
+        Cancel the running export
+    """
+
+    def __init__(self, n_workers=None, max_in_flight=None):
+        """
+        Parameters
+        ----------
+        n_workers : int, optional
+            Number of worker processes. If None, the number of cpus is used.
+            If 0, the images are exported in the calling process. The default
+            is None.
+        max_in_flight : int, optional
+            Maximal number of images submitted to the workers at the same
+            time. If None, 4 images per worker. The default is None.
+        """
+        if n_workers is None:
+            n_workers = os.cpu_count() or 1
+        if max_in_flight is None:
+            max_in_flight = 4 * max(n_workers, 1)
+
+        self.n_workers = n_workers
+        self.max_in_flight = max_in_flight
+        self.cancelled = False
+
+    def cancel(self):
+        """
+        Cancel the running export. Images which are being exported are
+        finished, no new images are started
+        """
+        self.cancelled = True
+
+    def map(self, function, filenames, progress=None, **kwargs):
+        """
+        Export images
+
+        Parameters
+        ----------
+        function : callable
+            Module level function function(filename, **kwargs) which exports
+            a single image, e.g. export_image_perneel
+        filenames : list
+            Names of the images
+        progress : callable, optional
+            Function progress(n_done, n_total), called regularly (also when no
+            image finished) in the calling thread, e.g. to update a progress
+            bar and process gui events. The default is None.
+        **kwargs
+            Keyword arguments of function, equal for all images
+
+        Raises
+        ------
+        ExportCancelled
+            If the export was cancelled with self.cancel
+
+        Returns
+        -------
+        list
+            Return values of function, in the order of filenames
+        """
+        return list(self.imap(function, filenames, progress=progress, **kwargs))
+
+    def imap(self, function, filenames, progress=None, **kwargs):
+        """
+        Export images, the return values are yielded as soon as they are
+        available in the order of the images. At most self.max_in_flight
+        return values are kept, so the memory use doesn't depend on the
+        number of images
+
+        Parameters
+        ----------
+        function : callable
+            Module level function function(filename, **kwargs) which exports
+            a single image, e.g. export_image_perneel
+        filenames : list
+            Names of the images
+        progress : callable, optional
+            Function progress(n_done, n_total), called regularly (also when no
+            image finished) in the calling thread, e.g. to update a progress
+            bar and process gui events. The default is None.
+        **kwargs
+            Keyword arguments of function, equal for all images
+
+        Raises
+        ------
+        ExportCancelled
+            If the export was cancelled with self.cancel, after the return
+            values of the finished images were yielded
+
+        Yields
+        ------
+        object
+            Return values of function, in the order of filenames
+        """
+        self.cancelled = False
+        n_total = len(filenames)
+
+        if self.n_workers == 0:
+            #export in the calling process
+            for i, filename in enumerate(filenames):
+                if self.cancelled:
+                    raise ExportCancelled()
+                yield function(filename, **kwargs)
+                if progress is not None:
+                    progress(i + 1, n_total)
+            return
+
+        n_done = 0
+        n_submitted = 0
+        n_yielded = 0
+        pending = {} #future -> position of the image
+        finished = {} #position of the image -> return value, not yet yielded
+
+        with ProcessPoolExecutor(max_workers=self.n_workers) as executor:
+            try:
+                while True:
+                    #keep at most self.max_in_flight images in the pool or
+                    #waiting to be yielded
+                    while (not self.cancelled) and (n_submitted < n_total) and\
+                        (len(pending) + len(finished) < self.max_in_flight):
+                        future = executor.submit(function, filenames[n_submitted],
+                                                 **kwargs)
+                        pending[future] = n_submitted
+                        n_submitted += 1
+
+                    if len(pending) == 0:
+                        break
+
+                    #wait with a timeout, so progress is also called when no
+                    #image finished
+                    done, _ = wait(pending, timeout=0.1,
+                                   return_when=FIRST_COMPLETED)
+                    for future in done:
+                        finished[pending.pop(future)] = future.result()
+                        n_done += 1
+
+                    #yield the return values which are next in order
+                    while n_yielded in finished:
+                        yield finished.pop(n_yielded)
+                        n_yielded += 1
+
+                    if progress is not None:
+                        progress(n_done, n_total)
+            finally:
+                #don't start the remaining images after a cancellation, an
+                #error in a worker or when the caller stops iterating
+                for future in pending:
+                    future.cancel()
+
+        if self.cancelled:
+            raise ExportCancelled()
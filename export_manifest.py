@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 18:12:40 2026
+
+@author: Maarten
+
+Definition of the ExportManifest class. The ExportManifest class records which
+images were exported to which split of a dataset, together with hashes of
+their content, so an export can be updated by only exporting new and changed
+images
+"""
+#%% packages
+import os
+import json
+import hashlib
+
+from video_source import VIDEO_EXTENSIONS
+
+#%%
+MANIFEST_VERSION = 1
+
+def file_stamp(path):
+    """
+    Modification time and size of a file, None if the file doesn't exist
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+def file_hash(path):
+    """
+    SHA-256 hash of the content of a file
+    """
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(2**20), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+def video_names(filename):
+    """
+    Names of the possible video files corresponding with an image
+    """
+    return [filename.split(".")[0] + "." + ext for ext in VIDEO_EXTENSIONS]
+
+def hash_image(filename, project_dir, entry=None):
+    """
+    Hash the image and annotation file of an image. Hashes of a previous
+    manifest entry are re-used if the modification time and size of the file
+    didn't change
+
+    Parameters
+    ----------
+    filename : str
+        Name of the image
+    project_dir : str
+        Project directory
+    entry : dict, optional
+        Manifest entry of the image of a previous export. The default is
+        None.
+
+    Returns
+    -------
+    dict
+        Manifest entry (without split) of the image
+    """
+    if entry is None:
+        entry = {}
+
+    new_entry = {}
+    paths = {"image": os.path.join(project_dir, filename),
+             "annotation": os.path.join(project_dir, filename.split(".")[0] + ".json")}
+    for key, path in paths.items():
+        stamp = file_stamp(path)
+        if (stamp is not None) and (stamp == entry.get(key + "_stamp")):
+            new_entry[key + "_hash"] = entry[key + "_hash"]
+        else:
+            new_entry[key + "_hash"] = file_hash(path)
+        new_entry[key + "_stamp"] = stamp
+
+    #videos are only compared by modification time and size
+    new_entry["video_stamps"] = {}
+    for video_name in video_names(filename):
+        stamp = file_stamp(os.path.join(project_dir, video_name))
+        if stamp is not None:
+            new_entry["video_stamps"][video_name] = stamp
+
+    return new_entry
+
+def stable_split(filename, val_perc, test_perc):
+    """
+    Split of an image which is exported for the first time. The split only
+    depends on the name of the image, so it doesn't change between exports
+
+    Parameters
+    ----------
+    filename : str
+        Name of the image
+    val_perc : float
+        Percentage of the images in the validation split
+    test_perc : float
+        Percentage of the images in the test split
+
+    Returns
+    -------
+    str
+        "train", "val" or "test"
+    """
+    digest = hashlib.sha256(filename.encode("utf-8")).digest()
+    u = int.from_bytes(digest[:8], "big") / 2**64 * 100
+
+    if u < val_perc:
+        return "val"
+    if u < val_perc + test_perc:
+        return "test"
+    return "train"
+
+class ExportManifest():
+    """
+    Manifest of an exported dataset
+
+    The manifest contains the export options and an entry per exported image
+    with its split, the hashes of the image and the annotation file and the
+    modification times and sizes of the image, the annotation file and the
+    video files. An image has to be exported again if its entry changed or if
+    the export options changed
+
+    Attributes
+    -----
+    self.path : str
+        Path of the manifest file
+
+    self.options : dict
+        Export options, e.g. dataset type and keypoints
+
+    self.entries : dict
+        Name of the image -> manifest entry
+
+    self.previous_options : dict
+        Export options of the loaded manifest file
+
+    Methods
+    -----
+    self.load
+        Load the manifest file
+
+    self.save
+        Save the manifest file
+
+    self.is_changed
+        Check if an image has to be exported again
+    """
+
+    def __init__(self, path, options):
+        """
+        Parameters
+        ----------
+        path : str
+            Path of the manifest file
+        options : dict
+            Export options of the current export
+        """
+        self.path = path
+        self.options = options
+        self.entries = {}
+        self.previous_options = None
+
+    def load(self):
+        """
+        Load the entries of the manifest file (if it exists)
+        """
+        self.entries = {}
+        self.previous_options = None
+
+        try:
+            with open(self.path) as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return
+
+        if manifest.get("version") == MANIFEST_VERSION:
+            self.entries = manifest["entries"]
+            self.previous_options = manifest["options"]
+
+    def save(self):
+        """
+        Save the manifest file. The file is replaced at once, so an
+        interrupted save keeps the previous manifest
+        """
+        manifest = {"version": MANIFEST_VERSION,
+                    "options": self.options,
+                    "entries": self.entries}
+
+        temporary_path = self.path + ".tmp"
+        with open(temporary_path, "w") as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+        os.replace(temporary_path, self.path)
+
+    def is_changed(self, filename, entry):
+        """
+        Check if an image has to be exported again
+
+        Parameters
+        ----------
+        filename : str
+            Name of the image
+        entry : dict
+            Current manifest entry of the image (with split)
+
+        Returns
+        -------
+        bool
+            True if the image is new, if its content, annotations, videos or
+            split changed or if the export options changed
+        """
+        previous = self.entries.get(filename)
+        if (previous is None) or (self.previous_options != self.options):
+            return True
+
+        return any(previous.get(key) != entry[key] for key in
+                   ["split", "image_hash", "annotation_hash", "video_stamps"])
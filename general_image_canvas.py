@@ -12,6 +12,8 @@ AnnotationCanvas
 #%% import packages
 import tkinter as tk
 
+from photo_display import PhotoDisplay
+
 #%%
 class GeneralImageCanvas(tk.Canvas):
     """
@@ -22,8 +24,8 @@ class GeneralImageCanvas(tk.Canvas):
     self.master : Application
         master object
 
-    self._image_photoimage : PhotoImage
-        Attribute to store PhotoImage so it is efectively shown
+    self.photo_display : PhotoDisplay
+        Shows the image matrices on the canvas, re-using one PhotoImage
 
     self.wdir : str
         Working directory
@@ -67,6 +69,12 @@ class GeneralImageCanvas(tk.Canvas):
     self.update_image
         Dummy method which is overwritten by the children classes of
         GeneralImageCanvas
+
+    self.request_redraw
+        Request an update of the image in response to a stream of events
+
+    self.show_image
+        Show an image matrix on the canvas
     """
     def __init__(self, master, **kwargs):
         #initiate parent class with **kwargs
@@ -83,7 +91,7 @@ class GeneralImageCanvas(tk.Canvas):
 
         #initiate image
         self.image_photoimage = self.create_image(self.bd, self.bd, anchor='nw')
-        self._image_photoimage = None #variable to store PhotoImage
+        self.photo_display = PhotoDisplay(self) #shows images on self.image_photoimage
 
         #working directory
         self.wdir = None
@@ -137,10 +145,10 @@ class GeneralImageCanvas(tk.Canvas):
             self.zoom_delta_y = max(0, y_zoom_center_image * s - event.y)
 
             #if image fits on self.self, intercepts have to be 0
-            self.zoom_delta_x = min(max(0, self.image.shape[1] * self.zoom_level +\
+            self.zoom_delta_x = min(max(0, self.image_shape[1] * self.zoom_level +\
                                         2 * self.bd - self.winfo_width()),
                                     self.zoom_delta_x)
-            self.zoom_delta_y = min(max(0, self.image.shape[0] * self.zoom_level +\
+            self.zoom_delta_y = min(max(0, self.image_shape[0] * self.zoom_level +\
                                         2 * self.bd - self.winfo_height()),
                                     self.zoom_delta_y)
 
@@ -150,7 +158,7 @@ class GeneralImageCanvas(tk.Canvas):
 
             #update image
             #mode should be 0 because self.zoom_level has changed
-            self.update_image(mode=0)
+            self.request_redraw(mode=0)
 
     def move_image(self, event):
         """
@@ -172,10 +180,10 @@ class GeneralImageCanvas(tk.Canvas):
 
             #if image fits on self, intercepts have to be 0
             #important to take the margins of the frame into account
-            self.zoom_delta_x = min(max(0, self.image.shape[1] * self.zoom_level +\
+            self.zoom_delta_x = min(max(0, self.image_shape[1] * self.zoom_level +\
                                         2 * self.bd - self.winfo_width()),
                                     self.zoom_delta_x)
-            self.zoom_delta_y = min(max(0, self.image.shape[0] * self.zoom_level +\
+            self.zoom_delta_y = min(max(0, self.image_shape[0] * self.zoom_level +\
                                         2 * self.bd - self.winfo_height()),
                                     self.zoom_delta_y)
 
@@ -188,7 +196,7 @@ class GeneralImageCanvas(tk.Canvas):
             self.mouse_y = event.y
 
             #update image
-            self.update_image(mode=1)
+            self.request_redraw(mode=1)
 
     def move_image_activate(self, event):
         """
@@ -208,7 +216,7 @@ class GeneralImageCanvas(tk.Canvas):
         rescaled to show it as large as possible in self.window
         """
         if self.image is not None:
-            image_height, image_width = self.image.shape[:2]
+            image_height, image_width = self.image_shape[:2]
             uw = self.winfo_width() - 2 * self.bd
             uh = self.winfo_height() - 2 * self.bd
             self.zoom_level = min(uw/image_width, uh/image_height)
@@ -218,6 +226,13 @@ class GeneralImageCanvas(tk.Canvas):
             self.zoom_delta_x = 0 #left intercept
             self.zoom_delta_y = 0 #top intercept
 
+    @property
+    def image_shape(self):
+        """
+        Shape of the image, in the coordinates used for zooming and moving
+        """
+        return self.image.shape
+
     def update_image(self, mode=0):
         """
         Dummy method which is overwritten by the children classes of
@@ -225,4 +240,26 @@ class GeneralImageCanvas(tk.Canvas):
         """
         #dummy method
         pass
+
+    def request_redraw(self, mode=0):
+        """
+        Request an update of the image in response to a (fast) stream of
+        events. By default the image is updated immediately, children classes
+        can overwrite this method to coalesce the requests
+        """
+        self.update_image(mode=mode)
+
+    def show_image(self, image, dirty_rect=None):
+        """
+        Show an image matrix on the canvas
+
+        Parameters
+        ----------
+        image : numpy array
+            RGB image
+        dirty_rect : tuple, optional
+            (x0, y0, x1, y1) part of the image which changed since it was last
+            shown. If None, the whole image is updated. The default is None.
+        """
+        self.photo_display.show(image, dirty_rect)
     
\ No newline at end of file
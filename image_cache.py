@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:11:48 2026
+
+@author: Maarten
+
+Definition of the ImageCache class. The ImageCache class keeps recently used
+and prefetched images, together with their parsed .json annotation files, in
+memory, so switching images doesn't have to wait for decoding
+"""
+#%% packages
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+from PIL import Image
+
+from annotation_io import load_annotation_file
+
+#%%
+def _file_stamp(path):
+    """
+    Modification time and size of a file, None if the file doesn't exist
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+def _json_path(image_path):
+    """
+    Path of the .json annotation file of an image
+    """
+    directory, image_name = os.path.split(image_path)
+    return os.path.join(directory, image_name.split(".")[0] + ".json")
+
+def _read_annotations(json_path):
+    """
+    Read a .json annotation file together with its stamp. The content is None
+    if there is no annotation file
+    """
+    stamp = _file_stamp(json_path)
+    if stamp is None:
+        return None, None
+    return load_annotation_file(json_path), stamp
+
+def _read_image(image_path):
+    """
+    Decode an image (RGB) and read its .json annotation file
+    """
+    image = cv2.imread(image_path)
+    image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    data_dict, stamp = _read_annotations(_json_path(image_path))
+    return [image, data_dict, stamp]
+
+def _image_shape(image_path):
+    """
+    Shape (height, width, 3) of the decoded image, read from the file header
+    without decoding the image. Like cv2.imread, the EXIF orientation is
+    taken into account
+    """
+    with Image.open(image_path) as image:
+        width, height = image.size
+        orientation = image.getexif().get(0x0112, 1)
+    if orientation in [5, 6, 7, 8]:
+        #image is rotated by 90 degrees
+        width, height = height, width
+    return (height, width, 3)
+
+#flags of cv2.imread to decode jpg images at 1/2, 1/4 and 1/8 of their size
+_REDUCED_FLAGS = {2: cv2.IMREAD_REDUCED_COLOR_2,
+                  4: cv2.IMREAD_REDUCED_COLOR_4,
+                  8: cv2.IMREAD_REDUCED_COLOR_8}
+
+class ImageCache():
+    """
+    LRU cache of decoded images and their parsed .json annotation files
+
+    The cache is limited by the memory used by the decoded images. Images
+    around the current one can be decoded in advance by a pool of background
+    threads (self.prefetch). Before a cached annotation file is returned, its
+    modification time and size are compared with the file on disk, so
+    annotations saved after they were cached are read again
+
+    Attributes
+    -----
+    self.max_bytes : int
+        Memory budget for the decoded images, expressed in bytes
+
+    Methods
+    -----
+    self.get
+        Get an image and its annotations, from the cache if possible
+
+    self.get_preview
+        Get a reduced resolution preview of an image and decode the full
+        resolution image in the background
+
+    self.prefetch
+        Decode images in the background
+
+    self.invalidate
+        Forget the cached annotations of an image
+
+    self.clear
+        Empty the cache
+    """
+
+    def __init__(self, max_bytes=1024*2**20, n_workers=2):
+
+        self.max_bytes = max_bytes
+        self.n_bytes = 0 #memory used by the cached images
+
+        self._entries = OrderedDict() #path -> [image, data_dict, stamp]
+        self._loading = {} #path -> future of a prefetch
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=n_workers)
+
+    def __contains__(self, image_name):
+        return os.path.abspath(image_name) in self._entries
+
+    def _store(self, path, entry):
+        """
+        Add an entry to the cache and evict the least recently used entries
+        until the cache fits in its memory budget
+        """
+        with self._lock:
+            if path in self._entries:
+                self.n_bytes -= self._entries.pop(path)[0].nbytes
+            self._entries[path] = entry
+            self.n_bytes += entry[0].nbytes
+
+            #the most recent entry is always kept
+            while self.n_bytes > self.max_bytes and len(self._entries) > 1:
+                _, (image, _, _) = self._entries.popitem(last=False)
+                self.n_bytes -= image.nbytes
+
+    def _load(self, path):
+        """
+        Decode an image in a worker thread and store it in the cache
+        """
+        try:
+            entry = _read_image(path)
+            self._store(path, entry)
+            return entry
+        finally:
+            with self._lock:
+                self._loading.pop(path, None)
+
+    def get(self, image_name):
+        """
+        Get an image and its annotations
+
+        Parameters
+        ----------
+        image_name : str
+            Path of the image
+
+        Returns
+        -------
+        image : numpy array
+            RGB image. The array is shared with the cache and shouldn't be
+            modified
+        data_dict : dict
+            Content of the .json annotation file, None if the image has no
+            annotation file
+        """
+        path = os.path.abspath(image_name)
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None:
+                self._entries.move_to_end(path)
+            future = self._loading.get(path)
+
+        if entry is None:
+            if future is not None:
+                #the image is being prefetched, wait for it
+                entry = future.result()
+            else:
+                entry = _read_image(path)
+                self._store(path, entry)
+
+        #re-read annotations which were modified after they were cached
+        json_path = _json_path(path)
+        if _file_stamp(json_path) != entry[2]:
+            entry[1], entry[2] = _read_annotations(json_path)
+
+        return entry[0], entry[1]
+
+    def get_preview(self, image_name, min_width, min_height):
+        """
+        Get a reduced resolution preview of an image, if the image is not
+        cached yet
+
+        jpg images are decoded at 1/2, 1/4 or 1/8 of their resolution (DCT
+        scaling), choosing the smallest preview of at least min_width x
+        min_height pixels (when shown at the zoom level that fits the whole
+        image). The full resolution image is decoded in the background
+
+        Parameters
+        ----------
+        image_name : str
+            Path of the image
+        min_width : int
+            Minimal width of the shown image, expressed in pixels
+        min_height : int
+            Minimal height of the shown image, expressed in pixels
+
+        Returns
+        -------
+        image : numpy array
+            Preview (or full resolution image if no preview is used)
+        data_dict : dict
+            Content of the .json annotation file, None if the image has no
+            annotation file
+        shape : tuple
+            Shape of the full resolution image
+        future : concurrent.futures.Future
+            Future of the full resolution image. None if image is already the
+            full resolution image
+        """
+        path = os.path.abspath(image_name)
+
+        #no preview for cached images and images which aren't jpg files
+        if (path in self._entries) or\
+            (path.split(".")[-1].lower() not in ['jpg', 'jpeg']):
+            image, data_dict = self.get(image_name)
+            return image, data_dict, image.shape, None
+
+        #largest reduction which still gives the required resolution
+        shape = _image_shape(path)
+        zoom = min(min_width / shape[1], min_height / shape[0])
+        reductions = [reduction for reduction in [8, 4, 2] if reduction * zoom <= 1]
+        if len(reductions) == 0:
+            image, data_dict = self.get(image_name)
+            return image, data_dict, image.shape, None
+        reduction = reductions[0]
+
+        #decode the preview before the full resolution image is decoded in
+        #the background, so both don't compete for the cpu
+        image = cv2.imread(path, _REDUCED_FLAGS[reduction])
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        data_dict, _ = _read_annotations(_json_path(path))
+
+        with self._lock:
+            future = self._loading.get(path)
+            if future is None:
+                future = self._executor.submit(self._load, path)
+                self._loading[path] = future
+
+        return image, data_dict, shape, future
+
+    def prefetch(self, image_names):
+        """
+        Decode images in the background, in the given order
+
+        Images that are already cached or being decoded are skipped
+
+        Parameters
+        ----------
+        image_names : list
+            Paths of the images
+        """
+        #don't prefetch more images than fit in the memory budget, assuming
+        #they have the same size as the most recent image
+        with self._lock:
+            if len(self._entries) > 0:
+                image_bytes = next(reversed(self._entries.values()))[0].nbytes
+                image_names = image_names[:max(0, self.max_bytes // image_bytes - 1)]
+
+        for image_name in image_names:
+            path = os.path.abspath(image_name)
+            with self._lock:
+                if (path in self._entries) or (path in self._loading):
+                    continue
+                self._loading[path] = self._executor.submit(self._load, path)
+
+    def invalidate(self, image_name):
+        """
+        Forget the cached annotations of an image, they will be read from disk
+        when the image is requested again
+        """
+        path = os.path.abspath(image_name)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None:
+                entry[1], entry[2] = None, None
+
+    def clear(self):
+        """
+        Empty the cache
+        """
+        with self._lock:
+            self._entries = OrderedDict()
+            self.n_bytes = 0
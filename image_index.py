@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 18:27:05 2026
+
+@author: Maarten
+
+Definition of the ImageIndex class. The ImageIndex class keeps a sorted list of
+the images in the project folder, used to navigate between images without
+listing the folder on every image switch
+"""
+#%% packages
+import os
+import heapq
+from bisect import bisect_left
+
+#%%
+def is_image(filename, extensions=('jpg', 'png')):
+    """
+    Check if a file is an image, based on its extension
+    """
+    parts = filename.split(".")
+    return (len(parts) > 1) and (parts[1] in extensions)
+
+class ImageIndex():
+    """
+    Sorted, extension-filtered index of the images in a directory
+
+    The index is refreshed by polling the modification time of the directory,
+    which changes when files are added, removed or renamed. Only then the
+    directory is listed again, and the added and removed images are merged into
+    the sorted list
+
+    Attributes
+    -----
+    self.directory : str
+        Directory of the images
+
+    self.names : list
+        Sorted names of the images
+
+    Methods
+    -----
+    self.set_directory
+        Index the images of a new directory
+
+    self.refresh
+        Update the index if the directory was modified
+
+    self.position
+        Position of an image in the index
+
+    self.neighbour
+        Name of the image at a given step from an image
+    """
+
+    def __init__(self, directory=None, extensions=('jpg', 'png')):
+
+        self.extensions = extensions
+        self.directory = None
+        self.names = [] #sorted names of the images
+        self._positions = {} #name -> position in self.names
+        self._stamp = None #modification time of the directory at the last scan
+
+        if directory is not None:
+            self.set_directory(directory)
+
+    def __len__(self):
+        self.refresh()
+        return len(self.names)
+
+    def __contains__(self, name):
+        self.refresh()
+        return name in self._positions
+
+    def set_directory(self, directory):
+        """
+        Index the images of a new directory
+        """
+        self.directory = directory
+        self.names = []
+        self._positions = {}
+        self._stamp = None
+        self.refresh()
+
+    def refresh(self, force=False):
+        """
+        Update the index if the directory was modified since the last scan
+
+        Parameters
+        ----------
+        force : bool, optional
+            If True, the directory is listed even if its modification time
+            didn't change. The default is False.
+        """
+        if self.directory is None:
+            return
+
+        stamp = os.stat(self.directory).st_mtime_ns
+        if stamp == self._stamp and not force:
+            return
+        self._stamp = stamp
+
+        with os.scandir(self.directory) as entries:
+            names = {entry.name for entry in entries
+                     if is_image(entry.name, self.extensions)}
+
+        current = set(self._positions)
+        removed = current - names
+        added = names - current
+        if len(removed) == 0 and len(added) == 0:
+            return
+
+        #merge the added images into the sorted list of remaining images
+        remaining = [name for name in self.names if name not in removed] \
+            if len(removed) > 0 else self.names
+        self.names = list(heapq.merge(remaining, sorted(added)))
+        self._positions = {name: i for i, name in enumerate(self.names)}
+
+    def position(self, name):
+        """
+        Position of an image in the index
+
+        Parameters
+        ----------
+        name : str
+            Name of the image
+
+        Returns
+        -------
+        int
+            Position of the image. If the image is not in the index, the
+            position where it would be inserted
+        """
+        self.refresh()
+
+        position = self._positions.get(name)
+        if position is None:
+            position = bisect_left(self.names, name)
+        return position
+
+    def neighbour(self, name, step=1):
+        """
+        Name of the image at step positions from the image name. The index
+        wraps around at both ends
+
+        Parameters
+        ----------
+        name : str
+            Name of the image
+        step : int, optional
+            Number of positions to move, negative values move backwards. The
+            default is 1.
+
+        Returns
+        -------
+        str
+            Name of the image, None if the directory contains no images
+        """
+        self.refresh()
+
+        if len(self.names) == 0:
+            return None
+
+        position = self._positions.get(name)
+        if position is None:
+            #image was removed or renamed, continue from the position it
+            #would have in the index
+            position = bisect_left(self.names, name)
+            if step > 0:
+                step -= 1
+
+        return self.names[(position + step) % len(self.names)]
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 19:40:33 2026
+
+@author: Maarten
+
+Definition of the ImagePyramid class. The ImagePyramid class stores an image
+at successively halved resolutions, so a zoomed out view of a large image can
+be resampled from a small level instead of from the full resolution image
+"""
+#%% packages
+import threading
+import numpy as np
+import cv2
+
+#%%
+class ImagePyramid():
+    """
+    Mipmap pyramid of an image
+
+    Level 0 is the original image, every next level has half the width and
+    height of the previous level. Levels are built until the largest dimension
+    drops below min_size. The levels can be built in a background thread
+    (self.build_async); until a level is available, the closest larger level
+    which is already built is used
+
+    Attributes
+    -----
+    self.image : numpy array
+        Original image (level 0)
+
+    self.shape : tuple
+        Shape of the full resolution image. If self.image is a reduced
+        resolution preview, regions are still expressed in pixels of the full
+        resolution image
+
+    Methods
+    -----
+    self.build
+        Build all levels
+
+    self.build_async
+        Build all levels in a background thread
+
+    self.resize_region
+        Resample a region of the rescaled image, starting from the closest
+        pyramid level
+    """
+
+    def __init__(self, image, min_size=512, shape=None):
+
+        self.image = image
+        self.shape = image.shape if shape is None else shape
+        self.min_size = min_size
+
+        #levels of the pyramid, level 0 is the original image
+        #levels are only appended, so the list can be read while it is built
+        self._levels = [image]
+        self._lock = threading.Lock()
+
+    @property
+    def n_levels(self):
+        """
+        Number of levels that are already built
+        """
+        return len(self._levels)
+
+    def build(self):
+        """
+        Build all levels of the pyramid
+        """
+        with self._lock:
+            level = self._levels[-1]
+            while max(level.shape[:2]) >= 2 * self.min_size:
+                level = cv2.pyrDown(level)
+                self._levels.append(level)
+
+    def build_async(self):
+        """
+        Build all levels of the pyramid in a background thread
+        """
+        thread = threading.Thread(target=self.build, daemon=True)
+        thread.start()
+
+    def resize_region(self, scale, x, y, width, height):
+        """
+        Resample a rectangular region of the rescaled image
+
+        Only the pixels of the region are computed, so the cost depends on
+        the size of the region and not on the scale. The region is resampled
+        from the smallest level which is already built and still has at least
+        the requested resolution
+
+        Parameters
+        ----------
+        scale : float
+            Scale of the rescaled image, relative to the original image
+        x : int
+            Left side of the region, expressed in pixels of the rescaled image
+        y : int
+            Top side of the region, expressed in pixels of the rescaled image
+        width : int
+            Width of the region
+        height : int
+            Height of the region
+
+        Returns
+        -------
+        numpy array (height, width, channels)
+            Resampled region
+        """
+        image_height, image_width = self.shape[:2]
+
+        #smallest level with at least the requested resolution
+        source = self._levels[0]
+        for level in self._levels[1:]:
+            if level.shape[1] < image_width * scale:
+                break
+            source = level
+
+        if (x == 0) and (y == 0) and (int(width) == int(image_width * scale)) and\
+            (int(height) == int(image_height * scale)):
+            #the region is the complete rescaled image
+            return cv2.resize(source, dsize=(int(width), int(height)))
+
+        #scale of the region relative to the source level
+        scale_x = scale * image_width / source.shape[1]
+        scale_y = scale * image_height / source.shape[0]
+
+        #map the pixel centers of the source level to the region, in the same
+        #way as cv2.resize does
+        matrix = np.array([[scale_x, 0, 0.5 * scale_x - 0.5 - x],
+                           [0, scale_y, 0.5 * scale_y - 0.5 - y]])
+
+        return cv2.warpAffine(source, matrix,
+                              dsize=(int(width), int(height)),
+                              flags=cv2.INTER_LINEAR,
+                              borderMode=cv2.BORDER_REPLICATE)
@@ -17,7 +17,6 @@ import tkinter as tk
 import tkinter.filedialog as tkfiledialog
 import tkinter.messagebox as tkmessagebox
 from tkinter import ttk
-import pandas as pd
 
 #%%
 
@@ -129,46 +128,30 @@ class ImportMaskTemplateDialog(tk.Toplevel):
         #import mask template
         mask_template = self.templates_dict[template_name]       
        
-        #write data in masks to right attribute dataframes of self
-        mask_id = len(self.annotations.names_masks)
+        #write data in masks to self.annotations.masks
+        mask_id = self.annotations.masks.next_id
         
         for i in mask_template.keys():
             mask = mask_template[i]
             
-            #add name to self.annotations.names_masks             
-            df = self.annotations.names_masks
             if 'name' in mask:
-                new_mask = pd.DataFrame(data=[[mask_id, mask["name"]]],
-                                      columns=df.columns)
+                name = mask["name"]
             else:
                 #this case is present to keep compatability with annotations
                 #made with a previous version of CoBRA annotation tool
-                new_mask = pd.DataFrame(data=[[self.mask_id, i]],
-                                      columns=df.columns)
-            df = pd.concat([df, new_mask],
-                           ignore_index=True)
-            self.annotations.names_masks = df                
+                name = i
     
-            #add points to self.annotations.annotation_points_masks
+            #add mask to self.annotations.masks
             points_dict = mask["points"]
-            points = []
-            for j in points_dict.keys():
-                x = points_dict[j]["x"]
-                y = points_dict[j]["y"]
-                points.append([x, y])
-            points = pd.DataFrame(data=points,
-                              columns=["x", "y"])
-            points["obj"] = mask_id
-            self.annotations.annotation_points_masks = \
-                pd.concat([self.annotations.annotation_points_masks, points],
-                          ignore_index=True)
+            points = [[point["x"], point["y"]] for point in points_dict.values()]
+            self.annotations.masks.add(mask_id, name, points)
     
             #increase mask_id with 1
             mask_id += 1
         
         #set id of active mask correctly
         #active mask id = the id of the next mask that will be drawn
-        self.annotations.mask_id = self.annotations.names_masks["obj"].max() + 1
+        self.annotations.mask_id = self.annotations.masks.next_id
         
         #load names of masks in object_canvas
         self.master.object_canvas.load_masks()
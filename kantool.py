@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Oct 21 11:38:02 2026
+
+@author: Maarten
+
+Command line interface of Kantool, to export a project without graphical user
+interface, e.g. from cron on a server without display:
+
+    python -m kantool export --format perneel --split 80,10,10 --workers 16 PROJECT OUT
+"""
+#%% packages
+import os
+import re
+import sys
+import argparse
+import multiprocessing
+
+from dataset_export import DatasetExporter, DATASET_TYPES
+from dataset_split import STRATIFY_OPTIONS
+from settings import Settings
+
+#%%
+def parse_split(text):
+    """
+    Parse the percentages of the train, validation and test split, e.g.
+    "80,10,10". The percentages are normalized so they sum up to 100
+
+    Returns
+    -------
+    list
+        Percentage of the train, validation and test split
+    """
+    try:
+        percentages = [float(value) for value in text.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError("invalid split " + text)
+    if (len(percentages) != 3) or (min(percentages) < 0) or (sum(percentages) <= 0):
+        raise argparse.ArgumentTypeError("split should be three non-negative " +
+                                         "percentages, e.g. 80,10,10")
+
+    return [100 * percentage / sum(percentages) for percentage in percentages]
+
+def parse_size(text):
+    """
+    Parse the size of the images of a tensor export, e.g. "256x320" (height x
+    width)
+    """
+    try:
+        height, width = [int(value) for value in text.lower().split("x")]
+    except ValueError:
+        raise argparse.ArgumentTypeError("size should be HEIGHTxWIDTH, e.g. 256x256")
+    return height, width
+
+def parse_pattern(text):
+    """
+    Check the regular expression of the groups of images
+    """
+    try:
+        re.compile(text)
+    except re.error as error:
+        raise argparse.ArgumentTypeError("invalid group pattern: " + str(error))
+    return text
+
+def build_parser():
+    """
+    Parser of the command line arguments
+    """
+    formats = {dataset_type.lower(): dataset_type for dataset_type in DATASET_TYPES}
+    stratifications = {option.lower(): option for option in STRATIFY_OPTIONS}
+
+    parser = argparse.ArgumentParser(prog="kantool",
+                                     description="Kantool command line interface")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="export a project to a dataset")
+    export.add_argument("project", metavar="PROJECT",
+                        help="project directory")
+    export.add_argument("out", metavar="OUT",
+                        help="directory to store the exported dataset")
+    export.add_argument("--format", choices=sorted(formats), default="perneel",
+                        help="dataset type (default: perneel)")
+    export.add_argument("--title",
+                        help="title of the dataset (default: name of the project)")
+    export.add_argument("--split", type=parse_split, default=[100, 0, 0],
+                        help="percentages of the train, validation and test " +
+                        "split (default: 100,0,0)")
+    export.add_argument("--seed", type=int, default=None,
+                        help="seed of the random split, the same seed gives " +
+                        "the same split (default: random)")
+    export.add_argument("--stratify", choices=list(stratifications),
+                        default="none",
+                        help="split every behaviour (most frequent behaviour " +
+                        "of an image) or number of objects in the same " +
+                        "proportions (default: none)")
+    export.add_argument("--group-pattern", type=parse_pattern, default=None,
+                        help="regular expression which defines groups of " +
+                        "images which are kept in the same split, e.g. " +
+                        "'^[^_]+' for the prefix before the first underscore")
+    export.add_argument("--workers", type=int, default=None,
+                        help="number of worker processes, 0 to export in the " +
+                        "main process (default: number of cpus)")
+    export.add_argument("--include-empty", action="store_true",
+                        help="include images without objects")
+    export.add_argument("--include-video", action="store_true",
+                        help="include the corresponding video files")
+    export.add_argument("--incremental", action="store_true",
+                        help="only update new and changed images of an " +
+                        "existing export")
+    export.add_argument("--overwrite", action="store_true",
+                        help="replace existing split folders")
+    export.add_argument("--resume", action="store_true",
+                        help="resume an interrupted export")
+    export.add_argument("--link-mode", choices=["reflink", "hardlink", "copy"],
+                        default=None,
+                        help="how unmasked images and videos are copied " +
+                        "(default: reflink)")
+    export.add_argument("--jsonl", action="store_true",
+                        help="keep annotations.jsonl next to annotations.json")
+    export.add_argument("--shard-size", type=int, default=None,
+                        help="maximal number of images per shard (shards format)")
+    export.add_argument("--size", type=parse_size, default=None,
+                        help="HEIGHTxWIDTH of the images (tensor format)")
+    export.add_argument("--stretch", action="store_true",
+                        help="stretch the images instead of letterboxing " +
+                        "(tensor format)")
+    export.add_argument("--quiet", action="store_true",
+                        help="don't show the progress")
+    export.set_defaults(formats=formats, stratifications=stratifications)
+
+    return parser
+
+def export(args):
+    """
+    Export a project to a dataset
+
+    Returns
+    -------
+    int
+        Exit status: 0 if the export was finished
+    """
+    project = os.path.abspath(args.project)
+    if not os.path.exists(os.path.join(project, "project", "skeleton.json")):
+        print("kantool: " + project + " is not a Kantool project " +
+              "(project/skeleton.json is missing)", file=sys.stderr)
+        return 2
+
+    settings = Settings()
+    settings.n_export_workers = args.workers
+    if args.link_mode is not None:
+        settings.export_link_mode = args.link_mode
+    if args.jsonl:
+        settings.export_jsonl = True
+    if args.shard_size is not None:
+        settings.shard_size = args.shard_size
+    if args.size is not None:
+        settings.tensor_height, settings.tensor_width = args.size
+    if args.stretch:
+        settings.tensor_letterbox = False
+
+    #the progress is only shown in a terminal (not in the log of cron) and
+    #only when it changes
+    shown = [None]
+    def progress(description, n_done, n_total, unit):
+        if args.quiet or (not sys.stderr.isatty()) or\
+            (shown[0] == (description, n_done)):
+            return
+        shown[0] = (description, n_done)
+        print("\r" + description + ": " + str(n_done) + "/" + str(n_total) +
+              " " + unit, end="\n" if n_done == n_total else "",
+              file=sys.stderr, flush=True)
+
+    def ask_replace(export_path):
+        if not args.overwrite:
+            print("kantool: " + export_path + " already exists, use --overwrite " +
+                  "to replace it", file=sys.stderr)
+        return args.overwrite
+
+    exporter = DatasetExporter(
+        project_dir=project,
+        export_dir=os.path.abspath(args.out),
+        title=args.title or os.path.basename(project.rstrip(os.sep)),
+        dataset_type=args.formats[args.format],
+        val_perc=args.split[1],
+        test_perc=args.split[2],
+        seed=args.seed,
+        stratify=args.stratifications[args.stratify],
+        group_pattern=args.group_pattern,
+        include_empty=args.include_empty,
+        include_video=args.include_video,
+        incremental=args.incremental,
+        settings=settings,
+        progress=progress,
+        ask_replace=ask_replace,
+        ask_resume=lambda title: args.resume,
+        inform=lambda message: print("kantool: " + message.replace("\n\n", ", "),
+                                     file=sys.stderr))
+
+    os.makedirs(exporter.export_dir, exist_ok=True)
+    finished = exporter.export()
+
+    #throughput statistics
+    statistics = exporter.statistics
+    for task in statistics["tasks"]:
+        rate = task["n"] / task["seconds"] if task["seconds"] > 0 else 0
+        print("%s: %d %s in %.2f s (%.1f %s/s)" % (task["description"], task["n"],
+              task["unit"], task["seconds"], rate, task["unit"]))
+    print("exported %d images in %.2f s (%.1f images/s)" %
+          (statistics["n_images"], statistics["seconds"],
+           statistics["images_per_second"]))
+
+    if not finished:
+        print("kantool: the export wasn't finished", file=sys.stderr)
+        return 1
+    return 0
+
+def main(argv=None):
+    """
+    Run the command line interface
+
+    Parameters
+    ----------
+    argv : list, optional
+        Command line arguments. If None, sys.argv[1:]. The default is None.
+
+    Returns
+    -------
+    int
+        Exit status
+    """
+    args = build_parser().parse_args(argv)
+
+    if args.command == "export":
+        return export(args)
+    return 2
+
+if __name__ == "__main__":
+    #required for the worker processes of frozen (pyinstaller) executables
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,362 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 09:12:40 2026
+
+@author: Maarten
+
+Definition of the KeypointStore class. The KeypointStore class stores the
+keypoint coordinates and the attributes (name, behaviour, location) of all
+objects of an image in preallocated numpy arrays
+"""
+#%% packages
+import numpy as np
+
+from spatial_index import KeypointGrid
+
+#%%
+class KeypointStore():
+    """
+    Array-backed store of the keypoint annotations of all objects of an image
+
+    The keypoint coordinates are stored in a preallocated float32 array with
+    dimensions (capacity, n_keypoints, 2). The names, behaviours and locations
+    of the objects are stored in parallel object arrays. When the capacity is
+    exceeded, the arrays are doubled in size, so appending an object is an
+    amortised O(1) operation
+
+    Every object gets a unique identifier (uid) which doesn't change when other
+    objects are deleted. All annotated keypoints are registered in a
+    KeypointGrid under their (uid, keypoint) pair, so the keypoint closest to a
+    location can be looked up without visiting all keypoints. Keypoints should
+    therefore be modified through self.set_keypoint and self.clear_keypoint
+
+    Attributes
+    -----
+    self.n_keypoints : int
+        Number of keypoints per object
+
+    self.n_objects : int
+        Number of objects currently stored
+
+    self.capacity : int
+        Number of objects that can be stored before the arrays have to grow
+
+    self.grid : KeypointGrid
+        Spatial index over all annotated keypoints
+
+    Methods
+    -----
+    self.append
+        Append a single object
+
+    self.extend
+        Append multiple objects at once
+
+    self.delete
+        Delete one or more objects
+
+    self.set_keypoint
+        Set the coordinates of a keypoint
+
+    self.clear_keypoint
+        Remove the coordinates of a keypoint
+
+    self.nearest_keypoint
+        Look up the keypoint closest to a location, within a given radius
+
+    self.remove_empty_objects
+        Delete all objects without annotated keypoints
+
+    self.clear
+        Remove all objects
+    """
+
+    def __init__(self, n_keypoints, capacity=16):
+
+        self.n_keypoints = n_keypoints
+        self.n_objects = 0
+        self._next_uid = 0 #unique identifier of the next object
+
+        self.grid = KeypointGrid()
+
+        self._allocate(max(1, capacity))
+
+    def _allocate(self, capacity):
+        """
+        Allocate empty arrays with the given capacity
+        """
+        self.capacity = capacity
+
+        #keypoint coordinates, non-annotated keypoints are NaN
+        self._keypoints = np.full(shape=(capacity, self.n_keypoints, 2),
+                                  fill_value=np.nan,
+                                  dtype=np.float32)
+
+        #unique identifiers of the objects
+        #uids are strictly increasing with the position in the store, since
+        #objects are only appended and deleting objects preserves the order
+        self._uids = np.zeros(shape=(capacity,), dtype=np.int64)
+
+        #attributes of the objects
+        self._names = np.empty(shape=(capacity,), dtype=object)
+        self._behaviours = np.empty(shape=(capacity,), dtype=object)
+        self._locations = np.empty(shape=(capacity,), dtype=object)
+
+    def _reserve(self, n_required):
+        """
+        Make sure there is room for at least n_required objects
+        """
+        if n_required <= self.capacity:
+            return
+
+        #double the capacity until all objects fit
+        capacity = self.capacity
+        while capacity < n_required:
+            capacity *= 2
+
+        keypoints = self._keypoints
+        uids = self._uids
+        names = self._names
+        behaviours = self._behaviours
+        locations = self._locations
+        n = self.n_objects
+
+        self._allocate(capacity)
+        self._keypoints[:n] = keypoints[:n]
+        self._uids[:n] = uids[:n]
+        self._names[:n] = names[:n]
+        self._behaviours[:n] = behaviours[:n]
+        self._locations[:n] = locations[:n]
+
+    @property
+    def keypoints(self):
+        """
+        View on the keypoint coordinates of all objects (n_objects, n_keypoints, 2)
+        """
+        return self._keypoints[:self.n_objects]
+
+    @property
+    def uids(self):
+        """
+        View on the unique identifiers of all objects
+        """
+        return self._uids[:self.n_objects]
+
+    @property
+    def names(self):
+        """
+        View on the names of all objects
+        """
+        return self._names[:self.n_objects]
+
+    @property
+    def behaviours(self):
+        """
+        View on the behaviours of all objects
+        """
+        return self._behaviours[:self.n_objects]
+
+    @property
+    def locations(self):
+        """
+        View on the locations of all objects
+        """
+        return self._locations[:self.n_objects]
+
+    def __len__(self):
+        return self.n_objects
+
+    def append(self, keypoints=None, name=None, behaviour=None, location=None):
+        """
+        Append a single object
+
+        Parameters
+        ----------
+        keypoints : numpy array (n_keypoints, 2), optional
+            Keypoint coordinates. If None, all keypoints are NaN. The default
+            is None.
+        name : str, optional
+            Name of the object. The default is None.
+        behaviour : str, optional
+            Behaviour of the object. The default is None.
+        location : str, optional
+            Location of the object. The default is None.
+
+        Returns
+        -------
+        i : int
+            Index of the new object
+        """
+        i = self.n_objects
+        self._reserve(i + 1)
+
+        self._keypoints[i] = np.nan
+        self._uids[i] = self._next_uid
+        self._next_uid += 1
+        self._names[i] = name
+        self._behaviours[i] = behaviour
+        self._locations[i] = location
+
+        self.n_objects += 1
+
+        if keypoints is not None:
+            for j, (x, y) in enumerate(keypoints):
+                if not np.isnan(x):
+                    self.set_keypoint(i, j, x, y)
+
+        return i
+
+    def extend(self, keypoints, names=None, behaviours=None, locations=None):
+        """
+        Append multiple objects at once
+
+        Parameters
+        ----------
+        keypoints : numpy array (n, n_keypoints, 2)
+            Keypoint coordinates of the new objects
+        names, behaviours, locations : sequence (n), optional
+            Attributes of the new objects. The default is None.
+        """
+        n_new = len(keypoints)
+        start = self.n_objects
+        stop = start + n_new
+        self._reserve(stop)
+
+        self._keypoints[start:stop] = keypoints
+        self._uids[start:stop] = np.arange(self._next_uid,
+                                           self._next_uid + n_new)
+        self._next_uid += n_new
+        for array, values in [(self._names, names),
+                              (self._behaviours, behaviours),
+                              (self._locations, locations)]:
+            if values is None:
+                array[start:stop] = None
+            else:
+                array[start:stop] = list(values)
+
+        self.n_objects = stop
+
+        #register the annotated keypoints in the grid
+        for i, j in np.argwhere(~np.isnan(self._keypoints[start:stop, :, 0])):
+            x, y = self._keypoints[start + i, j]
+            self.grid.insert(int(self._uids[start + i]), j, x, y)
+
+    def delete(self, indices):
+        """
+        Delete one or more objects
+
+        The remaining objects keep their relative order
+
+        Parameters
+        ----------
+        indices : int or array-like
+            Index/indices of the object(s) to delete
+        """
+        n = self.n_objects
+
+        keep = np.ones(shape=(n,), dtype=bool)
+        keep[indices] = False
+        n_kept = int(keep.sum())
+
+        #remove the keypoints of the deleted objects from the grid
+        if n_kept == 0:
+            self.grid.clear()
+        else:
+            for uid in self._uids[:n][~keep]:
+                self.grid.remove_object(int(uid))
+
+        #compact all arrays in a single vectorised operation per array
+        for array in [self._keypoints, self._uids, self._names,
+                      self._behaviours, self._locations]:
+            array[:n_kept] = array[:n][keep]
+
+        #clear the released slots
+        self._keypoints[n_kept:n] = np.nan
+        self._names[n_kept:n] = None
+        self._behaviours[n_kept:n] = None
+        self._locations[n_kept:n] = None
+
+        self.n_objects = n_kept
+
+    def set_keypoint(self, i, keypoint, x, y):
+        """
+        Set the coordinates of a keypoint
+
+        Parameters
+        ----------
+        i : int
+            Index of the object
+        keypoint : int
+            Index of the keypoint
+        x : float
+            x coordinate (horizontal axis, origin=left side)
+        y : float
+            y coordinate (vertical axis, origin=top)
+        """
+        self._keypoints[i, keypoint] = (x, y)
+        self.grid.insert(int(self._uids[i]), keypoint, x, y)
+
+    def clear_keypoint(self, i, keypoint):
+        """
+        Remove the coordinates of a keypoint (set them to NaN)
+
+        Parameters
+        ----------
+        i : int
+            Index of the object
+        keypoint : int
+            Index of the keypoint
+        """
+        self._keypoints[i, keypoint] = np.nan
+        self.grid.remove(int(self._uids[i]), keypoint)
+
+    def nearest_keypoint(self, loc, radius):
+        """
+        Look up the keypoint closest to loc, within radius
+
+        Parameters
+        ----------
+        loc : numpy array
+            location (x,y) coordinates
+        radius : float
+            Search radius, expressed as number of pixels on the image
+
+        Returns
+        -------
+        object_id : int
+            Index of the object. None if there is no keypoint within radius
+        keypoint_id : int
+            Index of the keypoint. None if there is no keypoint within radius
+        distance : float
+            Distance to the keypoint. None if there is no keypoint within radius
+        """
+        uid, keypoint_id, distance = self.grid.nearest(loc[0], loc[1], radius)
+
+        if uid is None:
+            return (None, None, None)
+
+        #uids are sorted, so the index of the object can be found by bisection
+        object_id = int(np.searchsorted(self.uids, uid))
+
+        return (object_id, keypoint_id, distance)
+
+    @property
+    def empty_objects(self):
+        """
+        Boolean array which is True for objects without annotated keypoints
+        """
+        return np.isnan(self.keypoints).all(axis=(1, 2))
+
+    def remove_empty_objects(self):
+        """
+        Delete all objects without annotated keypoints
+        """
+        empty = self.empty_objects
+        if empty.any():
+            self.delete(empty)
+
+    def clear(self):
+        """
+        Remove all objects
+        """
+        self.delete(slice(None))
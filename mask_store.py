@@ -0,0 +1,337 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 13:41:09 2026
+
+@author: Maarten
+
+Definition of the MaskStore class. The MaskStore class stores the polygons of
+all masks of an image in a single flat vertex buffer
+"""
+#%% packages
+import numpy as np
+
+#%%
+class MaskStore():
+    """
+    Ragged-array store of the masks (polygons) of an image
+
+    The vertices of all masks are stored in one flat float64 buffer with
+    dimensions (capacity, 2). Each mask is described by its identifier, its
+    name, the offset of its first vertex in the buffer and its number of
+    vertices. Looking up the polygon of a mask returns a view on the buffer,
+    no data is copied.
+
+    Modifying a mask only touches the vertices of that mask: if the new polygon
+    fits in the slots of the old one, it is written in place, otherwise it is
+    appended at the end of the buffer. Slots that are no longer used are
+    reclaimed once they make up more than half of the buffer
+
+    Attributes
+    -----
+    self.n_vertices : int
+        Total number of vertices of all masks
+
+    Methods
+    -----
+    self.add
+        Add a new mask
+
+    self.load
+        Replace all masks at once
+
+    self.to_arrays
+        Get all masks as flat arrays (inverse of self.load)
+
+    self.set_polygon
+        Replace the polygon of a mask
+
+    self.polygon
+        Get the polygon of a mask
+
+    self.delete
+        Delete a mask
+
+    self.get_id
+        Get the identifier of a mask based on its name
+
+    self.rename
+        Rename a mask
+
+    self.items
+        Iterate over the identifiers, names and polygons of all masks
+
+    self.clear
+        Remove all masks
+    """
+
+    def __init__(self, capacity=256):
+
+        self._vertices = np.empty(shape=(max(1, capacity), 2))
+        self._end = 0 #number of buffer slots in use (including unused slots)
+        self.n_vertices = 0 #number of vertices of all masks
+
+        #per mask information, ordered as the masks were added
+        self._ids = [] #identifiers
+        self._names = [] #names
+        self._offsets = [] #offset of the first vertex in self._vertices
+        self._lengths = [] #number of vertices
+
+        #position of each mask in the lists above
+        self._positions = {} #mask_id -> position
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, mask_id):
+        return mask_id in self._positions
+
+    @property
+    def ids(self):
+        """
+        Identifiers of all masks
+        """
+        return list(self._ids)
+
+    @property
+    def names(self):
+        """
+        Names of all masks
+        """
+        return list(self._names)
+
+    @property
+    def next_id(self):
+        """
+        Identifier for the next mask that will be created
+        """
+        if len(self._ids) == 0:
+            return 0
+        return max(self._ids) + 1
+
+    def _write(self, points):
+        """
+        Write points at the end of the buffer and return their offset
+        """
+        n_points = len(points)
+
+        if self._end + n_points > len(self._vertices):
+            #reclaim unused slots before growing the buffer
+            if self._end - self.n_vertices > self.n_vertices:
+                self._compact()
+
+        if self._end + n_points > len(self._vertices):
+            capacity = len(self._vertices)
+            while capacity < self._end + n_points:
+                capacity *= 2
+            vertices = np.empty(shape=(capacity, 2))
+            vertices[:self._end] = self._vertices[:self._end]
+            self._vertices = vertices
+
+        offset = self._end
+        self._vertices[offset:offset + n_points] = points
+        self._end += n_points
+
+        return offset
+
+    def _compact(self):
+        """
+        Remove all unused slots from the buffer
+        """
+        vertices = np.empty(shape=self._vertices.shape)
+        end = 0
+        for position, (offset, length) in enumerate(zip(self._offsets, self._lengths)):
+            vertices[end:end + length] = self._vertices[offset:offset + length]
+            self._offsets[position] = end
+            end += length
+
+        self._vertices = vertices
+        self._end = end
+
+    def add(self, mask_id, name, points):
+        """
+        Add a new mask
+
+        Parameters
+        ----------
+        mask_id : int
+            Identifier of the mask
+        name : str or int
+            Name of the mask
+        points : array-like (n, 2)
+            Vertices of the polygon
+        """
+        if mask_id in self._positions:
+            raise ValueError("mask " + str(mask_id) + " exists already")
+
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        offset = self._write(points)
+
+        self._positions[mask_id] = len(self._ids)
+        self._ids.append(mask_id)
+        self._names.append(name)
+        self._offsets.append(offset)
+        self._lengths.append(len(points))
+        self.n_vertices += len(points)
+
+    def load(self, ids, names, lengths, vertices):
+        """
+        Replace all masks at once
+
+        Parameters
+        ----------
+        ids : list
+            Identifiers of the masks
+        names : list
+            Names of the masks
+        lengths : array-like (n_masks)
+            Number of vertices of every mask
+        vertices : numpy array (n_vertices, 2)
+            Vertices of all masks, concatenated in the order of ids
+        """
+        lengths = np.asarray(lengths, dtype=np.int64)
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1])).astype(np.int64)
+
+        self.clear()
+        if len(vertices) > len(self._vertices):
+            self._vertices = np.empty(shape=(len(vertices), 2))
+        self._vertices[:len(vertices)] = vertices
+        self._end = len(vertices)
+        self.n_vertices = len(vertices)
+
+        self._ids = list(ids)
+        self._names = list(names)
+        self._offsets = offsets[:len(self._ids)].tolist()
+        self._lengths = lengths.tolist()
+        self._positions = {mask_id: position for position, mask_id in enumerate(self._ids)}
+
+    def to_arrays(self):
+        """
+        Get all masks as flat arrays, in the format accepted by self.load
+
+        Returns
+        -------
+        ids : list
+            Identifiers of the masks
+        names : list
+            Names of the masks
+        lengths : numpy array (n_masks)
+            Number of vertices of every mask
+        vertices : numpy array (n_vertices, 2)
+            Vertices of all masks, concatenated in the order of ids
+        """
+        lengths = np.array(self._lengths, dtype=np.int64)
+        vertices = np.concatenate([polygon for _, _, polygon in self.items()] +
+                                  [np.empty(shape=(0, 2))])
+
+        return list(self._ids), list(self._names), lengths, vertices
+
+    def set_polygon(self, mask_id, points):
+        """
+        Replace the polygon of an existing mask
+
+        Parameters
+        ----------
+        mask_id : int
+            Identifier of the mask
+        points : array-like (n, 2)
+            New vertices of the polygon
+        """
+        position = self._positions[mask_id]
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        offset = self._offsets[position]
+        length = self._lengths[position]
+
+        if len(points) <= length:
+            #new polygon fits in the slots of the old one
+            self._vertices[offset:offset + len(points)] = points
+        else:
+            self._offsets[position] = self._write(points)
+
+        self.n_vertices += len(points) - length
+        self._lengths[position] = len(points)
+
+    def polygon(self, mask_id):
+        """
+        Get the polygon of a mask
+
+        Parameters
+        ----------
+        mask_id : int
+            Identifier of the mask
+
+        Returns
+        -------
+        numpy array (n, 2)
+            View on the vertices of the polygon
+        """
+        position = self._positions[mask_id]
+        offset = self._offsets[position]
+        return self._vertices[offset:offset + self._lengths[position]]
+
+    def delete(self, mask_id):
+        """
+        Delete a mask
+
+        Parameters
+        ----------
+        mask_id : int
+            Identifier of the mask
+        """
+        position = self._positions.pop(mask_id)
+        self.n_vertices -= self._lengths[position]
+
+        del self._ids[position]
+        del self._names[position]
+        del self._offsets[position]
+        del self._lengths[position]
+
+        #update positions of the masks after the deleted mask
+        for i in range(position, len(self._ids)):
+            self._positions[self._ids[i]] = i
+
+        if len(self._ids) == 0:
+            #the whole buffer can be re-used
+            self._end = 0
+
+    def get_id(self, name):
+        """
+        Get the identifier of the (first) mask with the given name
+        """
+        return self._ids[self._names.index(name)]
+
+    def rename(self, current_name, new_name):
+        """
+        Rename all masks with name current_name
+        """
+        for position, name in enumerate(self._names):
+            if name == current_name:
+                self._names[position] = new_name
+
+    def items(self):
+        """
+        Iterate over the masks
+
+        Yields
+        ------
+        mask_id : int
+            Identifier of the mask
+        name : str or int
+            Name of the mask
+        polygon : numpy array (n, 2)
+            View on the vertices of the polygon
+        """
+        for mask_id, name, offset, length in zip(self._ids, self._names,
+                                                 self._offsets, self._lengths):
+            yield mask_id, name, self._vertices[offset:offset + length]
+
+    def clear(self):
+        """
+        Remove all masks
+        """
+        self._end = 0
+        self.n_vertices = 0
+        self._ids = []
+        self._names = []
+        self._offsets = []
+        self._lengths = []
+        self._positions = {}
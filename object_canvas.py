@@ -277,7 +277,7 @@ class ObjectCanvas(ttk.Notebook):
 
         #(re)load all objects of an instance
 
-        names = self.annotations.names
+        names = self.annotations.objects.names
 
         #check if there are names defined at all
         if len(names) == 0:
@@ -285,15 +285,14 @@ class ObjectCanvas(ttk.Notebook):
 
         #if last object is a preallocated object, its name shouldn't be shown (yet)
         if self.annotations.last_object_empty:
-            names = names.iloc[:-1,:]
+            names = names[:-1]
 
-        for i in names.index:
-            self.list_objects.insert(tk.END, names.loc[i,"name"])
+        for name in names:
+            self.list_objects.insert(tk.END, name)
 
         #load masks
-        names = self.annotations.names_masks
-        for i in names.index:
-            self.list_masks.insert(tk.END, names.loc[i,"name"])
+        for name in self.annotations.masks.names:
+            self.list_masks.insert(tk.END, name)
 
         #load behaviours
         self.update_frm_behaviour()
@@ -597,11 +596,12 @@ class ObjectCanvas(ttk.Notebook):
         if self.mode == 0:
             #objects tab
             self.annotations.update_active_object(
-                obj_id=len(self.annotations.annotations) - 1)
+                obj_id=self.annotations.n_objects - 1)
         elif self.mode == 1:
             #masks tab
-            self.annotations.update_active_mask(
-                mask_id=len(self.annotations.masks) - 1)
+            if len(self.annotations.masks) > 0:
+                self.annotations.update_active_mask(
+                    mask_id=self.annotations.masks.ids[-1])
         elif self.mode == 2:
             #Behaviour tab
             self.annotations.update_active_object(obj_id=0)
@@ -621,7 +621,7 @@ class ObjectCanvas(ttk.Notebook):
 
         if valid:
             #write behavioural code to annotations
-            behaviour_old = self.annotations.behaviours.loc[self.annotations.object, "behaviour"]
+            behaviour_old = self.annotations.objects.behaviours[self.annotations.object]
             behaviour_new = self.var_behaviour.get()
 
             if behaviour_new == behaviour_old:
@@ -629,7 +629,7 @@ class ObjectCanvas(ttk.Notebook):
                 return
 
             #behavioural code was changed
-            self.annotations.behaviours.loc[self.annotations.object, "behaviour"] =\
+            self.annotations.objects.behaviours[self.annotations.object] =\
                 self.var_behaviour.get()
 
             self.annotations.currently_saved = False
@@ -656,14 +656,14 @@ class ObjectCanvas(ttk.Notebook):
         if self.annotations.object is None:
             self.activate_object(list_index=0)
         else:
-            if len(self.annotations.annotations) == 1:
+            if self.annotations.n_objects == 1:
                 list_index = 0
             elif self.annotations.last_object_empty:
                 list_index = (self.annotations.object + direction) %\
-                    (len(self.annotations.names) - 1)
+                    (self.annotations.n_objects - 1)
             else:
                 list_index = (self.annotations.object + direction) %\
-                    len(self.annotations.names)
+                    self.annotations.n_objects
             self.activate_object(list_index=list_index)
 
         self.update_frm_behaviour()
@@ -689,7 +689,7 @@ class ObjectCanvas(ttk.Notebook):
         self.var_object_id.set(str(self.annotations.object))
 
         #object_behaviour
-        object_behaviour = self.annotations.behaviours.loc[self.annotations.object, "behaviour"]
+        object_behaviour = self.annotations.objects.behaviours[self.annotations.object]
 
         self.bool_var_tracing = False
         if object_behaviour is not None:
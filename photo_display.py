@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 10:36:18 2026
+
+@author: Maarten
+
+Definition of the PhotoDisplay class. The PhotoDisplay class shows numpy images
+on a canvas item, re-using a single Tk PhotoImage instead of creating a new
+PhotoImage for every frame
+"""
+#%% packages
+import tkinter as tk
+import numpy as np
+from PIL import Image, ImageTk
+
+#%%
+def ppm_bytes(image):
+    """
+    Encode an RGB image (uint8) as binary PPM
+
+    Parameters
+    ----------
+    image : numpy array (h, w, 3)
+        RGB image
+
+    Returns
+    -------
+    bytes
+        PPM encoded image
+    """
+    height, width = image.shape[:2]
+    header = b"P6 %d %d 255 " % (width, height)
+    return header + np.ascontiguousarray(image, dtype=np.uint8).tobytes()
+
+class PhotoDisplay():
+    """
+    Shows numpy images on an image item of a canvas
+
+    A single Tk PhotoImage, with the size of the shown image, is kept for the
+    canvas item. The pixels of the PhotoImage are updated in place, by writing
+    the changed rectangle as PPM data. If the Tk installation doesn't accept
+    PPM data, the whole image is pasted in the PhotoImage with PIL instead
+
+    Methods
+    -----
+    self.show
+        Show an image (or update the changed rectangle of the shown image)
+
+    self.clear
+        Remove the shown image
+    """
+
+    def __init__(self, canvas):
+
+        self.canvas = canvas
+
+        self.photo = None #PhotoImage on the canvas item
+        self._item = None #canvas item showing self.photo
+        self._use_ppm = True #write PPM data into self.photo
+
+    def show(self, image, dirty_rect=None):
+        """
+        Show an image
+
+        Parameters
+        ----------
+        image : numpy array (h, w, 3)
+            RGB image
+        dirty_rect : tuple, optional
+            (x0, y0, x1, y1) part of the image which changed since the previous
+            call. If None, the whole image is updated. The default is None.
+        """
+        height, width = image.shape[:2]
+        item = self.canvas.image_photoimage
+
+        if (self.photo is None) or (self.photo.width() != width) or\
+            (self.photo.height() != height):
+            #create a PhotoImage with the size of the image
+            if self._use_ppm:
+                self.photo = tk.PhotoImage(master=self.canvas, width=width, height=height)
+            else:
+                self.photo = ImageTk.PhotoImage(Image.fromarray(image))
+            self._item = None
+            dirty_rect = None
+
+        if self._item != item:
+            #the PhotoImage is not (yet) shown on the canvas item
+            self.canvas.itemconfigure(item, image=self.photo)
+            self._item = item
+
+        if dirty_rect is None:
+            dirty_rect = (0, 0, width, height)
+        x0, y0, x1, y1 = dirty_rect
+        if (x0 >= x1) or (y0 >= y1):
+            return
+
+        if self._use_ppm:
+            try:
+                self.photo.tk.call(self.photo, 'put', ppm_bytes(image[y0:y1, x0:x1]),
+                                   '-format', 'ppm', '-to', x0, y0)
+                return
+            except tk.TclError:
+                #Tk doesn't accept binary PPM data, paste with PIL instead
+                self._use_ppm = False
+                self.photo = ImageTk.PhotoImage(Image.fromarray(image))
+                self.canvas.itemconfigure(item, image=self.photo)
+                return
+
+        self.photo.paste(Image.fromarray(image))
+
+    def clear(self):
+        """
+        Remove the shown image
+        """
+        if self.canvas.image_photoimage is not None:
+            self.canvas.itemconfigure(self.canvas.image_photoimage, image="")
+        self.photo = None
+        self._item = None
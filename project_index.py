@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 20:31:06 2026
+
+@author: Maarten
+
+Definition of the ProjectIndex class. The ProjectIndex class scans the project
+folder once and keeps a compact summary of every annotation file, so the
+export wizard doesn't have to open every annotation file to find the images
+which have to be exported
+"""
+#%% packages
+import os
+import json
+
+from annotation_io import load_annotation_file
+
+#%%
+INDEX_VERSION = 1
+
+def summarize_annotations(data_dict):
+    """
+    Compact summary of the content of an annotation file
+
+    Parameters
+    ----------
+    data_dict : dict
+        Content of the .json annotation file
+
+    Returns
+    -------
+    dict
+        n_objects : number of objects
+        n_keypoints : number of annotated keypoints (of all objects)
+        n_complete : number of objects with all keypoints annotated
+        behaviours : behaviour of every object
+        n_masks : number of masks
+    """
+    keypoints = data_dict.get("keypoints", {})
+    coordinates = list(keypoints.values())
+    n_objects = len(coordinates[0]) if len(coordinates) > 0 else 0
+
+    #a keypoint is annotated if its coordinates are not NaN (or None)
+    annotated = [[(point is not None) and (point[0] == point[0])
+                  for point in keypoint] for keypoint in coordinates]
+    n_keypoints = sum(sum(keypoint) for keypoint in annotated)
+    n_complete = sum(all(keypoint[i] for keypoint in annotated)
+                     for i in range(n_objects))
+
+    behaviours = list(data_dict.get("behaviour", {}).get("behaviour", {}).values())
+
+    return {"n_objects": n_objects,
+            "n_keypoints": int(n_keypoints),
+            "n_complete": int(n_complete),
+            "behaviours": behaviours,
+            "n_masks": len(data_dict.get("masks", {}))}
+
+class ProjectIndex():
+    """
+    Index of the annotated images of a project folder
+
+    The folder is listed once per refresh. Annotation files are only parsed if
+    their modification time or size changed since the previous refresh. The
+    summaries are cached on disk (project/annotation_index.json), so reopening
+    a project doesn't require parsing all annotation files again
+
+    Attributes
+    -----
+    self.directory : str
+        Project directory
+
+    self.images : list
+        Names of the images (.jpg or .png) with an annotation file, in the
+        order of the directory listing
+
+    self.summaries : dict
+        Name of the image -> summary of its annotation file (see
+        summarize_annotations), with the modification time and size of the
+        annotation file as "stamp"
+
+    Methods
+    -----
+    self.set_directory
+        Index a new project directory
+
+    self.refresh
+        Scan the directory and update the summaries of modified annotation
+        files
+
+    self.annotated_images
+        Names of the images with an annotation file, optionally only those
+        with annotated objects
+    """
+
+    def __init__(self, directory=None):
+
+        self.directory = None
+        self.images = []
+        self.summaries = {}
+
+        if directory is not None:
+            self.set_directory(directory)
+            self.refresh()
+
+    @property
+    def cache_path(self):
+        """
+        Path of the cached index, None if the project has no project folder
+        """
+        if self.directory is None:
+            return None
+        project_folder = os.path.join(self.directory, "project")
+        if not os.path.isdir(project_folder):
+            return None
+        return os.path.join(project_folder, "annotation_index.json")
+
+    def set_directory(self, directory):
+        """
+        Index a new project directory. Only the cached index is loaded, the
+        directory is scanned by self.refresh
+        """
+        self.directory = directory
+        self.images = []
+        self.summaries = {}
+
+        cache_path = self.cache_path
+        if cache_path is not None:
+            try:
+                with open(cache_path) as f:
+                    cache = json.load(f)
+                if cache.get("version") == INDEX_VERSION:
+                    self.summaries = cache["summaries"]
+            except (FileNotFoundError, ValueError):
+                #no (valid) cached index
+                pass
+
+    def refresh(self):
+        """
+        Scan the directory once and parse the annotation files which were
+        added or modified since the previous scan
+
+        Returns
+        -------
+        int
+            Number of parsed annotation files
+        """
+        if self.directory is None:
+            return 0
+
+        #single scan of the directory, the stat of the entries is kept
+        with os.scandir(self.directory) as entries:
+            entries = list(entries)
+        names = {entry.name: entry for entry in entries}
+
+        images = []
+        summaries = {}
+        n_parsed = 0
+        for entry in entries:
+            parts = entry.name.split(".")
+            if not ((len(parts) == 2) and (parts[-1] in ['png', 'jpg'])):
+                continue
+            json_entry = names.get(parts[0] + ".json")
+            if json_entry is None:
+                #image without annotation file
+                continue
+
+            stat = json_entry.stat()
+            stamp = [stat.st_mtime_ns, stat.st_size]
+            summary = self.summaries.get(entry.name)
+            if (summary is None) or (summary["stamp"] != stamp):
+                try:
+                    data_dict = load_annotation_file(json_entry.path)
+                except ValueError:
+                    #corrupt annotation file, parsed again at the next refresh
+                    data_dict = {}
+                    stamp = None
+                summary = summarize_annotations(data_dict)
+                summary["stamp"] = stamp
+                n_parsed += 1
+
+            images.append(entry.name)
+            summaries[entry.name] = summary
+
+        changed = (n_parsed > 0) or (len(summaries) != len(self.summaries))
+        self.images = images
+        self.summaries = summaries
+        if changed:
+            self.save()
+
+        return n_parsed
+
+    def save(self):
+        """
+        Save the index to the project folder
+        """
+        cache_path = self.cache_path
+        if cache_path is None:
+            return
+
+        temporary_path = cache_path + ".tmp"
+        with open(temporary_path, "w") as f:
+            json.dump({"version": INDEX_VERSION, "summaries": self.summaries}, f)
+        os.replace(temporary_path, cache_path)
+
+    def annotated_images(self, include_empty=True):
+        """
+        Names of the images with an annotation file
+
+        Parameters
+        ----------
+        include_empty : bool, optional
+            If False, only images with annotated objects are returned. The
+            default is True.
+
+        Returns
+        -------
+        list
+            Names of the images, in the order of the directory listing
+        """
+        if include_empty:
+            return list(self.images)
+        return [image for image in self.images
+                if self.summaries[image]["n_objects"] > 0]
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 09:14:52 2026
+
+@author: Maarten
+
+Definition of the RedrawScheduler class. The RedrawScheduler class coalesces
+redraw requests of fast event streams (mouse motion, dragging, panning,
+zooming), so a canvas is rendered at most once per frame interval
+"""
+#%% packages
+import time
+
+#%%
+class RedrawScheduler():
+    """
+    Coalesces redraw requests into at most one render per frame interval
+
+    A request doesn't render immediately. If no render is pending, one is
+    scheduled with after_idle (or with after, if the previous render was less
+    than one frame interval ago). Requests which arrive while a render is
+    pending are merged into it. The render reads the state of the canvas when
+    it is executed, so only the latest state is shown
+
+    Attributes
+    -----
+    self.interval : float
+        Minimal time between two scheduled renders, expressed in ms
+
+    self.n_requests : int
+        Number of redraw requests
+
+    self.n_coalesced : int
+        Number of requests merged into a pending render
+
+    self.n_dropped : int
+        Number of pending renders which were cancelled, because a synchronous
+        render took them over
+
+    self.n_renders : int
+        Number of scheduled renders which were executed
+
+    Methods
+    -----
+    self.request
+        Request a redraw
+
+    self.take
+        Take over the pending render (for synchronous renders)
+
+    self.cancel
+        Cancel the pending render
+    """
+
+    def __init__(self, widget, render, merge, interval=1000/60):
+        """
+        Parameters
+        ----------
+        widget : tkinter widget
+            Widget used to schedule the renders
+        render : callable
+            Function render(mode) which renders the canvas
+        merge : callable
+            Function merge(first_mode, second_mode) which returns the mode of
+            a single render that has the same result as rendering first_mode
+            and then second_mode
+        interval : float, optional
+            Minimal time between two scheduled renders, expressed in ms. The
+            default is 1000/60.
+        """
+        self.widget = widget
+        self.render = render
+        self.merge = merge
+        self.interval = interval
+
+        self._pending = None #mode of the pending render
+        self._callback = None #identifier of the scheduled callback
+        self._last_render = 0.0 #time of the last scheduled render, in s
+
+        #counters
+        self.n_requests = 0
+        self.n_coalesced = 0
+        self.n_dropped = 0
+        self.n_renders = 0
+
+    def request(self, mode):
+        """
+        Request a redraw
+
+        Parameters
+        ----------
+        mode : int
+            Mode of the redraw
+        """
+        self.n_requests += 1
+
+        if self._pending is not None:
+            #a render is already pending, merge this request into it
+            self._pending = self.merge(self._pending, mode)
+            self.n_coalesced += 1
+            return
+
+        self._pending = mode
+        delay = self.interval - (time.perf_counter() - self._last_render) * 1000
+        if delay <= 0:
+            self._callback = self.widget.after_idle(self._flush)
+        else:
+            self._callback = self.widget.after(int(delay) + 1, self._flush)
+
+    def take(self, mode):
+        """
+        Take over the pending render. Should be called by a synchronous render,
+        which then renders the returned mode instead of mode
+
+        Parameters
+        ----------
+        mode : int
+            Mode of the synchronous render
+
+        Returns
+        -------
+        int
+            Mode which covers the pending render and the synchronous render
+        """
+        if self._pending is None:
+            return mode
+
+        mode = self.merge(self._pending, mode)
+        self.cancel()
+        self.n_dropped += 1
+
+        return mode
+
+    def cancel(self):
+        """
+        Cancel the pending render
+        """
+        if self._callback is not None:
+            self.widget.after_cancel(self._callback)
+        self._pending = None
+        self._callback = None
+
+    def _flush(self):
+        """
+        Execute the pending render
+        """
+        mode = self._pending
+        self._pending = None
+        self._callback = None
+
+        if mode is None:
+            return
+
+        self._last_render = time.perf_counter()
+        self.n_renders += 1
+        self.render(mode)
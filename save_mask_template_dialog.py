@@ -14,6 +14,8 @@ import json
 import tkinter as tk
 import tkinter.messagebox as tkmessagebox
 
+from annotation_io import masks_to_dict, dump_annotation_file
+
 #%%
 
 class SaveMaskTemplateDialog(tk.Toplevel):
@@ -103,10 +105,9 @@ class SaveMaskTemplateDialog(tk.Toplevel):
             #save this mask
             self.annotations.new_mask()
 
-        #all information that has to be saved is in self.annotations.annotation_points_masks and
-        #self.annotations.names_masks
+        #all information that has to be saved is in self.annotations.masks
         
-        if len(self.annotations.annotation_points_masks)==0:
+        if self.annotations.masks.n_vertices==0:
             #there is no data to be saved or all data was removed
             
             tkmessagebox.showinfo(title="No masks present",
@@ -120,37 +121,13 @@ class SaveMaskTemplateDialog(tk.Toplevel):
         
         #self.check_mask_availability was called previously, as a consequence,
         #we know there are masks present and all information that has to be
-        #saved is in self.annotations.annotation_points_masks and
-        #self.annotations.names_masks
+        #saved is in self.annotations.masks
         
         #get name of template
         template_name = self.var_name.get()        
 
-        #fuse self.annotations.names_masks, self.annotations.annotation_points_masks
-        #in one dictionary        
-        names_masks = self.annotations.names_masks
-        annotation_points_masks = self.annotations.annotation_points_masks
-        
-        data={}
-        for mask_id in names_masks["obj"]:
-            #get mask_name
-            mask_name = names_masks.loc[names_masks["obj"]==mask_id, 'name'].iloc[0]
-            
-            #get mask points
-            points = annotation_points_masks.loc[annotation_points_masks["obj"]==mask_id,\
-                                                ["x","y"]].round(2)
-
-            #convert points from pd.DataFrame to dict
-            points_dict = {}
-            for i in range(len(points)):
-                points_dict[i] = points.iloc[i,].to_dict(({}))
-
-            #assembly dict for object
-            mask = {"name": mask_name,
-                   "points": points_dict}
-
-            #add object dict to data
-            data[mask_id] = mask
+        #convert self.annotations.masks to one dictionary
+        data = masks_to_dict(*self.annotations.masks.to_arrays())
             
         #check if there are already templates stored in this project
         #if this is the case, load the templates
@@ -166,9 +143,7 @@ class SaveMaskTemplateDialog(tk.Toplevel):
         templates_dict[template_name] = data
 
         #save all templates
-        f = open("project/mask_templates.json", 'w')
-        json.dump(templates_dict, f, indent = 3)
-        f.close()
+        dump_annotation_file("project/mask_templates.json", templates_dict)
         
         #destroy child window
         self.destroy()
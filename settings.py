@@ -44,6 +44,70 @@ class Settings():
         #dict
         self.default_mask_template = None
 
+        #save annotation files without indentation (smaller and faster)
+        #bool
+        self.compact_json = False
+
+        #memory budget for decoded images kept in memory
+        #unit: MB
+        self.image_cache_size = 1024
+
+        #number of images before and after the current image which are
+        #decoded in advance
+        #int
+        self.n_prefetch = 2
+
+        #show a reduced resolution preview of large jpg images while the full
+        #resolution image is decoded
+        #bool
+        self.fast_preview = True
+
+        #memory budget for decoded video frames kept in memory
+        #unit: MB
+        self.video_cache_size = 256
+
+        #number of frames to step with F7/F8 when annotating a video
+        #int
+        self.video_frame_step = 1
+
+        #number of worker processes used to export a dataset, None uses the
+        #number of cpus, 0 exports in the application process
+        #int
+        self.n_export_workers = None
+
+        #how images without masks and video files are put in an exported
+        #dataset: "copy", "reflink" (copy-on-write, if supported by the file
+        #system) or "hardlink" (the exported file shares its data with the
+        #file in the project)
+        #str
+        self.export_link_mode = "reflink"
+
+        #keep annotations.jsonl (one image per line) next to annotations.json
+        #when exporting a dataset
+        #bool
+        self.export_jsonl = False
+
+        #maximal number of images per tar shard when exporting a dataset to
+        #shards
+        #int
+        self.shard_size = 1000
+
+        #size of the images when exporting a dataset to tensors
+        #unit: pixels
+        self.tensor_height = 256
+        self.tensor_width = 256
+
+        #keep the aspect ratio of the images when exporting a dataset to
+        #tensors (the images are padded with black), otherwise the images are
+        #stretched
+        #bool
+        self.tensor_letterbox = True
+
+        #maximal number of redraws per second while moving the mouse,
+        #dragging, panning or zooming
+        #unit: Hz
+        self.max_frame_rate = 60
+
 
     @property
     def point_size_skeleton(self):
@@ -15,7 +15,6 @@ import tkinter.messagebox as tkmessagebox
 import pandas as pd
 import numpy as np
 import cv2
-from PIL import Image, ImageTk
 
 from general_image_canvas import GeneralImageCanvas
 from keypoint_properties import KeypointProperties
@@ -34,7 +33,6 @@ class SkeletonCanvas(GeneralImageCanvas):
         self.skeleton = master.skeleton
         self.settings = master.settings
         self.skeleton_name = ""
-        self._image_photoimage = None
         self.keypoint_index = None
         self.current_keypoint_coordinates_memory = None
         self.image_inter_scale = 1.0 #scale of self.image_inter
@@ -226,11 +224,7 @@ class SkeletonCanvas(GeneralImageCanvas):
                                       :]
 
         #show image
-        image_shown = Image.fromarray(image_shown)
-        image_shown = ImageTk.PhotoImage(image_shown)
-
-        self.itemconfigure(self.image_photoimage, image=image_shown)
-        self._image_photoimage = image_shown
+        self.show_image(image_shown)
 
     def new_keypoint(self, event):
         """
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 11:03:27 2026
+
+@author: Maarten
+
+Definition of the KeypointGrid class. The KeypointGrid class is a uniform grid
+over all annotated keypoints of an image, used to look up the keypoint closest
+to a mouse click without computing the distance to every keypoint
+"""
+#%% packages
+import math
+
+#%%
+class KeypointGrid():
+    """
+    Uniform grid over all annotated keypoints of an image
+
+    Keypoints are identified by the pair (uid, keypoint), with uid the unique
+    identifier of an object (see KeypointStore) and keypoint the index of the
+    keypoint within the skeleton. Every keypoint is stored in the grid cell
+    which contains its coordinates, so a radius query only has to visit the
+    cells overlapping the search circle
+
+    Attributes
+    -----
+    self.cell_size : float
+        Size of a grid cell, expressed as number of pixels on the image
+
+    Methods
+    -----
+    self.insert
+        Insert or move a keypoint
+
+    self.remove
+        Remove a keypoint
+
+    self.remove_object
+        Remove all keypoints of an object
+
+    self.clear
+        Remove all keypoints
+
+    self.nearest
+        Look up the keypoint closest to a location, within a given radius
+    """
+
+    def __init__(self, cell_size=64):
+
+        self.cell_size = cell_size
+
+        #keypoints per grid cell
+        self._cells = {} #(cell_x, cell_y) -> set of (uid, keypoint)
+
+        #coordinates of every keypoint in the grid
+        self._positions = {} #(uid, keypoint) -> (x, y)
+
+        #keypoints in the grid per object
+        self._objects = {} #uid -> set of keypoint indices
+
+    def __len__(self):
+        return len(self._positions)
+
+    def _cell(self, x, y):
+        """
+        Get the grid cell containing the location (x, y)
+        """
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def insert(self, uid, keypoint, x, y):
+        """
+        Insert a keypoint in the grid. If the keypoint is already present, it
+        is moved to its new location
+
+        Parameters
+        ----------
+        uid : int
+            Unique identifier of the object
+        keypoint : int
+            Index of the keypoint
+        x : float
+            x coordinate (horizontal axis, origin=left side)
+        y : float
+            y coordinate (vertical axis, origin=top)
+        """
+        key = (uid, keypoint)
+        cell = self._cell(x, y)
+
+        if key in self._positions:
+            #keypoint is moved, remove it from its previous cell if necessary
+            old_cell = self._cell(*self._positions[key])
+            if old_cell != cell:
+                self._discard_from_cell(old_cell, key)
+                self._cells.setdefault(cell, set()).add(key)
+        else:
+            self._cells.setdefault(cell, set()).add(key)
+            self._objects.setdefault(uid, set()).add(keypoint)
+
+        self._positions[key] = (float(x), float(y))
+
+    def remove(self, uid, keypoint):
+        """
+        Remove a keypoint from the grid (if present)
+        """
+        key = (uid, keypoint)
+        if key not in self._positions:
+            return
+
+        self._discard_from_cell(self._cell(*self._positions.pop(key)), key)
+
+        keypoints = self._objects[uid]
+        keypoints.discard(keypoint)
+        if len(keypoints) == 0:
+            del self._objects[uid]
+
+    def remove_object(self, uid):
+        """
+        Remove all keypoints of the object with unique identifier uid
+        """
+        for keypoint in list(self._objects.get(uid, ())):
+            self.remove(uid, keypoint)
+
+    def clear(self):
+        """
+        Remove all keypoints
+        """
+        self._cells = {}
+        self._positions = {}
+        self._objects = {}
+
+    def _discard_from_cell(self, cell, key):
+        """
+        Remove key from cell, empty cells are dropped
+        """
+        keys = self._cells[cell]
+        keys.discard(key)
+        if len(keys) == 0:
+            del self._cells[cell]
+
+    def nearest(self, x, y, radius):
+        """
+        Look up the keypoint closest to the location (x, y), within radius
+
+        Parameters
+        ----------
+        x : float
+            x coordinate (horizontal axis, origin=left side)
+        y : float
+            y coordinate (vertical axis, origin=top)
+        radius : float
+            Search radius, expressed as number of pixels on the image
+
+        Returns
+        -------
+        uid : int
+            Unique identifier of the object of the closest keypoint. None if
+            there is no keypoint within radius
+        keypoint : int
+            Index of the closest keypoint. None if there is no keypoint
+            within radius
+        distance : float
+            Distance to the closest keypoint. None if there is no keypoint
+            within radius
+        """
+        closest = (None, None, None)
+        min_distance = radius
+
+        #only visit the cells overlapping the square around the search circle
+        cell_x_min, cell_y_min = self._cell(x - radius, y - radius)
+        cell_x_max, cell_y_max = self._cell(x + radius, y + radius)
+
+        n_cells = (cell_x_max - cell_x_min + 1) * (cell_y_max - cell_y_min + 1)
+        if n_cells <= len(self._cells):
+            cells = [self._cells.get((cell_x, cell_y), ())
+                     for cell_x in range(cell_x_min, cell_x_max + 1)
+                     for cell_y in range(cell_y_min, cell_y_max + 1)]
+        else:
+            #the search circle covers more cells than there are occupied
+            #cells (strongly zoomed out), visit the occupied cells instead
+            cells = [keys for (cell_x, cell_y), keys in self._cells.items()
+                     if (cell_x_min <= cell_x <= cell_x_max) and
+                     (cell_y_min <= cell_y <= cell_y_max)]
+
+        for keys in cells:
+            for key in keys:
+                x_key, y_key = self._positions[key]
+                distance = math.hypot(x_key - x, y_key - y)
+                if distance <= min_distance:
+                    min_distance = distance
+                    closest = (key[0], key[1], distance)
+
+        return closest
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 14:22:08 2026
+
+@author: Maarten
+
+Definition of the VideoFrameSource class. The VideoFrameSource class reads
+frames of a video by frame index, so frames can be annotated without
+extracting them to image files first
+"""
+#%% packages
+import os
+from collections import OrderedDict
+import cv2
+
+#%%
+VIDEO_EXTENSIONS = ('mp4', 'avi', 'mov')
+
+def is_video(filename, extensions=VIDEO_EXTENSIONS):
+    """
+    Check if a file is a video, based on its extension
+    """
+    parts = filename.split(".")
+    return (len(parts) > 1) and (parts[-1].lower() in extensions)
+
+def sidecar_name(video_name):
+    """
+    Name of the .json file with the annotations of the frames of a video. The
+    sidecar contains a dictionary with the frame number (str) as key and the
+    annotations of the frame (same format as the .json file of an image) as
+    value
+    """
+    directory, name = os.path.split(video_name)
+    return os.path.join(directory, name.split(".")[0] + "_frames.json")
+
+class VideoFrameSource():
+    """
+    Frames of a video, accessed by frame index
+
+    The video is opened once. Frames are decoded in blocks of gop_size frames
+    starting at a multiple of gop_size, and kept in an LRU cache of decoded
+    frames. Stepping forwards continues decoding from the current position of
+    the decoder, stepping backwards within a block is served from the cache,
+    so only a jump to another block requires a seek
+
+    Attributes
+    -----
+    self.path : str
+        Path of the video
+
+    self.n_frames : int
+        Number of frames of the video
+
+    self.fps : float
+        Frame rate of the video
+
+    self.shape : tuple
+        Shape (height, width, 3) of the frames
+
+    Methods
+    -----
+    self.read
+        Get a frame (RGB)
+
+    self.release
+        Close the video
+    """
+
+    def __init__(self, path, gop_size=32, max_bytes=256*2**20):
+        """
+        Parameters
+        ----------
+        path : str
+            Path of the video
+        gop_size : int, optional
+            Number of frames which are decoded together. The default is 32.
+        max_bytes : int, optional
+            Memory budget for the decoded frames, expressed in bytes. The
+            default is 256*2**20.
+        """
+        self.path = path
+        self.gop_size = gop_size
+        self.max_bytes = max_bytes
+
+        self._capture = cv2.VideoCapture(path)
+        if not self._capture.isOpened():
+            raise IOError("unable to open video " + path)
+
+        self.n_frames = int(self._capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.fps = self._capture.get(cv2.CAP_PROP_FPS)
+        self.shape = (int(self._capture.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                      int(self._capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                      3)
+
+        self._frames = OrderedDict() #frame index -> decoded frame (RGB)
+        self.n_bytes = 0 #memory used by the decoded frames
+        self._position = 0 #index of the next frame returned by the decoder
+
+        #counters
+        self.n_seeks = 0
+        self.n_decoded = 0
+
+    def __len__(self):
+        return self.n_frames
+
+    def __contains__(self, index):
+        return index in self._frames
+
+    def _store(self, index, frame):
+        """
+        Add a decoded frame to the cache and evict the least recently used
+        frames until the cache fits in its memory budget
+        """
+        self._frames[index] = frame
+        self.n_bytes += frame.nbytes
+
+        #the frames of the current block are always kept
+        while self.n_bytes > self.max_bytes and len(self._frames) > self.gop_size:
+            _, evicted = self._frames.popitem(last=False)
+            self.n_bytes -= evicted.nbytes
+
+    def _decode(self, index):
+        """
+        Decode the block of frames which contains index
+        """
+        start = index - index % self.gop_size
+
+        if not start <= self._position <= index:
+            #the decoder can't reach the block by decoding forwards
+            self._capture.set(cv2.CAP_PROP_POS_FRAMES, start)
+            self._position = start
+            self.n_seeks += 1
+
+        stop = min(max(start + self.gop_size, index + 1), self.n_frames)
+        while self._position < stop:
+            success, frame = self._capture.read()
+            if not success:
+                #the frame count in the header was too large
+                self.n_frames = self._position
+                break
+            if self._position not in self._frames:
+                self._store(self._position, cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            self._position += 1
+            self.n_decoded += 1
+
+    def read(self, index):
+        """
+        Get a frame
+
+        Parameters
+        ----------
+        index : int
+            Index of the frame
+
+        Returns
+        -------
+        numpy array (height, width, 3)
+            RGB frame. The array is shared with the cache and shouldn't be
+            modified
+        """
+        if not 0 <= index < self.n_frames:
+            raise IndexError("frame " + str(index) + " is outside the video")
+
+        if index not in self._frames:
+            self._decode(index)
+            if index not in self._frames:
+                raise IndexError("frame " + str(index) + " is outside the video")
+
+        self._frames.move_to_end(index)
+        return self._frames[index]
+
+    def release(self):
+        """
+        Close the video and empty the cache
+        """
+        self._capture.release()
+        self._frames = OrderedDict()
+        self.n_bytes = 0